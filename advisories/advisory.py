@@ -24,3 +24,17 @@ class ResolutionAdvisory(Advisory):
     maxAllowedVSFpm: int
 
     alimFt: int
+
+
+# RAs that only limit vertical speed (preventive / maintain) rather than demand a new one
+VS_LIMIT_KINDS = frozenset({
+    RAKind.DO_NOT_CLIMB,
+    RAKind.DO_NOT_DESCEND,
+    RAKind.MAINTAIN_VERTICAL_SPEED,
+    RAKind.CROSSING_MAINTAIN,
+})
+CLIMB_KINDS = frozenset({RAKind.CLIMB, RAKind.INCREASE_CLIMB, RAKind.CROSSING_CLIMB})
+DESCEND_KINDS = frozenset({RAKind.DESCEND, RAKind.INCREASE_DESCEND, RAKind.CROSSING_DESCEND})
+
+# guidance band edge used for "no limit on this side"
+VS_LIMIT_FPM = 6000
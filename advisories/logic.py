@@ -1,12 +1,21 @@
 from __future__ import annotations
-import math
 from typing import Optional, List
 
+import numpy as np
+
 from tcas_sim.enums import AdvisoryState, RAKind, RASense, TrackState, TCASMode
 from tcas_sim.sensitivity.thresholds import SensitivityThresholds
 from tcas_sim.tracking.track import Track
-from tcas_sim.advisories.advisory import TrafficAdvisory, ResolutionAdvisory
+from tcas_sim.tracking.index import ThreatIndex
+from tcas_sim.advisories.advisory import TrafficAdvisory, ResolutionAdvisory, VS_LIMIT_KINDS, VS_LIMIT_FPM
 from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.advisories.prediction import (
+    predict_separation, INITIAL_DELAY_S, INITIAL_ACCEL_G, MODIFIED_DELAY_S, MODIFIED_ACCEL_G,
+)
+
+
+# extra predicted separation a different RA must achieve before it replaces the active one
+RA_CHANGE_MARGIN_FT = 100
 
 
 class AdvisoryEngine:
@@ -15,13 +24,20 @@ class AdvisoryEngine:
     Implements:
       - TA issuance when any track is INTRUDER_TA or THREAT_RA
       - RA issuance when any track is THREAT_RA and RA is enabled
-      - RA sense selection + strength (ALIM/non-crossing preference)
+      - RA selection across all concurrent threats (ALIM/non-crossing preference,
+        preventive, crossing and increase variants)
       - Weakening to LEVEL_OFF once ALIM achieved early (simple form)
+    An unchanged RA is returned as the same object; a changed one carries the
+    transition (ACTIVE/STRENGTHENED/WEAKENED/REVERSED) in its state.
+
+    `logic` swaps out RA selection: any object with
+    select_ra(threats, ownship, alim_ft) -> (RAKind, RASense, vs), e.g. table_logic.TableLogic.
     """
-    def __init__(self):
+    def __init__(self, logic=None):
+        self.logic = logic
         self.ta: Optional[TrafficAdvisory] = None
         self.ra: Optional[ResolutionAdvisory] = None
-        self.primaryThreat: Optional[str] = None
+        self.primaryThreat: Optional[int] = None  # aircraft ID
 
     def update(
         self,
@@ -30,14 +46,21 @@ class AdvisoryEngine:
         tcas_mode: TCASMode,
         thresholds: SensitivityThresholds,
         tracks: List[Track],
+        index: Optional[ThreatIndex] = None,
     ) -> tuple[Optional[TrafficAdvisory], Optional[ResolutionAdvisory]]:
-        intruders = [t for t in tracks if t.state in (TrackState.INTRUDER_TA, TrackState.THREAT_RA)]
-        threats = [t for t in tracks if t.state == TrackState.THREAT_RA]
+        # with a Tracker-maintained index the TA/RA checks are O(1) and the primary threat a heap peek
+        if index is not None:
+            any_intruder = index.has_intruders()
+            any_threat = index.has_threats()
+        else:
+            threats = [t for t in tracks if t.state == TrackState.THREAT_RA]
+            any_threat = bool(threats)
+            any_intruder = any_threat or any(t.state == TrackState.INTRUDER_TA for t in tracks)
 
         # TA
-        if intruders and self.ta is None:
+        if any_intruder and self.ta is None:
             self.ta = TrafficAdvisory(issuedAt=now, state=AdvisoryState.ACTIVE)
-        if not intruders:
+        if not any_intruder:
             self.ta = None
 
         # RA disabled?
@@ -46,37 +69,48 @@ class AdvisoryEngine:
             self.primaryThreat = None
             return self.ta, None
 
-        if not threats:
+        if not any_threat:
             self.ra = None
             self.primaryThreat = None
             return self.ta, None
 
-        primary = min(threats, key=lambda t: (t.rangeTauSec, t.rangeNm))
-        self.primaryThreat = primary.intruder.callsign
+        if index is not None:
+            primary = index.primary_threat()
+            threats = index.threats()
+        else:
+            primary = min(threats, key=lambda t: (t.rangeTauSec, t.rangeNm))
+        self.primaryThreat = primary.intruder.id
 
         alim = thresholds.alimFt
 
-        # Weakening example: if already have positive RA and ALIM already achieved now, go LEVEL_OFF
-        if self.ra is not None and abs(primary.relativeAltitudeFt) >= alim:
-            self.ra = ResolutionAdvisory(
-                issuedAt=self.ra.issuedAt,
-                state=AdvisoryState.WEAKENED,
-                kind=RAKind.LEVEL_OFF,
-                sense=RASense.NONE,
-                requiredVerticalRateFpm=0,
-                minAllowedVSFpm=-250,
-                maxAllowedVSFpm=+250,
-                alimFt=alim,
-            )
+        # Weakening: with an RA active, ALIM already achieved against every threat and a level-off
+        # predicted to keep it, go LEVEL_OFF; once level, stay there while the prediction holds
+        levelled = self.ra is not None and self.ra.kind == RAKind.LEVEL_OFF
+        achieved = levelled or all(abs(t.relativeAltitudeFt) >= alim for t in threats)
+        if self.ra is not None and achieved and self._level_off_holds(threats, ownship, alim):
+            self.ra = self._next_ra(now, RAKind.LEVEL_OFF, RASense.NONE, 0, alim)
             return self.ta, self.ra
 
-        # Select new RA
-        kind, sense, req_vs = self._select_ra(primary, ownship, alim)
-        min_vs, max_vs = self._guidance_band(kind, req_vs)
+        # Select new RA against all concurrent threats
+        select = self.logic.select_ra if self.logic is not None else self._select_ra
+        kind, sense, req_vs = select(threats, ownship, alim)
+        self.ra = self._next_ra(now, kind, sense, req_vs, alim)
+        return self.ta, self.ra
+
+    def _level_off_holds(self, threats: List[Track], ownship: Aircraft, alim_ft: int) -> bool:
+        # immediate level-off, so the check agrees with itself once LEVEL_OFF is being flown
+        sep, _ = predict_separation(ownship, threats, np.zeros(1), np.zeros(1), np.full(1, MODIFIED_ACCEL_G))
+        return bool((sep >= alim_ft).all())
+
+    def _next_ra(self, now: float, kind: RAKind, sense: RASense, req_vs: int, alim: int) -> ResolutionAdvisory:
+        prev = self.ra
+        if prev is not None and (prev.kind, prev.sense, prev.requiredVerticalRateFpm, prev.alimFt) == (kind, sense, req_vs, alim):
+            return prev
 
-        self.ra = ResolutionAdvisory(
-            issuedAt=now,
-            state=AdvisoryState.ACTIVE,
+        min_vs, max_vs = guidance_band(kind, req_vs)
+        return ResolutionAdvisory(
+            issuedAt=now if prev is None else prev.issuedAt,
+            state=self._transition(prev, kind, sense, req_vs),
             kind=kind,
             sense=sense,
             requiredVerticalRateFpm=req_vs,
@@ -84,62 +118,153 @@ class AdvisoryEngine:
             maxAllowedVSFpm=max_vs,
             alimFt=alim,
         )
-        return self.ta, self.ra
 
-    def _select_ra(self, trk: Track, ownship: Aircraft, alim_ft: int) -> tuple[RAKind, RASense, int]:
-        intr = trk.intruder
-        t_cpa = min(trk.rangeTauSec if math.isfinite(trk.rangeTauSec) else 25.0, 45.0)
-        t_cpa = max(1.0, t_cpa)
-
-        strengths = [1500, 2500, 3500, 4400]
-
-        def proj_sep_and_cross(own_vs: int) -> tuple[int, bool]:
-            own_alt_cpa = ownship.altitudeFt + int(own_vs * (t_cpa / 60.0))
-            intr_alt_cpa = intr.altitudeFt + int(intr.verticalRateFpm * (t_cpa / 60.0))
-            sep = abs(own_alt_cpa - intr_alt_cpa)
-
-            rel_now = intr.altitudeFt - ownship.altitudeFt
-            rel_cpa = intr_alt_cpa - own_alt_cpa
-            crossing = (rel_now == 0) or (rel_now * rel_cpa < 0)
-            return sep, crossing
-
-        best = None  # (achieves, non_crossing, disruption, sep, kind, sense, vs)
-
-        for kind, sense, sign in (
-            (RAKind.CLIMB, RASense.UPWARD, +1),
-            (RAKind.DESCEND, RASense.DOWNWARD, -1),
-        ):
-            for mag in strengths:
-                vs = sign * mag
-                sep, crossing = proj_sep_and_cross(vs)
-                achieves = sep >= alim_ft
-                non_cross = not crossing
-                disruption = abs(vs - ownship.verticalRateFpm)
-                cand = (achieves, non_cross, disruption, sep, kind, sense, vs)
-
-                if best is None:
-                    best = cand
-                else:
-                    if cand[0] != best[0]:
-                        if cand[0] and not best[0]:
-                            best = cand
-                    elif cand[1] != best[1]:
-                        if cand[1] and not best[1]:
-                            best = cand
-                    elif cand[2] < best[2]:
-                        best = cand
-                    elif cand[2] == best[2] and cand[3] > best[3]:
-                        best = cand
-
-                if achieves and non_cross:
-                    break
-
-        assert best is not None
-        _, _, _, _, kind, sense, vs = best
-        return kind, sense, int(vs)
-
-    def _guidance_band(self, kind: RAKind, req_vs: int) -> tuple[int, int]:
-        # Simple banding: +/- 250 around target. For LEVEL_OFF constrain around 0.
-        if kind == RAKind.LEVEL_OFF:
-            return (-250, +250)
-        return (req_vs - 250, req_vs + 250)
+    @staticmethod
+    def _transition(prev: Optional[ResolutionAdvisory], kind: RAKind, sense: RASense, req_vs: int) -> AdvisoryState:
+        # derived only from what changed; a change that neither reverses, weakens nor strengthens
+        # (ALIM only, or e.g. CLIMB -> CROSSING_CLIMB at the same rate) is ACTIVE
+        if prev is None or (kind, sense, req_vs) == (prev.kind, prev.sense, prev.requiredVerticalRateFpm):
+            return AdvisoryState.ACTIVE
+        if RASense.NONE not in (sense, prev.sense) and sense != prev.sense:
+            return AdvisoryState.REVERSED
+        if sense == RASense.NONE or abs(req_vs) < abs(prev.requiredVerticalRateFpm):
+            return AdvisoryState.WEAKENED
+        if (kind in VS_LIMIT_KINDS) != (prev.kind in VS_LIMIT_KINDS):
+            return AdvisoryState.WEAKENED if kind in VS_LIMIT_KINDS else AdvisoryState.STRENGTHENED
+        if prev.sense == RASense.NONE or abs(req_vs) > abs(prev.requiredVerticalRateFpm):
+            return AdvisoryState.STRENGTHENED
+        return AdvisoryState.ACTIVE
+
+    def _select_ra(self, threats: List[Track], ownship: Aircraft, alim_ft: int) -> tuple[RAKind, RASense, int]:
+        """
+        Scores every candidate RA against every threat in one batched trajectory prediction
+        (pilot delay + finite acceleration, see prediction.py) and picks, in order: achieves
+        ALIM against all threats, keeps the active RA's sense, crosses none of them, least
+        change from the current vertical speed, largest worst-case separation. If none
+        achieves ALIM the largest worst-case separation wins. Replacing the active RA takes
+        RA_CHANGE_MARGIN_FT more separation than keeping it.
+        """
+        own_vs = ownship.verticalRateFpm
+        kinds, senses, vs = candidates(own_vs)
+
+        # the candidate the active RA came from: crossing variants map back to their base kind, and a
+        # preventive RA matches by kind and sense, its candidate VS following the current VS
+        current = np.zeros(vs.shape, dtype=bool)
+        if self.ra is not None:
+            base = _BASE_KIND.get(self.ra.kind, self.ra.kind)
+            req = self.ra.requiredVerticalRateFpm
+            current = np.array([k == base and (s == self.ra.sense if k in VS_LIMIT_KINDS else v == req)
+                                for k, s, v in zip(kinds, senses, vs.tolist())])
+
+        # the pilot is already flying the active RA; anything else is a new or modified response
+        if self.ra is None:
+            delay = np.full(vs.shape, INITIAL_DELAY_S)
+            accel = np.full(vs.shape, INITIAL_ACCEL_G)
+        else:
+            delay = np.where(current, 0.0, MODIFIED_DELAY_S)
+            accel = np.where(current, INITIAL_ACCEL_G, MODIFIED_ACCEL_G)
+
+        # a preventive RA allows any VS in its band: score it at both edges as well, so the side
+        # it leaves open cannot point at a threat
+        lim = np.array([i for i, k in enumerate(kinds) if k in VS_LIMIT_KINDS], dtype=np.intp)
+        edges = band_edges_vs(kinds, vs)[lim]
+        rows = np.concatenate((np.arange(vs.size), lim, lim))
+        sep, crossing = predict_separation(ownship, threats, np.concatenate((vs, edges[:, 0], edges[:, 1])),
+                                           delay[rows], accel[rows])
+        k, n = vs.size, lim.size
+        sep_edge = np.minimum(sep[k:k + n], sep[k + n:])
+        cross_edge = crossing[k:k + n] | crossing[k + n:]
+        sep, crossing = sep[:k], crossing[:k]  # K candidates x M threats
+        sep[lim] = np.minimum(sep[lim], sep_edge)
+
+        # hysteresis: replacing the RA being flown needs ALIM plus a margin
+        achieves = (sep >= alim_ft + np.where(current, 0, RA_CHANGE_MARGIN_FT)[:, None]).all(axis=1)
+        crosses = crossing.any(axis=1)
+        crosses[lim] |= cross_edge.any(axis=1)
+        disruption = np.abs(vs - own_vs)
+        worst_sep = sep.min(axis=1)
+        reverses = np.zeros(vs.shape, dtype=bool)
+        if self.ra is not None and self.ra.sense != RASense.NONE:
+            reverses = np.array([s not in (self.ra.sense, RASense.NONE) for s in senses])
+
+        # lexsort: last key is primary; stable so table order breaks remaining ties
+        if achieves.any():
+            best = int(np.lexsort((-worst_sep, disruption, crosses, reverses, ~achieves))[0])
+        else:
+            # nothing reaches ALIM: most separation, leaving the active RA only for a clear gain
+            gain = worst_sep - np.where(current, 0, RA_CHANGE_MARGIN_FT)
+            best = int(np.lexsort((disruption, crosses, reverses, -gain))[0])
+        kind = CROSSING_KIND.get(kinds[best], kinds[best]) if crossing[best].any() else kinds[best]
+        if self.ra is not None and kind == self.ra.kind and kind in VS_LIMIT_KINDS:
+            # a preventive limit stays where it was issued instead of tracking the current VS
+            return kind, self.ra.sense, self.ra.requiredVerticalRateFpm
+        return kind, senses[best], int(vs[best])
+
+
+def guidance_band(kind: RAKind, req_vs: int) -> tuple[int, int]:
+    """(min, max) vertical speed an RA of this kind and required VS allows."""
+    # Simple banding: +/- 250 around target. For LEVEL_OFF constrain around 0.
+    if kind == RAKind.LEVEL_OFF:
+        return (-250, +250)
+    # Preventive RAs bound one side of zero; maintain RAs one side of the current vertical speed
+    if kind == RAKind.DO_NOT_CLIMB:
+        return (-VS_LIMIT_FPM, 0)
+    if kind == RAKind.DO_NOT_DESCEND:
+        return (0, VS_LIMIT_FPM)
+    if kind in (RAKind.MAINTAIN_VERTICAL_SPEED, RAKind.CROSSING_MAINTAIN):
+        return (req_vs, VS_LIMIT_FPM) if req_vs >= 0 else (-VS_LIMIT_FPM, req_vs)
+    return (req_vs - 250, req_vs + 250)
+
+
+# Candidate RAs in preference order; None = keep the current vertical speed within the limit
+CANDIDATE_TABLE = (
+    (RAKind.DO_NOT_DESCEND, RASense.UPWARD, None),
+    (RAKind.DO_NOT_CLIMB, RASense.DOWNWARD, None),
+    (RAKind.MAINTAIN_VERTICAL_SPEED, None, None),
+    (RAKind.LEVEL_OFF, RASense.NONE, 0),
+    (RAKind.CLIMB, RASense.UPWARD, 1500),
+    (RAKind.DESCEND, RASense.DOWNWARD, -1500),
+    (RAKind.INCREASE_CLIMB, RASense.UPWARD, 2500),
+    (RAKind.INCREASE_DESCEND, RASense.DOWNWARD, -2500),
+    (RAKind.INCREASE_CLIMB, RASense.UPWARD, 3500),
+    (RAKind.INCREASE_DESCEND, RASense.DOWNWARD, -3500),
+    (RAKind.INCREASE_CLIMB, RASense.UPWARD, 4400),
+    (RAKind.INCREASE_DESCEND, RASense.DOWNWARD, -4400),
+)
+
+# a candidate that passes through a threat's altitude is announced as the crossing variant
+CROSSING_KIND = {
+    RAKind.CLIMB: RAKind.CROSSING_CLIMB,
+    RAKind.DESCEND: RAKind.CROSSING_DESCEND,
+    RAKind.MAINTAIN_VERTICAL_SPEED: RAKind.CROSSING_MAINTAIN,
+}
+_BASE_KIND = {v: k for k, v in CROSSING_KIND.items()}
+
+
+def candidates(own_vs: int) -> tuple[list, list, np.ndarray]:
+    """CANDIDATE_TABLE resolved for the current vertical speed: (kinds, senses, required VS)."""
+    kinds, senses, vs = [], [], []
+    for kind, sense, req in CANDIDATE_TABLE:
+        if kind == RAKind.DO_NOT_CLIMB:
+            req = min(own_vs, 0)  # what the pilot keeps flying inside the band
+        elif kind == RAKind.DO_NOT_DESCEND:
+            req = max(own_vs, 0)
+        elif req is None:
+            req = own_vs
+            sense = RASense.UPWARD if own_vs > 0 else RASense.DOWNWARD if own_vs < 0 else RASense.NONE
+        kinds.append(kind)
+        senses.append(sense)
+        vs.append(req)
+    return kinds, senses, np.array(vs, dtype=float)
+
+
+def band_edges_vs(kinds: List[RAKind], vs: np.ndarray) -> np.ndarray:
+    """
+    (K, 2) lowest and highest VS each candidate's guidance band allows: the whole band of a
+    preventive RA, which the pilot may fly anywhere in; other candidates hold their required VS.
+    """
+    out = np.repeat(np.asarray(vs, dtype=float)[:, None], 2, axis=1)
+    for i, kind in enumerate(kinds):
+        if kind in VS_LIMIT_KINDS:
+            out[i] = guidance_band(kind, int(vs[i]))
+    return out
@@ -0,0 +1,73 @@
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.tracking.track import Track
+
+G_FPM_PER_S = 32.174 * 60.0  # 1 g expressed as vertical-speed change per second
+
+# standard pilot model: 5 s to respond to a new RA at 0.25 g, 2.5 s / 0.35 g for modifications
+INITIAL_DELAY_S = 5.0
+INITIAL_ACCEL_G = 0.25
+MODIFIED_DELAY_S = 2.5
+MODIFIED_ACCEL_G = 0.35
+
+DEFAULT_TAU_S = 25.0
+MAX_LOOKAHEAD_S = 45.0
+GRID_STEP_S = 0.5
+
+
+def altitude_change_ft(vs0, target_vs, t, delay_s, accel_g):
+    """
+    Altitude gained after t seconds when the pilot holds vs0 for delay_s, then accelerates
+    at accel_g toward target_vs and holds it. All arguments broadcast.
+    """
+    vs0 = np.asarray(vs0, dtype=float)
+    dv = np.asarray(target_vs, dtype=float) - vs0
+    accel = np.asarray(accel_g, dtype=float) * G_FPM_PER_S
+    t_ramp = np.abs(dv) / accel
+    after = np.maximum(0.0, t - delay_s)
+    s = np.minimum(after, t_ramp)
+    return (vs0 * t + np.sign(dv) * accel * s * s / 2.0 + dv * np.maximum(0.0, after - t_ramp)) / 60.0
+
+
+def cpa_times(threats: List[Track]) -> np.ndarray:
+    tau = np.array([t.rangeTauSec for t in threats], dtype=float)
+    return np.clip(np.where(np.isfinite(tau), tau, DEFAULT_TAU_S), 1.0, MAX_LOOKAHEAD_S)
+
+
+def predict_separation(
+    ownship: Aircraft,
+    threats: List[Track],
+    target_vs: np.ndarray,
+    delay_s: np.ndarray,
+    accel_g: np.ndarray,
+    step_s: float = GRID_STEP_S,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Predicts ownship under each of K candidate target vertical speeds and every threat
+    (straight-line vertical) on one time grid out to the latest CPA.
+
+    Returns (separation at each threat's CPA, crossed before that CPA), both (K, M).
+    """
+    t_cpa = cpa_times(threats)
+    grid = np.arange(0.0, float(t_cpa.max()) + step_s, step_s)
+
+    own = ownship.altitudeFt + altitude_change_ft(
+        ownship.verticalRateFpm, target_vs[:, None], grid[None, :], delay_s[:, None], accel_g[:, None])  # (K, T)
+    intr_alt = np.array([t.intruder.altitudeFt for t in threats], dtype=float)
+    intr_vs = np.array([t.intruder.verticalRateFpm for t in threats], dtype=float)
+    intr = intr_alt[:, None] + intr_vs[:, None] * grid[None, :] / 60.0  # (M, T)
+
+    rel = intr[None, :, :] - own[:, None, :]  # (K, M, T)
+    k_cpa = np.minimum(np.rint(t_cpa / step_s).astype(int), grid.size - 1)
+    m = np.arange(len(threats))
+    sep = np.abs(rel[:, m, k_cpa])
+
+    # crossing: relative altitude changes sign at any grid point up to that threat's CPA
+    rel_now = rel[:, :, :1]
+    in_window = (np.arange(grid.size)[None, :] <= k_cpa[:, None])[None, :, :]
+    crossed = ((rel_now * rel < 0) & in_window).any(axis=2) | (rel_now[:, :, 0] == 0)
+    return sep, crossed
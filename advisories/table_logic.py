@@ -0,0 +1,238 @@
+from __future__ import annotations
+import argparse
+import json
+import mmap
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from tcas_sim.enums import RAKind, RASense
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.tracking.track import Track
+from tcas_sim.advisories.logic import AdvisoryEngine, CANDIDATE_TABLE, CROSSING_KIND, candidates, band_edges_vs
+from tcas_sim.advisories.prediction import altitude_change_ft, cpa_times, INITIAL_DELAY_S, INITIAL_ACCEL_G
+
+TABLE_MAGIC = b"TCASCOST"
+TABLE_VERSION = 3
+_HEADER = struct.Struct("<8sII")  # magic, version, metadata length
+_ALIGN = 64
+_CORNER_BITS = np.array([[(c >> d) & 1 for d in range(4)] for c in range(16)])
+
+
+@dataclass(frozen=True)
+class TableAxes:
+    """Grid of the cost table. ALIM is matched to the nearest entry; the other four axes are interpolated."""
+    alimFt: tuple = (300, 350, 400, 600)
+    relAltFt: tuple = tuple(range(-4000, 4001, 200))
+    ownVsFpm: tuple = tuple(range(-6000, 6001, 1000))
+    intrVsFpm: tuple = tuple(range(-6000, 6001, 1000))
+    tauSec: tuple = tuple(range(0, 41, 2))
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.alimFt), len(self.relAltFt), len(self.ownVsFpm), len(self.intrVsFpm),
+                len(self.tauSec), len(CANDIDATE_TABLE))
+
+
+# offline cost model weights
+NMAC_FT = 100
+COST_NMAC = 1000.0
+COST_ALIM_SHORTFALL = 100.0
+COST_CROSSING = 20.0
+COST_PER_1000FPM = 1.0
+INTRUDER_VS_NOISE = ((-500.0, 0.25), (0.0, 0.5), (500.0, 0.25))
+
+
+def generate_costs(axes: TableAxes) -> np.ndarray:
+    """
+    Expected cost of each candidate RA at every grid point, averaged over intruder
+    vertical-rate uncertainty: NMAC, ALIM shortfall, crossing and manoeuvre penalties.
+    Ownship follows the pilot-response model from prediction.py; a preventive action is
+    charged the worst of its required VS and the edges of its band (see logic.band_edges_vs).
+    """
+    h = np.array(axes.relAltFt, dtype=float)[:, None, None, None, None]
+    ov = np.array(axes.ownVsFpm, dtype=float)
+    iv = np.array(axes.intrVsFpm, dtype=float)[None, None, :, None, None]
+    tau = np.array(axes.tauSec, dtype=float)[None, None, None, :, None]
+
+    # target VS per (own VS, action); preventive actions depend on the current VS
+    resolved = [candidates(int(v)) for v in ov]
+    target = np.stack([vs for _, _, vs in resolved])[None, :, None, None, :]
+    edges = np.stack([band_edges_vs(kinds, vs) for kinds, _, vs in resolved])
+    lo, hi = (edges[None, :, None, None, :, e] for e in (0, 1))
+    disruption = np.abs(target - ov[None, :, None, None, None]) / 1000.0 * COST_PER_1000FPM
+
+    # ownship climb under the standard initial-response pilot model
+    own_dz = altitude_change_ft(ov[None, :, None, None, None], target, tau, INITIAL_DELAY_S, INITIAL_ACCEL_G)
+    lo_dz, hi_dz = (altitude_change_ft(ov[None, :, None, None, None], e, tau, INITIAL_DELAY_S, INITIAL_ACCEL_G)
+                    for e in (lo, hi))
+
+    out = np.empty(axes.shape, dtype=np.float32)
+    for a, alim in enumerate(axes.alimFt):
+        cost = np.zeros(np.broadcast_shapes(h.shape, target.shape, iv.shape, tau.shape), dtype=float)
+        for dv, w in INTRUDER_VS_NOISE:
+            intr_dz = (iv + dv) * tau / 60.0
+            rel_cpa = h + intr_dz - own_dz
+            rel_lo, rel_hi = h + intr_dz - lo_dz, h + intr_dz - hi_dz
+            sep = np.minimum(np.abs(rel_cpa), np.minimum(np.abs(rel_lo), np.abs(rel_hi)))
+            crossing = (h == 0) | (h * rel_cpa < 0) | (h * rel_lo < 0) | (h * rel_hi < 0)
+            cost += w * (COST_NMAC * (sep < NMAC_FT)
+                         + COST_ALIM_SHORTFALL * np.maximum(0.0, 1.0 - sep / alim)
+                         + COST_CROSSING * crossing)
+        out[a] = cost + disruption
+    return out
+
+
+def build_table(path: str, axes: TableAxes = TableAxes()) -> None:
+    costs = generate_costs(axes)
+    meta = json.dumps({
+        "axes": {k: list(getattr(axes, k)) for k in TableAxes.__dataclass_fields__},
+        "actions": [k.name for k, _, _ in CANDIDATE_TABLE],
+        "shape": list(costs.shape),
+        "dtype": "<f4",
+    }).encode()
+    head = _HEADER.size + len(meta)
+    pad = (-head) % _ALIGN
+    with open(path, "wb") as fh:
+        fh.write(_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(meta)))
+        fh.write(meta)
+        fh.write(b"\0" * pad)
+        fh.write(costs.astype("<f4").tobytes())
+
+
+class CostTable:
+    """
+    Read-only view over a table file through mmap: every process that opens the same
+    file shares one physical copy in the page cache.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError(f"{path}: not a version {TABLE_VERSION} cost table")
+        meta = json.loads(self._mm[_HEADER.size:_HEADER.size + meta_len])
+        if meta["actions"] != [k.name for k, _, _ in CANDIDATE_TABLE]:
+            raise ValueError(f"{path}: action set does not match this build, regenerate the table")
+
+        head = _HEADER.size + meta_len
+        offset = head + (-head) % _ALIGN
+        shape = tuple(meta["shape"])
+        self.costs = np.frombuffer(self._mm, dtype=meta["dtype"], count=int(np.prod(shape)), offset=offset).reshape(shape)
+        self.axes = TableAxes(**{k: tuple(v) for k, v in meta["axes"].items()})
+        self._grid = [np.array(getattr(self.axes, k), dtype=float)
+                      for k in ("relAltFt", "ownVsFpm", "intrVsFpm", "tauSec")]
+        self._alims = np.array(self.axes.alimFt, dtype=float)
+
+    def lookup(self, alim_ft: float, rel_alt: np.ndarray, own_vs: np.ndarray, intr_vs: np.ndarray, tau: np.ndarray) -> np.ndarray:
+        """Multilinear interpolation for M queries at once; returns (M, actions) costs."""
+        table = self.costs[int(np.abs(self._alims - alim_ft).argmin())]
+        lo_idx, frac = [], []
+        for grid, q in zip(self._grid, (rel_alt, own_vs, intr_vs, tau)):
+            q = np.clip(np.asarray(q, dtype=float), grid[0], grid[-1])
+            i = np.clip(np.searchsorted(grid, q, side="right") - 1, 0, grid.size - 2)
+            lo_idx.append(i)
+            frac.append((q - grid[i]) / (grid[i + 1] - grid[i]))
+
+        # all 16 hypercube corners in one gather: (M, 16, actions)
+        bits = _CORNER_BITS
+        corners = table[tuple(lo_idx[d][:, None] + bits[:, d] for d in range(4))]
+        w = np.ones((lo_idx[0].size, 16))
+        for d in range(4):
+            f = frac[d][:, None]
+            w *= np.where(bits[:, d], f, 1.0 - f)
+        return np.einsum("mc,mca->ma", w, corners)
+
+    def close(self) -> None:
+        self.costs = None
+        self._mm.close()
+
+
+class TableLogic:
+    """
+    Pluggable RA selection for AdvisoryEngine(logic=...): per-threat costs from the
+    table are looked up in one batch and summed, and the cheapest action wins.
+    """
+    def __init__(self, table: CostTable):
+        self.table = table
+
+    @staticmethod
+    def open(path: str) -> "TableLogic":
+        return TableLogic(CostTable(path))
+
+    def select_ra(self, threats: List[Track], ownship: Aircraft, alim_ft: int) -> tuple[RAKind, RASense, int]:
+        own_vs = ownship.verticalRateFpm
+        kinds, senses, vs = candidates(own_vs)
+
+        rel = np.array([t.intruder.altitudeFt - ownship.altitudeFt for t in threats], dtype=float)
+        intr_vs = np.array([t.intruder.verticalRateFpm for t in threats], dtype=float)
+        tau = np.array([t.rangeTauSec for t in threats], dtype=float)
+        tau = np.where(np.isfinite(tau), tau, 25.0)
+
+        cost = self.table.lookup(alim_ft, rel, np.full(rel.shape, float(own_vs)), intr_vs, tau).sum(axis=0)
+        best = int(cost.argmin())
+
+        t_cpa = cpa_times(threats)
+        rel_cpa = rel + intr_vs * t_cpa / 60.0 - altitude_change_ft(own_vs, vs[best], t_cpa, INITIAL_DELAY_S, INITIAL_ACCEL_G)
+        crosses = bool(((rel == 0) | (rel * rel_cpa < 0)).any())
+        kind = CROSSING_KIND.get(kinds[best], kinds[best]) if crosses else kinds[best]
+        return kind, senses[best], int(vs[best])
+
+
+def compare(table_path: str, samples: int = 20000, max_threats: int = 3, seed: int = 0) -> dict:
+    """Random threat geometries through both the hand-coded and the table logic: agreement and cost per call."""
+    from tcas_sim.enums import TrackState
+
+    rng = np.random.default_rng(seed)
+    hand = AdvisoryEngine()
+    table = TableLogic.open(table_path)
+    agree = same_sense = 0
+    t_hand = t_table = 0.0
+    for _ in range(samples):
+        own = Aircraft("OWN", 12000, int(rng.choice(np.arange(-3000, 3001, 500))), 250.0, 0.0)
+        threats = []
+        for k in range(int(rng.integers(1, max_threats + 1))):
+            ac = Aircraft(f"T{k}", int(own.altitudeFt + rng.integers(-800, 801)),
+                          int(rng.choice(np.arange(-3000, 3001, 500))), 400.0, 0.0)
+            tau = float(rng.uniform(5.0, 35.0))
+            threats.append(Track(ac, 0.0, tau * 0.2, ac.altitudeFt - own.altitudeFt, -720.0, 720.0,
+                                 ac.verticalRateFpm, 0, tau, float("inf"), True, TrackState.THREAT_RA, int(tau), 0.0))
+        t0 = time.perf_counter()
+        a = hand._select_ra(threats, own, 400)
+        t1 = time.perf_counter()
+        b = table.select_ra(threats, own, 400)
+        t2 = time.perf_counter()
+        t_hand += t1 - t0
+        t_table += t2 - t1
+        agree += a == b
+        same_sense += a[1] == b[1]
+    return {"samples": samples, "agree": agree / samples, "sameSense": same_sense / samples,
+            "handUs": t_hand / samples * 1e6, "tableUs": t_table / samples * 1e6}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Build or evaluate the table-driven RA logic cost table.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("path")
+    c = sub.add_parser("compare")
+    c.add_argument("path")
+    c.add_argument("--samples", type=int, default=20000)
+    c.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        build_table(args.path)
+        print(f"wrote {args.path} shape={TableAxes().shape}")
+    else:
+        print(json.dumps(compare(args.path, args.samples, seed=args.seed), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
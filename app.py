@@ -1,4 +1,6 @@
 from __future__ import annotations
+import sys
+
 from PySide6.QtWidgets import QApplication
 
 from tcas_sim.sim.simulator import Simulator
@@ -7,7 +9,8 @@ from tcas_sim.gui.main_window import MainWindow
 
 def main():
     app = QApplication([])
-    sim = Simulator()  # you customize time_scale, intruders, probability here if you want
+    # customize time_scale, intruders, probability etc. in a scenario file (see sim.scenario)
+    sim = Simulator.from_scenario(sys.argv[1]) if len(sys.argv) > 1 else Simulator()
     w = MainWindow(sim)
     w.resize(1320, 760)
     w.show()
@@ -16,3 +16,6 @@ class Aircraft:
 
     # Demo "autopilot bug" (not in UML; simulator convenience)
     targetAltitudeFt: int = 0
+
+    # Dense simulation ID from core.registry.AircraftRegistry (-1 = unregistered)
+    id: int = -1
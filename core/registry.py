@@ -0,0 +1,94 @@
+from __future__ import annotations
+import heapq
+from typing import Dict, List, Optional
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.core.transponder import Transponder
+
+MODE_S_ADDRESS_BITS = 24
+
+
+def mode_s_int(address: str | int) -> int:
+    """24-bit Mode S (ICAO) address as an int; accepts the hex string carried by Transponder."""
+    value = int(address, 16) if isinstance(address, str) else int(address)
+    if not 0 <= value < (1 << MODE_S_ADDRESS_BITS):
+        raise ValueError(f"Mode S address {address!r} is not 24-bit")
+    return value
+
+
+class AircraftRegistry:
+    """
+    Dense integer aircraft IDs: every registered aircraft gets the lowest free ID (released IDs
+    are reused), so per-aircraft state can live in lists/arrays indexed by Aircraft.id.
+    Aircraft with a transponder are also indexed by their 24-bit Mode S address, which must
+    be unique among registered aircraft.
+    """
+    def __init__(self):
+        self.aircraft: List[Optional[Aircraft]] = []
+        self.transponders: List[Optional[Transponder]] = []
+        self.address: List[int] = []  # -1 without a transponder
+        self.by_address: Dict[int, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.aircraft) - len(self._free)
+
+    @property
+    def capacity(self) -> int:
+        """Upper bound (exclusive) of the IDs in use; size for arrays indexed by ID."""
+        return len(self.aircraft)
+
+    def register(self, ac: Aircraft, xpdr: Optional[Transponder] = None) -> int:
+        addr = -1
+        if xpdr is not None:
+            addr = mode_s_int(xpdr.modeSAddress)
+            if addr in self.by_address:
+                other = self.aircraft[self.by_address[addr]]
+                raise ValueError(f"Mode S address {addr:06X} already in use by {other.callsign}")
+
+        if self._free:
+            ac_id = heapq.heappop(self._free)
+            self.aircraft[ac_id] = ac
+            self.transponders[ac_id] = xpdr
+            self.address[ac_id] = addr
+        else:
+            ac_id = len(self.aircraft)
+            self.aircraft.append(ac)
+            self.transponders.append(xpdr)
+            self.address.append(addr)
+        if addr >= 0:
+            self.by_address[addr] = ac_id
+        ac.id = ac_id
+        return ac_id
+
+    def release(self, ac_id: int) -> None:
+        ac = self.aircraft[ac_id]
+        if ac is None:
+            return
+        if self.address[ac_id] >= 0:
+            del self.by_address[self.address[ac_id]]
+        self.aircraft[ac_id] = None
+        self.transponders[ac_id] = None
+        self.address[ac_id] = -1
+        heapq.heappush(self._free, ac_id)
+        ac.id = -1
+
+    def lookup(self, address: str | int) -> Optional[Aircraft]:
+        ac_id = self.by_address.get(mode_s_int(address))
+        return None if ac_id is None else self.aircraft[ac_id]
+
+    def restore(self, entries: List[tuple[Aircraft, Optional[Transponder]]]) -> None:
+        """Rebuilds the registry from aircraft that already carry their IDs (see sim.snapshot)."""
+        self.__init__()
+        size = max((ac.id for ac, _ in entries), default=-1) + 1
+        self.aircraft = [None] * size
+        self.transponders = [None] * size
+        self.address = [-1] * size
+        for ac, xpdr in entries:
+            self.aircraft[ac.id] = ac
+            self.transponders[ac.id] = xpdr
+            if xpdr is not None:
+                addr = self.address[ac.id] = mode_s_int(xpdr.modeSAddress)
+                self.by_address[addr] = ac.id
+        self._free = [i for i, ac in enumerate(self.aircraft) if ac is None]
+        heapq.heapify(self._free)
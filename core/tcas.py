@@ -1,12 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, TYPE_CHECKING
 
 from tcas_sim.enums import TCASVersion, TCASMode, SensitivityLevel
 from tcas_sim.core.aircraft import Aircraft
 from tcas_sim.sensitivity.thresholds import SensitivityProfile, SensitivityThresholds
-from tcas_sim.tracking.track import Track
-from tcas_sim.advisories.advisory import Advisory
+
+if TYPE_CHECKING:  # annotation-only; importing these eagerly forms a cycle via tracking/advisories
+    from tcas_sim.tracking.track import Track
+    from tcas_sim.advisories.advisory import Advisory
 
 
 @dataclass
@@ -20,7 +22,7 @@ class TCAS:
     currentSL: SensitivityLevel = SensitivityLevel.SL6
     activeThresholds: SensitivityThresholds = field(init=False)
 
-    tracks: Dict[str, Track] = field(default_factory=dict)
+    tracks: Dict[int, Track] = field(default_factory=dict)  # keyed by Aircraft.id
     advisories: List[Advisory] = field(default_factory=list)
 
     def __post_init__(self) -> None:
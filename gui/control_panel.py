@@ -3,7 +3,9 @@ from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QSizePolicy, QApplication
 
 from tcas_sim.sim.simulator import Simulator
-from tcas_sim.gui.traffic_scope import TrafficScope
+from tcas_sim.gui.traffic_scope import (
+    TrafficScope, ALT_WINDOW_NORM_FT, ALT_WINDOW_ABOVE_FT, ALT_WINDOW_BELOW_FT,
+)
 from tcas_sim.gui.ra_vsi import RAVsiWidget
 
 
@@ -27,6 +29,13 @@ class ControlPanel(QWidget):
             b.clicked.connect(lambda _=False, rr=r: self.scope.set_range_nm(rr))
             rng_row.addWidget(b)
         layout.addLayout(rng_row)
+
+        alt_row = QHBoxLayout()
+        for name, window in (("ABV", ALT_WINDOW_ABOVE_FT), ("NORM", ALT_WINDOW_NORM_FT), ("BLW", ALT_WINDOW_BELOW_FT)):
+            b = QPushButton(name)
+            b.clicked.connect(lambda _=False, w=window: self.scope.set_altitude_window(*w))
+            alt_row.addWidget(b)
+        layout.addLayout(alt_row)
         layout.addSpacing(10)
 
         self.lbl_sl = QLabel("")
@@ -40,6 +49,7 @@ class ControlPanel(QWidget):
             lab.setFrameShadow(QFrame.Sunken)
             lab.setMargin(6)
             layout.addWidget(lab)
+        self._label_values: dict = {}
 
         layout.addSpacing(10)
 
@@ -103,10 +113,29 @@ class ControlPanel(QWidget):
             delta_deg *= 3
         self.sim.ownship.headingDeg = (self.sim.ownship.headingDeg + delta_deg) % 360.0
 
-    def refresh(self):
+    def refresh(self) -> int:
+        """Update labels whose underlying value changed; returns how many were touched."""
         own = self.sim.ownship
-        self.lbl_sl.setText(f"SL:   {self.sim.tcas.currentSL.name}")
-        self.lbl_alt.setText(f"ALT:  {own.altitudeFt:6d} ft")
-        self.lbl_vs.setText(f"VS:   {own.verticalRateFpm:6d} fpm")
-        self.lbl_talt.setText(f"TALT: {own.targetAltitudeFt:6d} ft")
-        self.lbl_ap.setText(f"AP:   {self.sim.ap_mode}   CMDVS:{self.sim.cmd_vs_fpm:+d}")
+        changed = 0
+        if self._changed("sl", self.sim.tcas.currentSL):
+            self.lbl_sl.setText(f"SL:   {self.sim.tcas.currentSL.name}")
+            changed += 1
+        if self._changed("alt", own.altitudeFt):
+            self.lbl_alt.setText(f"ALT:  {own.altitudeFt:6d} ft")
+            changed += 1
+        if self._changed("vs", own.verticalRateFpm):
+            self.lbl_vs.setText(f"VS:   {own.verticalRateFpm:6d} fpm")
+            changed += 1
+        if self._changed("talt", own.targetAltitudeFt):
+            self.lbl_talt.setText(f"TALT: {own.targetAltitudeFt:6d} ft")
+            changed += 1
+        if self._changed("ap", (self.sim.ap_mode, self.sim.cmd_vs_fpm)):
+            self.lbl_ap.setText(f"AP:   {self.sim.ap_mode}   CMDVS:{self.sim.cmd_vs_fpm:+d}")
+            changed += 1
+        return changed
+
+    def _changed(self, key: str, value) -> bool:
+        if key in self._label_values and self._label_values[key] == value:
+            return False
+        self._label_values[key] = value
+        return True
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+
+@dataclass
+class FrameStats:
+    """
+    Frame-time and dropped-frame bookkeeping for the GUI timer loop.
+    A frame counts as dropped when the timer interval overran the frame budget.
+    """
+    budget_s: float
+
+    frames: int = 0
+    dropped: int = 0
+    repaints: int = 0
+
+    last_frame_s: float = 0.0
+    max_frame_s: float = 0.0
+    total_frame_s: float = 0.0
+
+    def record(self, frame_s: float, interval_s: float, repaints: int = 0) -> None:
+        self.frames += 1
+        self.repaints += repaints
+        self.last_frame_s = frame_s
+        self.total_frame_s += frame_s
+        if frame_s > self.max_frame_s:
+            self.max_frame_s = frame_s
+
+        # timer interval covering several budgets => the frames in between never happened
+        if self.budget_s > 0 and interval_s > 1.5 * self.budget_s:
+            self.dropped += int(interval_s / self.budget_s + 0.5) - 1
+
+    @property
+    def mean_frame_s(self) -> float:
+        return self.total_frame_s / self.frames if self.frames else 0.0
+
+    def reset(self) -> None:
+        self.frames = 0
+        self.dropped = 0
+        self.repaints = 0
+        self.last_frame_s = 0.0
+        self.max_frame_s = 0.0
+        self.total_frame_s = 0.0
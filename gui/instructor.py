@@ -0,0 +1,146 @@
+from __future__ import annotations
+import argparse
+import math
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+from PySide6.QtCore import Qt, QObject, QTimer
+from PySide6.QtWidgets import QApplication, QMainWindow, QWidget, QGridLayout, QVBoxLayout, QHBoxLayout, QLabel
+
+from tcas_sim.sim.simulator import Simulator
+from tcas_sim.sim.multi import TrafficFrame, equip_nearest, take_frame, view_transforms
+from tcas_sim.gui.traffic_scope import TrafficScope
+from tcas_sim.gui.ra_vsi import RAVsiWidget
+from tcas_sim.gui.frame_stats import FrameStats
+from tcas_sim.gui.main_window import FRAME_INTERVAL_MS
+
+# per-view cell: the 520 px scope scene scaled down to fit, VSI beside it
+SCOPE_PX = 380
+VSI_PX = (210, 380)
+
+_NO_TARGETS = (np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int8))
+
+
+class InstructorWindow(QMainWindow):
+    """A grid of scope/VSI pairs, one per view row of the station's TrafficFrame; never reads the sim itself."""
+    def __init__(self, rows: Sequence[int], columns: int = 3):
+        super().__init__()
+        self.setWindowTitle("TCAS-II Instructor Station")
+        self._cells = []
+        self._captions: List[Optional[str]] = []
+
+        root = QWidget()
+        grid = QGridLayout(root)
+        grid.setContentsMargins(10, 10, 10, 10)
+        for n, row in enumerate(rows):
+            cell = QWidget()
+            col = QVBoxLayout(cell)
+            caption = QLabel("")
+            caption.setStyleSheet("color: white; font-family: Menlo, monospace; font-size: 13px; font-weight: 700;")
+            col.addWidget(caption)
+            pair = QHBoxLayout()
+            scope, vsi = TrafficScope(), RAVsiWidget()
+            scope.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            scope.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            scope.setFixedSize(SCOPE_PX, SCOPE_PX)
+            scope.scale(SCOPE_PX / 520.0, SCOPE_PX / 520.0)
+            vsi.setFixedSize(*VSI_PX)
+            pair.addWidget(scope)
+            pair.addWidget(vsi)
+            col.addLayout(pair)
+            grid.addWidget(cell, n // columns, n % columns)
+            self._cells.append((row, scope, vsi, caption))
+            self._captions.append(None)
+        self.setCentralWidget(root)
+        self.setStyleSheet("background-color: #202020;")
+
+    def show_frame(self, frame: TrafficFrame, rng: np.ndarray, bearing: np.ndarray, rel_alt: np.ndarray) -> int:
+        """Pushes this window's rows of the shared frame; returns the number of repaints scheduled."""
+        repaints = 0
+        for n, (row, scope, vsi, caption) in enumerate(self._cells):
+            ra = frame.ra[row]
+            if frame.live[row]:
+                own = frame.views[row]
+                text = f"{frame.callsigns[row]}  {'RA ' + ra.kind.name if ra is not None else ''}"
+                scope.set_heading_deg(frame.headingDeg[own])
+                scope.set_ra(ra)
+                scope.render_targets(bearing[row], rng[row], rel_alt[row], frame.states[row])
+                vsi.set_state(int(frame.verticalRateFpm[own]), ra)
+            else:
+                text = "(out of range)"
+                scope.set_ra(None)
+                scope.render_targets(*_NO_TARGETS)
+            if text != self._captions[n]:
+                self._captions[n] = text
+                caption.setText(text)
+            repaints += int(scope.commit_frame()) + int(vsi.commit_frame())
+        return repaints
+
+
+class InstructorStation(QObject):
+    """
+    Drives one shared Simulator for any number of InstructorWindows: each frame steps the sim once,
+    copies one TrafficFrame for every view and computes all views' transforms in one batch.
+    """
+    def __init__(self, sim: Simulator, views: Sequence[int]):
+        super().__init__()
+        self.sim = sim
+        self.views = list(views)
+        self.windows: List[InstructorWindow] = []
+        self.frame_stats = FrameStats(budget_s=FRAME_INTERVAL_MS / 1000.0)
+
+        self._last = time.time()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(FRAME_INTERVAL_MS)
+
+    def add_window(self, rows: Sequence[int], columns: int = 3) -> InstructorWindow:
+        """A window showing the given rows (indices into views)."""
+        w = InstructorWindow(rows, columns)
+        self.windows.append(w)
+        return w
+
+    def tick(self):
+        t0 = time.perf_counter()
+        now = time.time()
+        dt = now - self._last
+        self._last = now
+
+        self.sim.step(dt)
+        frame = take_frame(self.sim, self.views)
+        rng, bearing, rel_alt = view_transforms(frame)
+        repaints = sum(w.show_frame(frame, rng, bearing, rel_alt) for w in self.windows)
+        self.frame_stats.record(time.perf_counter() - t0, dt, repaints)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Instructor station: several TCAS-equipped aircraft sharing one sim.")
+    ap.add_argument("--scenario", help="scenario file (see sim.scenario); default: a random population")
+    ap.add_argument("--views", type=int, default=4, help="ownship plus the views-1 nearest intruders, each equipped")
+    ap.add_argument("--traffic", type=int, default=40, help="intruders drawn around ownship without a scenario")
+    ap.add_argument("--windows", type=int, default=1, help="spread the views over this many windows")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+    if args.scenario:
+        sim = Simulator.from_scenario(args.scenario)
+    else:
+        sim = Simulator(seed=args.seed)
+        sim.spawn_population(args.traffic, seed=args.seed)
+    views = equip_nearest(sim, max(0, args.views - 1))
+
+    station = InstructorStation(sim, views)
+    per = math.ceil(len(views) / max(1, args.windows))
+    for start in range(0, len(views), per):
+        rows = range(start, min(len(views), start + per))
+        w = station.add_window(rows, columns=min(3, len(rows)))
+        w.show()
+    app.exec()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
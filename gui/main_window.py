@@ -7,6 +7,10 @@ from tcas_sim.sim.simulator import Simulator
 from tcas_sim.gui.traffic_scope import TrafficScope
 from tcas_sim.gui.ra_vsi import RAVsiWidget
 from tcas_sim.gui.control_panel import ControlPanel
+from tcas_sim.gui.frame_stats import FrameStats
+from tcas_sim.sim.events import ResolutionAdvisoryChanged
+
+FRAME_INTERVAL_MS = 33
 
 
 class MainWindow(QMainWindow):
@@ -26,10 +30,16 @@ class MainWindow(QMainWindow):
         row.addWidget(self.panel, stretch=1)
         self.setCentralWidget(root)
 
+        self.frame_stats = FrameStats(budget_s=FRAME_INTERVAL_MS / 1000.0)
+
+        # RA state only changes on transitions; no need to re-push it every tick
+        self._ra = self.sim.advisory_engine.ra
+        self.sim.events.subscribe(ResolutionAdvisoryChanged, self._on_ra_changed)
+
         self._last = time.time()
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.tick)
-        self.timer.start(33)
+        self.timer.start(FRAME_INTERVAL_MS)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Left:
@@ -39,17 +49,24 @@ class MainWindow(QMainWindow):
         else:
             super().keyPressEvent(event)
 
+    def _on_ra_changed(self, ev: ResolutionAdvisoryChanged) -> None:
+        self._ra = ev.ra
+        self.scope.set_ra(ev.ra)
+
     def tick(self):
+        t0 = time.perf_counter()
         now = time.time()
         dt = now - self._last
         self._last = now
 
-        ta, ra, _display_entries = self.sim.step(dt)
+        self.sim.step(dt)
 
+        # collect dirty state first, then commit one repaint per widget
         self.scope.set_heading_deg(self.sim.ownship.headingDeg)
-        self.scope.set_ra(ra)
         self.scope.set_banner(self.sim.banner())
         self.scope.render_tracks(list(self.sim.tcas.tracks.values()))
-
+        self.vsi.set_state(self.sim.ownship.verticalRateFpm, self._ra)
         self.panel.refresh()
-        self.vsi.set_state(self.sim.ownship.verticalRateFpm, ra)
+
+        repaints = int(self.scope.commit_frame()) + int(self.vsi.commit_frame())
+        self.frame_stats.record(time.perf_counter() - t0, dt, repaints)
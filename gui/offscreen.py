@@ -0,0 +1,120 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence
+
+from tcas_sim.sim.clock import ManualClock
+from tcas_sim.sim.recording import FrameRecord, record_headless
+from tcas_sim.sim.simulator import Simulator
+
+SCOPE_SIZE = (520, 520)
+VSI_SIZE = (260, 520)
+FRAME_SIZE = (SCOPE_SIZE[0] + VSI_SIZE[0], SCOPE_SIZE[1])
+
+FORMATS = ("png", "raw")
+
+# per-worker widgets, created once by _init_worker
+_worker = None
+
+
+class _OffscreenRenderer:
+    """Scope + VSI pair that is never shown; frames are painted straight into a QImage."""
+    def __init__(self):
+        from PySide6.QtCore import Qt
+        from PySide6.QtWidgets import QApplication
+        from tcas_sim.gui.traffic_scope import TrafficScope
+        from tcas_sim.gui.ra_vsi import RAVsiWidget
+
+        self.app = QApplication.instance() or QApplication([])
+        self.scope = TrafficScope()
+        self.vsi = RAVsiWidget()
+        self.scope.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.scope.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        for w, size in ((self.scope, SCOPE_SIZE), (self.vsi, VSI_SIZE)):
+            w.setAttribute(Qt.WA_DontShowOnScreen, True)
+            w.resize(*size)
+            w.show()
+
+    def render(self, rec: FrameRecord):
+        from PySide6.QtCore import Qt
+        from PySide6.QtGui import QImage, QPainter
+
+        self.scope.set_heading_deg(rec.headingDeg)
+        self.scope.set_ra(rec.ra)
+        self.scope.set_banner(rec.banner)
+        self.scope.render_tracks(rec.tracks)
+        self.vsi.set_state(rec.verticalRateFpm, rec.ra)
+
+        img = QImage(FRAME_SIZE[0], FRAME_SIZE[1], QImage.Format_RGBA8888)
+        img.fill(Qt.black)
+        p = QPainter(img)
+        # grab() goes through paintEvent, so the scope foreground (bezel, banner) is included
+        p.drawPixmap(0, 0, self.scope.grab())
+        p.drawPixmap(SCOPE_SIZE[0], 0, self.vsi.grab())
+        p.end()
+        return img
+
+
+def _init_worker() -> None:
+    global _worker
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    _worker = _OffscreenRenderer()
+
+
+def _render_slice(frames: Sequence[FrameRecord], out_dir: str, fmt: str) -> int:
+    for rec in frames:
+        img = _worker.render(rec)
+        path = os.path.join(out_dir, f"frame_{rec.index:06d}.{fmt}")
+        if fmt == "png":
+            img.save(path, "PNG")
+        else:
+            with open(path, "wb") as fh:
+                fh.write(bytes(img.constBits()))
+    return len(frames)
+
+
+def render_frames(
+    frames: List[FrameRecord],
+    out_dir: str,
+    fmt: str = "png",
+    workers: int | None = None,
+    chunk: int = 120,
+) -> int:
+    """
+    Renders recorded frames to `out_dir` as PNG files or raw RGBA8888 buffers
+    (FRAME_SIZE, row-major, no header). Slices of `chunk` frames are spread over
+    a process pool; each worker owns its own offscreen QApplication.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown frame format {fmt!r}, expected one of {FORMATS}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as fh:
+        json.dump({"format": fmt, "width": FRAME_SIZE[0], "height": FRAME_SIZE[1],
+                   "pixel": "RGBA8888", "frames": len(frames)}, fh)
+
+    slices = [frames[i:i + chunk] for i in range(0, len(frames), chunk)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return sum(pool.map(_render_slice, slices, [out_dir] * len(slices), [fmt] * len(slices)))
+
+
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description="Render a headless simulator run to an image sequence.")
+    ap.add_argument("out_dir")
+    ap.add_argument("--minutes", type=float, default=1.0)
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--format", choices=FORMATS, default="png")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--time-scale", type=float, default=1.5)
+    args = ap.parse_args(argv)
+
+    sim = Simulator(time_scale=args.time_scale, clock=ManualClock())
+    frames = record_headless(sim, args.minutes * 60.0, args.fps)
+    n = render_frames(frames, args.out_dir, args.format, args.workers)
+    print(f"rendered {n} frames to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
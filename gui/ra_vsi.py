@@ -2,7 +2,7 @@ from __future__ import annotations
 from PySide6.QtCore import Qt, QRectF, QSize
 from PySide6.QtGui import QPainter, QPen, QBrush, QFont
 from PySide6.QtWidgets import QWidget
-from tcas_sim.advisories.advisory import ResolutionAdvisory
+from tcas_sim.advisories.advisory import ResolutionAdvisory, CLIMB_KINDS, DESCEND_KINDS, VS_LIMIT_KINDS
 from tcas_sim.enums import RAKind
 
 
@@ -12,11 +12,21 @@ class RAVsiWidget(QWidget):
         self.setMinimumSize(QSize(260, 380))
         self.vs_fpm = 0
         self.ra: ResolutionAdvisory | None = None
+        self._dirty = True
 
     def set_state(self, vs_fpm: int, ra: ResolutionAdvisory | None) -> None:
-        self.vs_fpm = int(vs_fpm)
+        vs_fpm = int(vs_fpm)
+        if vs_fpm != self.vs_fpm or _ra_key(ra) != _ra_key(self.ra):
+            self._dirty = True
+        self.vs_fpm = vs_fpm
         self.ra = ra
+
+    def commit_frame(self) -> bool:
+        if not self._dirty:
+            return False
+        self._dirty = False
         self.update()
+        return True
 
     def paintEvent(self, _):
         p = QPainter(self)
@@ -52,10 +62,10 @@ class RAVsiWidget(QWidget):
             kind = self.ra.kind
             req = self.ra.requiredVerticalRateFpm
 
-            if kind == RAKind.CLIMB:
+            if kind in CLIMB_KINDS:
                 y_red_start = y_for(+500)
                 p.fillRect(QRectF(18, y_red_start, w - 36, bottom - y_red_start), QBrush(Qt.red))
-            elif kind == RAKind.DESCEND:
+            elif kind in DESCEND_KINDS:
                 y_red_end = y_for(-500)
                 p.fillRect(QRectF(18, top, w - 36, max(0, y_red_end - top)), QBrush(Qt.red))
             elif kind == RAKind.LEVEL_OFF:
@@ -63,10 +73,19 @@ class RAVsiWidget(QWidget):
                 y2 = y_for(-band_half)
                 p.fillRect(QRectF(18, top, w - 36, max(0, min(y1, y2) - top)), QBrush(Qt.red))
                 p.fillRect(QRectF(18, max(y1, y2), w - 36, max(0, bottom - max(y1, y2))), QBrush(Qt.red))
+            elif kind in VS_LIMIT_KINDS:
+                # preventive: red outside the allowed band, no green target
+                if self.ra.maxAllowedVSFpm < max_vs:
+                    y_max = y_for(self.ra.maxAllowedVSFpm)
+                    p.fillRect(QRectF(18, top, w - 36, max(0, y_max - top)), QBrush(Qt.red))
+                if self.ra.minAllowedVSFpm > -max_vs:
+                    y_min = y_for(self.ra.minAllowedVSFpm)
+                    p.fillRect(QRectF(18, y_min, w - 36, max(0, bottom - y_min)), QBrush(Qt.red))
 
-            y1 = y_for(req + band_half)
-            y2 = y_for(req - band_half)
-            p.fillRect(QRectF(18, min(y1, y2), w - 36, abs(y2 - y1)), QBrush(Qt.darkGreen))
+            if kind not in VS_LIMIT_KINDS:
+                y1 = y_for(req + band_half)
+                y2 = y_for(req - band_half)
+                p.fillRect(QRectF(18, min(y1, y2), w - 36, abs(y2 - y1)), QBrush(Qt.darkGreen))
 
         y_vs = y_for(self.vs_fpm)
         p.setPen(QPen(Qt.cyan, 3))
@@ -83,3 +102,7 @@ class RAVsiWidget(QWidget):
         if self.ra:
             label = f"RA: {self.ra.kind.name} ({self.ra.requiredVerticalRateFpm:+d} fpm)"
         p.drawText(18, 20, label)
+
+
+def _ra_key(ra: ResolutionAdvisory | None):
+    return None if ra is None else (ra.kind, ra.requiredVerticalRateFpm)
@@ -1,15 +1,37 @@
 from __future__ import annotations
+import heapq
 import math
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, QRectF
-from PySide6.QtGui import QPainter, QPen, QBrush, QPainterPath, QFont
+import numpy as np
+
+from PySide6.QtCore import Qt, QRectF, QPointF
+from PySide6.QtGui import QPainter, QPen, QBrush, QPainterPath, QFont, QPolygonF
 from PySide6.QtWidgets import QGraphicsScene, QGraphicsView
 
 from tcas_sim.tracking.track import Track
 from tcas_sim.enums import DisplayColor, SymbolType, TrackState
-from tcas_sim.advisories.advisory import ResolutionAdvisory
-from tcas_sim.enums import RAKind
+from tcas_sim.advisories.advisory import ResolutionAdvisory, CLIMB_KINDS, DESCEND_KINDS
+from tcas_sim.sim.multi import TRACK_STATES
+
+# targets drawn at most, highest priority first (RA, TA, proximate, other; nearest first within each)
+MAX_DISPLAYED_TARGETS = 30
+
+# relative altitude window (below, above) for proximate/other traffic; TAs and RAs always show
+ALT_WINDOW_NORM_FT = (-2700, 2700)
+ALT_WINDOW_ABOVE_FT = (-2700, 9900)
+ALT_WINDOW_BELOW_FT = (-9900, 2700)
+
+# per state: display priority (lower wins), color, symbol, filled; later states draw on top
+_STYLES = {
+    TrackState.THREAT_RA: (0, Qt.red, SymbolType.SQUARE, True),
+    TrackState.INTRUDER_TA: (1, Qt.yellow, SymbolType.CIRCLE, True),
+    TrackState.PROXIMATE: (2, Qt.cyan, SymbolType.DIAMOND, True),
+    TrackState.OTHER: (3, Qt.white, SymbolType.DIAMOND, False),
+}
+_PRIORITY_BY_CODE = np.array([_STYLES[s][0] for s in TRACK_STATES])
+_ALWAYS_SHOWN_CODES = np.array([s in (TrackState.THREAT_RA, TrackState.INTRUDER_TA) for s in TRACK_STATES])
+_DIAMOND = QPolygonF([QPointF(0, -7), QPointF(7, 0), QPointF(0, 7), QPointF(-7, 0), QPointF(0, -7)])
 
 
 class TrafficScope(QGraphicsView):
@@ -21,6 +43,8 @@ class TrafficScope(QGraphicsView):
         self.setFrameShape(QGraphicsView.NoFrame)
 
         self.selectedRangeNm = 5.0
+        self.altitudeWindowFt: Tuple[int, int] = ALT_WINDOW_NORM_FT
+        self.maxTargets = MAX_DISPLAYED_TARGETS
         self.ownshipHeadingDeg = 0.0
         self.active_ra: Optional[ResolutionAdvisory] = None
         self.banner_text: str = ""
@@ -28,24 +52,8 @@ class TrafficScope(QGraphicsView):
         self._bezel_outer_r = 242
         self._bezel_thickness = 22
 
-    def set_range_nm(self, rng: float) -> None:
-        self.selectedRangeNm = float(rng)
-        self.viewport().update()
-
-    def set_heading_deg(self, hdg: float) -> None:
-        self.ownshipHeadingDeg = float(hdg) % 360.0
-        self.viewport().update()
-
-    def set_ra(self, ra: Optional[ResolutionAdvisory]) -> None:
-        self.active_ra = ra
-        self.viewport().update()
-
-    def set_banner(self, text: str) -> None:
-        self.banner_text = text
-        self.viewport().update()
-
-    def render_tracks(self, tracks: List[Track]) -> None:
-        self.scene.clear()
+        # frame-commit model: setters only mark the view dirty, commit_frame() repaints once
+        self._dirty = True
 
         pen_ring = QPen(Qt.gray)
         pen_ring.setWidth(1)
@@ -55,44 +63,121 @@ class TrafficScope(QGraphicsView):
 
         self.scene.addEllipse(-5, -5, 10, 10, QPen(Qt.cyan), QBrush(Qt.cyan))
 
-        for trk in tracks:
-            x, y = self._polar_to_xy(trk.bearingDeg, trk.rangeNm)
-
-            if trk.state == TrackState.THREAT_RA:
-                col = Qt.red
-                sym = SymbolType.SQUARE
-            elif trk.state == TrackState.INTRUDER_TA:
-                col = Qt.yellow
-                sym = SymbolType.CIRCLE
-            elif trk.state == TrackState.PROXIMATE:
-                col = Qt.cyan
-                sym = SymbolType.DIAMOND
-            else:
-                col = Qt.white
-                sym = SymbolType.DIAMOND
-
+        # one symbol path and one label path per track state, rebuilt by render_tracks
+        self._label_font = QFont(); self._label_font.setPointSize(9)
+        self._symbol_items = {}
+        self._label_items = {}
+        for state, (prio, col, _sym, filled) in _STYLES.items():
             pen = QPen(col); pen.setWidth(2)
-            brush = QBrush(col)
+            item = self.scene.addPath(QPainterPath(), pen, QBrush(col) if filled else QBrush(Qt.NoBrush))
+            item.setZValue(10 - prio)
+            self._symbol_items[state] = item
+            label = self.scene.addPath(QPainterPath(), QPen(Qt.NoPen), QBrush(col))
+            label.setZValue(10 - prio)
+            self._label_items[state] = label
+
+    def set_range_nm(self, rng: float) -> None:
+        rng = float(rng)
+        if rng != self.selectedRangeNm:
+            self.selectedRangeNm = rng
+            self._dirty = True
+
+    def set_altitude_window(self, below_ft: int, above_ft: int) -> None:
+        window = (int(below_ft), int(above_ft))
+        if window != self.altitudeWindowFt:
+            self.altitudeWindowFt = window
+            self._dirty = True
 
+    def set_heading_deg(self, hdg: float) -> None:
+        hdg = float(hdg) % 360.0
+        if hdg != self.ownshipHeadingDeg:
+            self.ownshipHeadingDeg = hdg
+            self._dirty = True
+
+    def set_ra(self, ra: Optional[ResolutionAdvisory]) -> None:
+        if _ra_key(ra) != _ra_key(self.active_ra):
+            self._dirty = True
+        self.active_ra = ra
+
+    def set_banner(self, text: str) -> None:
+        if text != self.banner_text:
+            self.banner_text = text
+            self._dirty = True
+
+    def commit_frame(self) -> bool:
+        """Repaint at most once per frame; returns True if a repaint was scheduled."""
+        if not self._dirty:
+            return False
+        self._dirty = False
+        self.viewport().update()
+        return True
+
+    def select_tracks(self, tracks: List[Track]) -> List[Track]:
+        """
+        Tracks worth drawing: inside the display radius and altitude window (TAs and RAs regardless),
+        capped at maxTargets by priority, so cost does not grow with the traffic beyond what is shown.
+        """
+        max_rng = self.selectedRangeNm * self._display_radius_px() / 190.0
+        below, above = self.altitudeWindowFt
+        ra, ta = TrackState.THREAT_RA, TrackState.INTRUDER_TA
+        cands = []
+        for i, trk in enumerate(tracks):
+            state = trk.state
+            if state is ra or state is ta:
+                cands.append((_STYLES[state][0], trk.rangeNm, i))
+            elif trk.rangeNm <= max_rng and below <= trk.relativeAltitudeFt <= above:
+                cands.append((_STYLES[state][0], trk.rangeNm, i))
+        if len(cands) > self.maxTargets:
+            cands = heapq.nsmallest(self.maxTargets, cands)
+        return [tracks[i] for _, _, i in cands]
+
+    def render_tracks(self, tracks: List[Track]) -> None:
+        self._draw_targets((t.bearingDeg, t.rangeNm, t.relativeAltitudeFt, t.state) for t in self.select_tracks(tracks))
+
+    def render_targets(self, bearingDeg: np.ndarray, rangeNm: np.ndarray, relAltFt: np.ndarray,
+                       states: np.ndarray) -> None:
+        """
+        render_tracks for one row of a shared multi-view frame (see sim.multi.view_transforms):
+        parallel arrays, states as TRACK_STATES codes (< 0 = not tracked); selection is vectorized.
+        """
+        max_rng = self.selectedRangeNm * self._display_radius_px() / 190.0
+        below, above = self.altitudeWindowFt
+        tracked = states >= 0
+        codes = np.where(tracked, states, 0)
+        keep = tracked & (_ALWAYS_SHOWN_CODES[codes] | ((rangeNm <= max_rng) & (relAltFt >= below) & (relAltFt <= above)))
+        idx = np.flatnonzero(keep)
+        if idx.size > self.maxTargets:
+            idx = idx[np.lexsort((rangeNm[idx], _PRIORITY_BY_CODE[codes[idx]]))[:self.maxTargets]]
+        self._draw_targets(zip(bearingDeg[idx].tolist(), rangeNm[idx].tolist(),
+                               np.rint(relAltFt[idx]).astype(int).tolist(), [TRACK_STATES[c] for c in codes[idx]]))
+
+    def _draw_targets(self, targets: Iterable[Tuple[float, float, int, TrackState]]) -> None:
+        symbols = {state: QPainterPath() for state in _STYLES}
+        labels = {state: QPainterPath() for state in _STYLES}
+        edge = self._display_radius_px()
+        font = self._label_font
+        for bearing, rng, rel_alt, state in targets:
+            x, y = self._polar_to_xy(bearing, rng)
+            r_px = math.hypot(x, y)
+            if r_px > edge:  # TA/RA beyond the selected range: pinned to the edge
+                x, y = x * edge / r_px, y * edge / r_px
+
+            sym = _STYLES[state][2]
+            path = symbols[state]
             if sym == SymbolType.DIAMOND:
-                poly = [(-0, -7), (7, 0), (0, 7), (-7, 0)]
-                qpoly = [self._pt(x + dx, y + dy) for dx, dy in poly]
-                if trk.state == TrackState.OTHER:
-                    self.scene.addPolygon(qpoly, pen)
-                else:
-                    self.scene.addPolygon(qpoly, pen, brush)
+                path.addPolygon(_DIAMOND.translated(x, y))
             elif sym == SymbolType.CIRCLE:
-                self.scene.addEllipse(x - 7, y - 7, 14, 14, pen, brush)
+                path.addEllipse(x - 7, y - 7, 14, 14)
             else:
-                self.scene.addRect(x - 7, y - 7, 14, 14, pen, brush)
+                path.addRect(x - 7, y - 7, 14, 14)
 
-            rel_hund = int(round(trk.relativeAltitudeFt / 100.0))
-            tag = f"{rel_hund:+03d}"
-            titem = self.scene.addText(tag)
-            titem.setDefaultTextColor(col)
-            titem.setPos(x + 12, y - 12)
+            rel_hund = int(round(rel_alt / 100.0))
+            labels[state].addText(x + 12, y + 4, font, f"{rel_hund:+03d}")
 
-        self.viewport().update()
+        for state in _STYLES:
+            self._symbol_items[state].setPath(symbols[state])
+            self._label_items[state].setPath(labels[state])
+        self._dirty = True
 
     def drawForeground(self, painter: QPainter, rect):
         super().drawForeground(painter, rect)
@@ -139,7 +224,7 @@ class TrafficScope(QGraphicsView):
 
     def _draw_ra_bezel_overlay(self, p: QPainter):
         ra = self.active_ra
-        if ra is None or ra.kind not in (RAKind.CLIMB, RAKind.DESCEND):
+        if ra is None or ra.kind not in CLIMB_KINDS | DESCEND_KINDS:
             return
 
         outer = self._bezel_outer_r
@@ -157,7 +242,7 @@ class TrafficScope(QGraphicsView):
             path.closeSubpath()
             return path
 
-        if ra.kind == RAKind.CLIMB:
+        if ra.kind in CLIMB_KINDS:
             green_start, green_span = (345, 40)
         else:
             green_start, green_span = (165, 40)
@@ -203,6 +288,11 @@ class TrafficScope(QGraphicsView):
         y = -math.cos(ang) * r_px
         return x, y
 
-    def _pt(self, x: float, y: float):
-        from PySide6.QtCore import QPointF
-        return QPointF(x, y)
+    def _display_radius_px(self) -> float:
+        # inside the bezel, less half a symbol
+        return self._bezel_outer_r - self._bezel_thickness - 7
+
+
+def _ra_key(ra: Optional[ResolutionAdvisory]):
+    # only the fields the scope actually draws
+    return None if ra is None else (ra.kind, ra.requiredVerticalRateFpm)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, asdict, fields
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from tcas_sim.sim.simulator import Simulator
+from tcas_sim.sim.stress import build_loaded_sim
+
+DEFAULT_AIRCRAFT = 100
+
+
+@dataclass(frozen=True)
+class Linear:
+    base: float
+    perAircraft: float = 0.0
+
+    def at(self, n: int) -> float:
+        return self.base + self.perAircraft * n
+
+
+@dataclass(frozen=True)
+class AllocBudget:
+    """Per-tick ceilings at steady state with N aircraft."""
+    objectsPerTick: Linear  # gc-tracked objects created per tick and alive at its end
+    peakBytesPerTick: Linear  # tracemalloc high-water mark above the start of the tick
+    retainedBytesPerTick: Linear  # net growth; anything above noise is a leak
+    gen2PerKTicks: Linear  # full collections per 1000 ticks
+
+
+# Declared from measured steady state (N = 100 and 1000) plus headroom; tighten when a change
+# removes allocations, raise only with a reason in the commit.
+BUDGETS: Dict[str, AllocBudget] = {
+    # a Track per aircraft in a new dict, plus what the engine allocates; peak is mostly RA prediction arrays
+    "Simulator.step": AllocBudget(Linear(32, 1.5), Linear(131072, 5120), Linear(128), Linear(2, 0.02)),
+    # a Track per aircraft in a new dict
+    "Tracker.update": AllocBudget(Linear(16, 1.1), Linear(8192, 512), Linear(128), Linear(2, 0.02)),
+    # threat list from the index and RA prediction arrays (K candidates x M threats, not retained)
+    "AdvisoryEngine.update": AllocBudget(Linear(16), Linear(65536, 5120), Linear(128), Linear(2)),
+}
+
+
+@dataclass
+class AllocResult:
+    target: str
+    aircraft: int
+    objectsPerTick: float
+    peakBytesPerTick: float
+    retainedBytesPerTick: float
+    gen2PerKTicks: float
+
+
+def fixed_traffic_sim(n: int, seed: int = 0) -> Simulator:
+    """build_loaded_sim with the live spawner off; short runs stay inside the cull radius, so N is constant."""
+    sim = build_loaded_sim(n, seed=seed)
+    sim.max_intruders = 0
+    return sim
+
+
+def _targets(n: int, seed: int, dt: float) -> Dict[str, Tuple[Simulator, Callable[[], object]]]:
+    """Fresh sim + one-tick callable per target; each keeps its latest result alive, as step does."""
+    out = {}
+
+    sim = fixed_traffic_sim(n, seed)
+
+    def step(sim=sim):
+        sim.clock.advance(dt)
+        sim.step(dt)
+    out["Simulator.step"] = (sim, step)
+
+    sim = fixed_traffic_sim(n, seed)
+
+    def track(sim=sim):
+        now = sim.clock.advance(dt)
+        sim.tcas.tracks = sim.tracker.update(now, sim.ownship, sim.intruders, sim.intruder_xpdrs,
+                                             sim.tcas.mode, sim.tcas.activeThresholds)
+    out["Tracker.update"] = (sim, track)
+
+    sim = fixed_traffic_sim(n, seed)
+    for _ in range(3):
+        step(sim)
+    tracks = list(sim.tcas.tracks.values())
+
+    def advise(sim=sim, tracks=tracks):
+        now = sim.clock.advance(dt)
+        sim.advisory_engine.update(now, sim.ownship, sim.tcas.mode, sim.tcas.activeThresholds, tracks, sim.tracker.index)
+    out["AdvisoryEngine.update"] = (sim, advise)
+    return out
+
+
+def _objects_per_tick(tick: Callable[[], object], ticks: int) -> float:
+    # gc-tracked objects created by a tick and still alive at its end; the previous tick's
+    # objects stay pinned so freed addresses cannot be reused and hide new ones
+    gc.collect()
+    pinned = gc.get_objects()
+    before = {id(o) for o in pinned}
+    created = 0
+    for _ in range(ticks):
+        tick()
+        now = gc.get_objects()
+        created += sum(1 for o in now if id(o) not in before) - 2  # `before` and the list we are holding
+        pinned, before = now, {id(o) for o in now}
+    del pinned
+    return created / ticks
+
+
+def measure(target: str, tick: Callable[[], object], n: int, ticks: int = 200, warmup: int = 20) -> AllocResult:
+    for _ in range(warmup):
+        tick()
+
+    # GC: normal thresholds, nothing traced or pinned
+    gc.collect()
+    gen2 = gc.get_stats()[2]["collections"]
+    for _ in range(ticks):
+        tick()
+    gen2 = gc.get_stats()[2]["collections"] - gen2
+
+    tracemalloc.start()
+    try:
+        # objects from before start() are untraced, so replacing them looks like growth until
+        # the state has been rewritten by traced ticks
+        for _ in range(max(warmup, ticks)):
+            tick()
+        peak = 0
+        start, _ = tracemalloc.get_traced_memory()
+        for _ in range(ticks):
+            cur, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            tick()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - cur)
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    objects = _objects_per_tick(tick, max(1, ticks // 10))
+    return AllocResult(
+        target=target,
+        aircraft=n,
+        objectsPerTick=objects,
+        peakBytesPerTick=float(peak),
+        retainedBytesPerTick=(end - start) / ticks,
+        gen2PerKTicks=gen2 * 1000.0 / ticks,
+    )
+
+
+def violations(result: AllocResult, budget: AllocBudget) -> List[str]:
+    n = result.aircraft
+    out = []
+    for f in fields(budget):
+        got, limit = getattr(result, f.name), getattr(budget, f.name).at(n)
+        if got > limit:
+            out.append(f"{result.target} N={n}: {f.name} {got:.1f} > budget {limit:.1f}")
+    return out
+
+
+def run(n: int = DEFAULT_AIRCRAFT, ticks: int = 200, seed: int = 0, dt: float = 0.02,
+        names: Sequence[str] = tuple(BUDGETS)) -> List[AllocResult]:
+    targets = _targets(n, seed, dt)
+    out = []
+    for name in names:
+        sim, tick = targets[name]
+        out.append(measure(name, tick, n, ticks=ticks))
+        if len(sim.intruders) != n:
+            raise RuntimeError(f"{name}: traffic changed during the run ({len(sim.intruders)} of {n} left); use fewer ticks")
+    return out
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Per-tick allocation budgets for the tick loop (non-zero exit on regression).")
+    ap.add_argument("--aircraft", type=int, nargs="+", default=[DEFAULT_AIRCRAFT])
+    ap.add_argument("--ticks", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--only", nargs="+", choices=list(BUDGETS), default=list(BUDGETS))
+    args = ap.parse_args(argv)
+
+    bad: List[str] = []
+    for n in args.aircraft:
+        for res in run(n, ticks=args.ticks, seed=args.seed, names=args.only):
+            row = {k: (round(v, 1) if isinstance(v, float) else v) for k, v in asdict(res).items()}
+            print("  ".join(f"{k}={v}" for k, v in row.items()))
+            bad += violations(res, BUDGETS[res.target])
+    for msg in bad:
+        print(f"OVER BUDGET {msg}", file=sys.stderr)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import argparse
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from functools import partial
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from tcas_sim.enums import RAKind, SensitivityLevel
+from tcas_sim.sim.falsify import Encounter, encounter_from_unit, setup_encounter
+
+# NMAC: inside 500 ft horizontally and 100 ft vertically at the same time
+NMAC_HMD_NM = 500.0 / 6076.0
+NMAC_VMD_FT = 100.0
+
+OWNSHIP = 0  # column of the (only) equipped aircraft in every run
+NO_RA = 0    # raKind code when no RA is active (RAKind values start at 1)
+
+
+@dataclass
+class KinematicBatch:
+    """
+    Stored kinematics of R runs sampled on a shared time axis of T samples, N aircraft per run.
+    Positions are NaN while an aircraft is not in the sim. `sl` and `raKind` are ownship's
+    SensitivityLevel.value and active RAKind.value (NO_RA if none) per sample.
+    """
+    t: np.ndarray       # (T,) seconds since the start of the run
+    x_nm: np.ndarray    # (R, T, N)
+    y_nm: np.ndarray    # (R, T, N)
+    alt_ft: np.ndarray  # (R, T, N)
+    sl: np.ndarray      # (R, T) int8
+    raKind: np.ndarray  # (R, T) int8
+
+    @property
+    def runs(self) -> int:
+        return self.x_nm.shape[0]
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, t=self.t, x_nm=self.x_nm, y_nm=self.y_nm, alt_ft=self.alt_ft,
+                            sl=self.sl, raKind=self.raKind)
+
+    @classmethod
+    def load(cls, path: str) -> "KinematicBatch":
+        with np.load(path) as z:
+            return cls(**{k: z[k] for k in ("t", "x_nm", "y_nm", "alt_ft", "sl", "raKind")})
+
+
+@dataclass
+class PairMetrics:
+    """One row per (run, aircraft pair i < j); CPA is the sample of least horizontal range."""
+    run: np.ndarray       # (P,) int
+    i: np.ndarray         # (P,) int
+    j: np.ndarray         # (P,) int
+    tCpaSec: np.ndarray   # (P,) NaN if the pair never coexisted
+    hmdNm: np.ndarray     # (P,) horizontal miss distance at CPA
+    vmdFt: np.ndarray     # (P,) vertical miss distance at CPA
+    nmac: np.ndarray      # (P,) bool, NMAC at any sample
+    sl: np.ndarray        # (P,) ownship SL at CPA
+    raKind: np.ndarray    # (P,) first RA issued in the run, NO_RA if none
+
+    def __len__(self) -> int:
+        return len(self.run)
+
+
+@dataclass
+class RiskRatio:
+    sl: Optional[SensitivityLevel]  # None = all levels
+    raKind: Optional[RAKind]        # None = no RA issued (or all kinds, on the overall row)
+    encounters: int
+    nmacWithRa: int
+    nmacWithoutRa: int
+
+    @property
+    def ratio(self) -> float:
+        return self.nmacWithRa / self.nmacWithoutRa if self.nmacWithoutRa else float("nan")
+
+
+def pair_metrics(batch: KinematicBatch, chunk_runs: int = 512) -> PairMetrics:
+    """Miss distances, time of CPA and NMAC flags for every aircraft pair of every run, in run chunks."""
+    R, T, N = batch.x_nm.shape
+    I, J = np.triu_indices(N, 1)
+    P = len(I)
+
+    first_ra = _first_nonzero(batch.raKind)
+    parts = []
+    for r0 in range(0, R, chunk_runs):
+        r1 = min(R, r0 + chunk_runs)
+        x, y, z = batch.x_nm[r0:r1], batch.y_nm[r0:r1], batch.alt_ft[r0:r1]
+        h = np.hypot(x[:, :, I] - x[:, :, J], y[:, :, I] - y[:, :, J])  # (r, T, P)
+        v = np.abs(z[:, :, I] - z[:, :, J])
+
+        seen = ~np.isnan(h)
+        k = np.where(seen, h, np.inf).argmin(axis=1)  # (r, P)
+        at = k[:, None, :]
+        hmd = np.take_along_axis(h, at, axis=1)[:, 0, :]
+        vmd = np.take_along_axis(v, at, axis=1)[:, 0, :]
+        tcpa = np.where(seen.any(axis=1), batch.t[k], np.nan)
+        with np.errstate(invalid="ignore"):
+            nmac = ((h < NMAC_HMD_NM) & (v < NMAC_VMD_FT)).any(axis=1)
+        sl = np.take_along_axis(batch.sl[r0:r1], k, axis=1)
+
+        runs = np.arange(r0, r1)
+        parts.append((
+            np.repeat(runs, P), np.tile(I, r1 - r0), np.tile(J, r1 - r0),
+            tcpa.ravel(), hmd.ravel(), vmd.ravel(), nmac.ravel(), sl.ravel(),
+            np.repeat(first_ra[r0:r1], P),
+        ))
+
+    cols = [np.concatenate(c) for c in zip(*parts)] if parts else [np.empty(0)] * 9
+    return PairMetrics(*cols)
+
+
+def risk_ratios(with_ra: PairMetrics, without_ra: PairMetrics) -> List[RiskRatio]:
+    """
+    NMAC risk ratio of equipped vs unequipped runs of the same encounters, over ownship pairs only
+    (intruder-intruder pairs fly the same either way). Grouped by the equipped run's SL at CPA and
+    first RA kind; the first row is the overall ratio.
+    """
+    if len(with_ra) != len(without_ra) or not np.array_equal(with_ra.run, without_ra.run):
+        raise ValueError("risk ratios need pair metrics of the same encounters with and without RA")
+    own = with_ra.i == OWNSHIP
+    sl, kind = with_ra.sl[own].astype(np.int64), with_ra.raKind[own].astype(np.int64)
+    hit_with, hit_without = with_ra.nmac[own], without_ra.nmac[own]
+
+    rows = [RiskRatio(None, None, int(own.sum()), int(hit_with.sum()), int(hit_without.sum()))]
+    keys, inv = np.unique(np.stack([sl, kind], axis=1), axis=0, return_inverse=True)
+    inv = inv.ravel()
+    n = np.bincount(inv, minlength=len(keys))
+    w = np.bincount(inv, weights=hit_with, minlength=len(keys))
+    wo = np.bincount(inv, weights=hit_without, minlength=len(keys))
+    for (s, k), cnt, a, b in zip(keys, n, w, wo):
+        rows.append(RiskRatio(
+            SensitivityLevel(int(s)), RAKind(int(k)) if k != NO_RA else None, int(cnt), int(a), int(b),
+        ))
+    return rows
+
+
+def _first_nonzero(codes: np.ndarray) -> np.ndarray:
+    hit = codes != NO_RA
+    k = hit.argmax(axis=1)
+    return np.where(hit.any(axis=1), codes[np.arange(len(codes)), k], NO_RA)
+
+
+# ---- producing batches from scripted encounters ----------------------
+
+def record_encounter(enc: Encounter, ap_mode: str = "RA", dt: float = 0.1, duration_s: float = 90.0):
+    """Kinematics of one encounter from the intruder's appearance: (x, y, alt) as (T, 2) plus sl, raKind (T,)."""
+    sim, clock, intr = setup_encounter(enc, dt, ap_mode)
+    own = sim.ownship
+    T = int(round(duration_s / dt))
+    x = np.full((T, 2), np.nan)
+    y = np.full((T, 2), np.nan)
+    z = np.full((T, 2), np.nan)
+    sl = np.zeros(T, dtype=np.int8)
+    kind = np.zeros(T, dtype=np.int8)
+    for n in range(T):
+        clock.advance(dt)
+        _ta, ra, _ = sim.step(dt)
+        x[n, 0], y[n, 0], z[n, 0] = own.x_nm, own.y_nm, own.altitudeFt
+        if sim.intruders:
+            x[n, 1], y[n, 1], z[n, 1] = intr.x_nm, intr.y_nm, intr.altitudeFt
+        sl[n] = sim.tcas.currentSL.value
+        kind[n] = ra.kind.value if ra is not None else NO_RA
+    return x, y, z, sl, kind
+
+
+def encounter_batch(
+    encounters: Sequence[Encounter],
+    ap_mode: str = "RA",
+    dt: float = 0.1,
+    duration_s: float = 90.0,
+    workers: Optional[int] = None,
+) -> KinematicBatch:
+    run = partial(record_encounter, ap_mode=ap_mode, dt=dt, duration_s=duration_s)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        recs = list(pool.map(run, encounters, chunksize=max(1, len(encounters) // 32)))
+    T = int(round(duration_s / dt))
+    if not recs:
+        empty = np.empty((0, T, 2))
+        return KinematicBatch(np.arange(1, T + 1) * dt, empty, empty, empty,
+                              np.empty((0, T), np.int8), np.empty((0, T), np.int8))
+    x, y, z, sl, kind = (np.stack(c) for c in zip(*recs))
+    return KinematicBatch(np.arange(1, T + 1) * dt, x, y, z, sl, kind)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Miss distance / NMAC risk ratios over random encounters, with and without RA.")
+    ap.add_argument("--encounters", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--dt", type=float, default=0.1)
+    ap.add_argument("--duration", type=float, default=90.0, help="seconds recorded per encounter")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--save", default=None, help="prefix for <prefix>_ra.npz / <prefix>_nora.npz")
+    args = ap.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    encs = [encounter_from_unit(u) for u in rng.random((args.encounters, len(fields(Encounter))))]
+    equipped = encounter_batch(encs, "RA", args.dt, args.duration, args.workers)
+    unequipped = encounter_batch(encs, "ALT", args.dt, args.duration, args.workers)
+    if args.save:
+        equipped.save(f"{args.save}_ra.npz")
+        unequipped.save(f"{args.save}_nora.npz")
+
+    print(f"{'SL':>4} {'RA':<24} {'n':>6} {'nmac_ra':>8} {'nmac_nora':>9} {'ratio':>7}")
+    for row in risk_ratios(pair_metrics(equipped), pair_metrics(unequipped)):
+        sl = row.sl.name if row.sl else "all"
+        kind = row.raKind.name if row.raKind else ("-" if row.sl else "all")
+        print(f"{sl:>4} {kind:<24} {row.encounters:6d} {row.nmacWithRa:8d} {row.nmacWithoutRa:9d} {row.ratio:7.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+
+class ManualClock:
+    """
+    Stand-in for time.time() in headless runs: time only moves when advanced,
+    so a 30 minute run can be stepped as fast as the CPU allows.
+    """
+    def __init__(self, start: float = 0.0):
+        self.now = float(start)
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, dt: float) -> float:
+        self.now += float(dt)
+        return self.now
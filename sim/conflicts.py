@@ -0,0 +1,225 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.enums import SensitivityLevel, TrackState
+from tcas_sim.sensitivity.thresholds import SensitivityProfile
+
+# same altitude breakpoints as tracking.logic.compute_sl_from_altitude_ft
+SL_ALT_EDGES_FT = np.array([1000, 2350, 5000, 10000, 20000])
+SL_ORDER = (SensitivityLevel.SL2, SensitivityLevel.SL3, SensitivityLevel.SL4,
+            SensitivityLevel.SL5, SensitivityLevel.SL6, SensitivityLevel.SL7)
+
+# TrackState by integer code used in ConflictPairs.stateCode
+STATE_BY_CODE = (TrackState.OTHER, TrackState.PROXIMATE, TrackState.INTRUDER_TA, TrackState.THREAT_RA)
+
+PROXIMATE_RANGE_NM = 6.0
+PROXIMATE_ALT_FT = 1200
+
+
+@dataclass
+class ConflictPairs:
+    """Candidate pairs (i < j index into the input arrays) with batch-computed tau and classification."""
+    i: np.ndarray
+    j: np.ndarray
+
+    rangeNm: np.ndarray
+    relativeAltitudeFt: np.ndarray  # alt[j] - alt[i]
+    closureRateKts: np.ndarray
+    verticalClosureFpm: np.ndarray
+    rangeTauSec: np.ndarray
+    verticalTauSec: np.ndarray
+    stateCode: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.i.size)
+
+    def states(self) -> List[TrackState]:
+        return [STATE_BY_CODE[c] for c in self.stateCode]
+
+
+class _ThresholdTable:
+    """SensitivityProfile flattened to arrays indexed by SL_ORDER position (RA fields NaN where inhibited)."""
+    def __init__(self, profile: SensitivityProfile):
+        th = [profile.thresholds[sl] for sl in SL_ORDER]
+        nan = float("nan")
+        self.taTau = np.array([t.taTauSec for t in th], dtype=float)
+        self.taDMOD = np.array([t.taDMODNm for t in th], dtype=float)
+        self.taZTHR = np.array([t.taZTHRFt for t in th], dtype=float)
+        self.raTau = np.array([nan if t.raTauSec is None else t.raTauSec for t in th], dtype=float)
+        self.raDMOD = np.array([nan if t.raDMODNm is None else t.raDMODNm for t in th], dtype=float)
+        self.raZTHR = np.array([nan if t.raZTHRFt is None else t.raZTHRFt for t in th], dtype=float)
+
+
+def sweep_windows(profile: SensitivityProfile, max_gs_kt: float, max_vs_fpm: float, dt_s: float = 1.0) -> tuple[float, float]:
+    """
+    Half-widths (NM, ft) of the sweep windows: the largest TA DMOD/ZTHR in the profile plus how
+    far two aircraft can close in dt_s, one tick of motion, so re-sweeping every tick picks up
+    each pair as it enters the DMOD/ZTHR volume. Never smaller than the proximate volume.
+    Pairs that would alert on tau alone further out are only seen with dt_s up to the TA tau.
+    """
+    tt = _ThresholdTable(profile)
+    w_h = float(tt.taDMOD.max()) + 2.0 * max_gs_kt * dt_s / 3600.0
+    w_v = float(tt.taZTHR.max()) + 2.0 * max_vs_fpm * dt_s / 60.0
+    return max(w_h, PROXIMATE_RANGE_NM), max(w_v, float(PROXIMATE_ALT_FT))
+
+
+def _sweep_pairs(xs_sorted: np.ndarray, w: float) -> tuple[np.ndarray, np.ndarray]:
+    # for sorted xs, every (a, b) with a < b and xs[b] - xs[a] <= w, without a Python loop
+    n = xs_sorted.size
+    ends = np.searchsorted(xs_sorted, xs_sorted + w, side="right")
+    counts = ends - np.arange(n) - 1
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    a = np.repeat(np.arange(n), counts)
+    starts = np.cumsum(counts) - counts
+    b = np.arange(total) - np.repeat(starts, counts) + a + 1
+    return a, b
+
+
+def candidate_pairs(x: np.ndarray, y: np.ndarray, alt: np.ndarray, w_h: float, w_v: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sweep-and-prune: aircraft are bucketed into altitude bands of height w_v, then swept
+    along x within each band plus the band above. Only pairs overlapping in x, y and
+    altitude windows are returned (i < j).
+    """
+    n = x.size
+    if n < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    band = np.floor(alt / w_v).astype(np.int64)
+    order = np.lexsort((x, band))
+    band_sorted = band[order]
+    uniq, first = np.unique(band_sorted, return_index=True)
+    last = np.append(first[1:], n)
+    slot = {int(b): (int(s), int(e)) for b, s, e in zip(uniq, first, last)}
+
+    out_i: List[np.ndarray] = []
+    out_j: List[np.ndarray] = []
+    for b, (s, e) in slot.items():
+        idx = order[s:e]
+        upper = slot.get(b + 1)
+        if upper is not None:
+            idx = np.concatenate((idx, order[upper[0]:upper[1]]))
+        n_own = e - s
+
+        xo = np.argsort(x[idx], kind="stable")
+        idx = idx[xo]
+        own = xo < n_own  # members of band b (pairs wholly in b+1 belong to the next band's sweep)
+
+        a, c = _sweep_pairs(x[idx], w_h)
+        keep = own[a] | own[c]
+        a, c = idx[a[keep]], idx[c[keep]]
+
+        keep = (np.abs(y[a] - y[c]) <= w_h) & (np.abs(alt[a] - alt[c]) <= w_v)
+        a, c = a[keep], c[keep]
+        out_i.append(np.minimum(a, c))
+        out_j.append(np.maximum(a, c))
+
+    return np.concatenate(out_i), np.concatenate(out_j)
+
+
+def classify_pairs(
+    i: np.ndarray,
+    j: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    alt: np.ndarray,
+    vs: np.ndarray,
+    gs: np.ndarray,
+    hdg: np.ndarray,
+    profile: SensitivityProfile,
+    ra_enabled: bool = True,
+    altitude_reporting: np.ndarray | None = None,
+) -> ConflictPairs:
+    """
+    Batch version of the Tracker gates for arbitrary pairs. Range rate comes from the
+    velocity vectors rather than finite differences. Each pair is judged with the
+    thresholds of its higher aircraft (the larger, more protective SL).
+    """
+    hr = np.radians(hdg)
+    vx = np.sin(hr) * gs
+    vy = np.cos(hr) * gs
+
+    dx = x[j] - x[i]
+    dy = y[j] - y[i]
+    rng = np.hypot(dx, dy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        range_rate = np.where(rng > 1e-9, (dx * (vx[j] - vx[i]) + dy * (vy[j] - vy[i])) / rng, 0.0)
+    closure = np.maximum(0.0, -range_rate)
+
+    rel_alt = alt[j] - alt[i]
+    v_signed = vs[i] - vs[j]
+    v_mag = np.where(rel_alt * v_signed < 0, np.abs(v_signed), 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        range_tau = np.where(closure > 1e-6, rng / closure * 3600.0, np.inf)
+        vert_tau = np.where(v_mag > 0, np.abs(rel_alt) / v_mag * 60.0, np.inf)
+
+    tt = _ThresholdTable(profile)
+    sl_idx = np.digitize(np.maximum(alt[i], alt[j]), SL_ALT_EDGES_FT)
+
+    def gate(tau_s, dmod, zthr):
+        horiz = (rng <= dmod) | (range_tau <= tau_s)
+        vert = (np.abs(rel_alt) <= zthr) | (vert_tau <= tau_s)
+        return horiz & vert
+
+    ta = gate(tt.taTau[sl_idx], tt.taDMOD[sl_idx], tt.taZTHR[sl_idx])
+    ra = np.zeros_like(ta)
+    if ra_enabled:
+        ra_tau = tt.raTau[sl_idx]
+        ra = ~np.isnan(ra_tau) & gate(ra_tau, tt.raDMOD[sl_idx], tt.raZTHR[sl_idx])
+        if altitude_reporting is not None:
+            ra &= altitude_reporting[i] & altitude_reporting[j]
+    prox = (rng <= PROXIMATE_RANGE_NM) & (np.abs(rel_alt) <= PROXIMATE_ALT_FT)
+
+    state = np.select([ra, ta, prox], [3, 2, 1], default=0).astype(np.int8)
+    return ConflictPairs(i, j, rng, rel_alt, closure, v_mag, range_tau, vert_tau, state)
+
+
+def detect_conflicts(
+    x: np.ndarray,
+    y: np.ndarray,
+    alt: np.ndarray,
+    vs: np.ndarray,
+    gs: np.ndarray,
+    hdg: np.ndarray,
+    profile: SensitivityProfile,
+    ra_enabled: bool = True,
+    include_other: bool = False,
+    dt_s: float = 1.0,
+) -> ConflictPairs:
+    """
+    All close pairs among N aircraft: sweep-and-prune candidates, then batch tau + TA/RA gating.
+    Meant to be called every tick of length dt_s (see sweep_windows).
+    """
+    x, y, alt, vs, gs, hdg = (np.asarray(a, dtype=float) for a in (x, y, alt, vs, gs, hdg))
+    max_gs = float(gs.max()) if gs.size else 0.0
+    max_vs = float(np.abs(vs).max()) if vs.size else 0.0
+    w_h, w_v = sweep_windows(profile, max_gs, max_vs, dt_s)
+
+    i, j = candidate_pairs(x, y, alt, w_h, w_v)
+    pairs = classify_pairs(i, j, x, y, alt, vs, gs, hdg, profile, ra_enabled)
+    if include_other:
+        return pairs
+    keep = pairs.stateCode > 0
+    return ConflictPairs(*(getattr(pairs, f)[keep] for f in ConflictPairs.__dataclass_fields__))
+
+
+def detect_conflicts_aircraft(aircraft: Sequence[Aircraft], profile: SensitivityProfile, **kw) -> ConflictPairs:
+    return detect_conflicts(
+        np.array([a.x_nm for a in aircraft]),
+        np.array([a.y_nm for a in aircraft]),
+        np.array([a.altitudeFt for a in aircraft]),
+        np.array([a.verticalRateFpm for a in aircraft]),
+        np.array([a.groundSpeedKt for a in aircraft]),
+        np.array([a.headingDeg for a in aircraft]),
+        profile,
+        **kw,
+    )
@@ -0,0 +1,77 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.core.tcas import TCAS
+from tcas_sim.core.transponder import Transponder
+from tcas_sim.enums import TCASVersion, TCASMode, RAKind
+from tcas_sim.sensitivity.thresholds import SensitivityProfile
+from tcas_sim.tracking.logic import Tracker, compute_sl_from_altitude_ft
+from tcas_sim.advisories.logic import AdvisoryEngine
+from tcas_sim.advisories.advisory import VS_LIMIT_KINDS, ResolutionAdvisory, TrafficAdvisory
+from tcas_sim.advisories.prediction import G_FPM_PER_S
+
+# autopilot vertical acceleration limit (same 0.25 g the RA logic assumes for a pilot)
+AP_ACCEL_G = 0.25
+
+
+def ra_vs_command(ra: ResolutionAdvisory, nominal_vs_fpm: int) -> int:
+    """Vertical speed an RA-following autopilot flies; preventive RAs keep nominal_vs_fpm inside the allowed band."""
+    if ra.kind == RAKind.LEVEL_OFF:
+        return 0
+    if ra.kind in VS_LIMIT_KINDS:
+        return max(ra.minAllowedVSFpm, min(ra.maxAllowedVSFpm, nominal_vs_fpm))
+    return ra.requiredVerticalRateFpm
+
+
+def accelerate_toward(ac: Aircraft, cmd_vs_fpm: int, dt: float) -> None:
+    # acceleration-limited response, independent of the tick rate
+    max_dv = AP_ACCEL_G * G_FPM_PER_S * dt
+    dv = cmd_vs_fpm - ac.verticalRateFpm
+    ac.verticalRateFpm += int(max(-max_dv, min(max_dv, dv)))
+
+
+class Equipage:
+    """
+    TCAS on an equipped aircraft other than Simulator.ownship (see Simulator.equip): its own tracker,
+    advisory engine and RA-following autopilot, run every substep against the shared traffic.
+    Without an RA (or with ap_mode "ALT") it flies plannedVerticalRateFpm, its rate when equipped.
+    """
+    def __init__(self, ac: Aircraft, profile: SensitivityProfile, mode: TCASMode = TCASMode.TA_RA, ra_logic=None):
+        self.aircraft = ac
+        self.tcas = TCAS(version=TCASVersion.V7_1, mode=mode, ownship=ac, sensitivityProfile=profile)
+        self.tcas.set_sl(compute_sl_from_altitude_ft(ac.altitudeFt))
+        self.tracker = Tracker()
+        self.advisory_engine = AdvisoryEngine(logic=ra_logic)
+        self.plannedVerticalRateFpm = ac.verticalRateFpm
+        self.ap_mode = "RA"
+        self.cmd_vs_fpm = ac.verticalRateFpm
+
+    def update(
+        self,
+        now: float,
+        dt: float,
+        traffic: List[Aircraft],
+        xpdrs: Sequence[Optional[Transponder]],
+    ) -> Tuple[Optional[TrafficAdvisory], Optional[ResolutionAdvisory]]:
+        """`traffic` is every other aircraft (the Simulator's ownship included), as Tracker.update expects."""
+        ac, tcas = self.aircraft, self.tcas
+        sl = compute_sl_from_altitude_ft(ac.altitudeFt)
+        if sl != tcas.currentSL:
+            tcas.set_sl(sl)
+        tcas.tracks = self.tracker.update(now, ac, traffic, xpdrs, tcas.mode, tcas.activeThresholds)
+        ta, ra = self.advisory_engine.update(
+            now=now,
+            ownship=ac,
+            tcas_mode=tcas.mode,
+            thresholds=tcas.activeThresholds,
+            tracks=list(tcas.tracks.values()),
+            index=self.tracker.index,
+        )
+
+        if self.ap_mode == "RA" and ra is not None:
+            self.cmd_vs_fpm = ra_vs_command(ra, self.plannedVerticalRateFpm)
+        else:
+            self.cmd_vs_fpm = self.plannedVerticalRateFpm
+        accelerate_toward(ac, self.cmd_vs_fpm, dt)
+        return ta, ra
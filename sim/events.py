@@ -0,0 +1,89 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Type
+
+from tcas_sim.enums import AdvisoryState, TrackState
+from tcas_sim.tracking.track import Track
+from tcas_sim.advisories.advisory import TrafficAdvisory, ResolutionAdvisory
+
+
+@dataclass(frozen=True)
+class SimEvent:
+    t: float
+
+
+@dataclass(frozen=True)
+class TrackCreated(SimEvent):
+    aircraftId: int
+    track: Track
+
+
+@dataclass(frozen=True)
+class TrackDropped(SimEvent):
+    aircraftId: int
+    track: Track  # last known state
+
+
+@dataclass(frozen=True)
+class TrackStateChanged(SimEvent):
+    aircraftId: int
+    previous: TrackState
+    state: TrackState
+    track: Track
+
+
+@dataclass(frozen=True)
+class TrafficAdvisoryIssued(SimEvent):
+    advisory: TrafficAdvisory
+
+
+@dataclass(frozen=True)
+class TrafficAdvisoryCleared(SimEvent):
+    advisory: TrafficAdvisory
+
+
+@dataclass(frozen=True)
+class ResolutionAdvisoryChanged(SimEvent):
+    """
+    state is ACTIVE (newly issued, or changed without strengthening, weakening or reversing,
+    e.g. to its crossing variant or a new ALIM), STRENGTHENED, WEAKENED, REVERSED or
+    TERMINATED; ra is None once terminated, previous is None on first issue.
+    """
+    state: AdvisoryState
+    ra: Optional[ResolutionAdvisory]
+    previous: Optional[ResolutionAdvisory]
+    primaryThreat: Optional[int]  # aircraft ID
+
+
+Handler = Callable[[SimEvent], None]
+
+
+class EventBus:
+    """
+    Synchronous publish/subscribe keyed by event class. Subscribing to SimEvent
+    receives everything. Publishers should check wants() before building events
+    so an unobserved stream costs nothing.
+    """
+    def __init__(self):
+        self._handlers: Dict[Type[SimEvent], List[Handler]] = {}
+
+    def subscribe(self, event_type: Type[SimEvent], handler: Handler) -> None:
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type: Type[SimEvent], handler: Handler) -> None:
+        handlers = self._handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self._handlers[event_type]
+
+    def wants(self, *event_types: Type[SimEvent]) -> bool:
+        if SimEvent in self._handlers:
+            return True
+        return any(et in self._handlers for et in event_types)
+
+    def publish(self, event: SimEvent) -> None:
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+        for handler in self._handlers.get(SimEvent, ()):
+            handler(event)
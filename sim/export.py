@@ -0,0 +1,214 @@
+from __future__ import annotations
+import json
+import math
+import os
+import queue
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tcas_sim.cockpit.outputs import DisplayEntry
+from tcas_sim.sim.events import TrafficAdvisoryIssued, TrafficAdvisoryCleared, ResolutionAdvisoryChanged
+
+FORMATS = ("jsonl", "columnar")
+
+COLUMNAR_MAGIC = b"TCOL"
+
+NO_AIRCRAFT = -1  # aircraft ID column value when there is none
+
+# column name -> numpy dtype, per stream; enums are stored by .name (jsonl) or .value (columnar)
+STREAMS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "display": (
+        ("tick", "<i8"), ("t", "<f8"), ("aircraftId", "<i4"), ("callsign", "S16"),
+        ("relativeAltitudeFt", "<i4"), ("verticalTrend", "i1"), ("threatLevel", "i1"),
+        ("color", "i1"), ("symbolType", "i1"),
+    ),
+    "tracks": (
+        ("tick", "<i8"), ("t", "<f8"), ("aircraftId", "<i4"), ("callsign", "S16"),
+        ("bearingDeg", "<f8"), ("rangeNm", "<f8"), ("relativeAltitudeFt", "<i4"),
+        ("rangeRateKts", "<f8"), ("closureRateKts", "<f8"), ("verticalClosureFpm", "<i4"),
+        ("rangeTauSec", "<f8"), ("verticalTauSec", "<f8"), ("state", "i1"), ("timeToConflictSec", "<i4"),
+    ),
+    "advisories": (
+        ("tick", "<i8"), ("t", "<f8"), ("advisory", "S2"), ("event", "S12"),
+        ("raKind", "i1"), ("raSense", "i1"), ("requiredVerticalRateFpm", "<i4"), ("primaryThreat", "<i4"),
+    ),
+}
+
+# enum-valued columns (jsonl writes the name, columnar the value)
+_ENUM_COLS = {"verticalTrend", "threatLevel", "color", "symbolType", "state", "raKind", "raSense"}
+
+# float columns; jsonl writes a non-finite value (e.g. tau when not closing) as null, columnar keeps inf
+_FLOAT_COLS = {c for spec in STREAMS.values() for c, dt in spec if dt == "<f8"}
+
+
+class StreamExporter:
+    """
+    Streams per-tick display entries, tracks and TA/RA transitions to disk.
+
+    The sim thread only appends row tuples to in-memory batches; every `batch_ticks`
+    ticks the batch is handed to a background writer thread that encodes it as
+    JSON lines or as columnar binary blocks (see read_columnar). Connect with
+    attach(sim): per-tick rows come from Simulator.step, advisory rows from the
+    sim's transition events.
+    """
+    def __init__(self, out_dir: str, fmt: str = "jsonl", batch_ticks: int = 256, max_pending: int = 64):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}, expected one of {FORMATS}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.batch_ticks = int(batch_ticks)
+
+        self.tick = 0
+        self._rows: Dict[str, List[tuple]] = {name: [] for name in STREAMS}
+        self._batched_ticks = 0
+
+        ext = "jsonl" if fmt == "jsonl" else "col"
+        mode = "w" if fmt == "jsonl" else "wb"
+        self._files = {name: open(os.path.join(out_dir, f"{name}.{ext}"), mode) for name in STREAMS}
+
+        self._queue: "queue.Queue[Optional[Dict[str, List[tuple]]]]" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._run, name="tcas-export", daemon=True)
+        self._writer.start()
+
+    # ---- sim thread -------------------------------------------------
+
+    def attach(self, sim) -> "StreamExporter":
+        sim.exporter = self
+        sim.events.subscribe(TrafficAdvisoryIssued, self._on_ta)
+        sim.events.subscribe(TrafficAdvisoryCleared, self._on_ta)
+        sim.events.subscribe(ResolutionAdvisoryChanged, self._on_ra)
+        return self
+
+    def record(self, now: float, sim, ta, ra, display_entries: List[DisplayEntry]) -> None:
+        if self._error is not None:
+            raise RuntimeError("export writer failed") from self._error
+        tick = self.tick
+        self.tick += 1
+
+        rows = self._rows
+        disp, trk_rows = rows["display"], rows["tracks"]
+        for (ac_id, trk), de in zip(sim.tcas.tracks.items(), display_entries):
+            cs = trk.intruder.callsign
+            disp.append((tick, now, ac_id, cs, de.relativeAltitudeFt, de.verticalTrend, de.threatLevel,
+                         de.color, de.symbolType))
+            trk_rows.append((tick, now, ac_id, cs, trk.bearingDeg, trk.rangeNm, trk.relativeAltitudeFt,
+                             trk.rangeRateKts, trk.closureRateKts, trk.verticalClosureFpm,
+                             trk.rangeTauSec, trk.verticalTauSec, trk.state, trk.timeToConflictSec))
+
+        self._batched_ticks += 1
+        if self._batched_ticks >= self.batch_ticks:
+            self.flush()
+
+    # transition events fire inside Simulator.step, before record() for the same tick
+    def _on_ta(self, ev) -> None:
+        event = "ISSUED" if isinstance(ev, TrafficAdvisoryIssued) else "CLEARED"
+        self._rows["advisories"].append((self.tick, ev.t, "TA", event, None, None, 0, NO_AIRCRAFT))
+
+    def _on_ra(self, ev: ResolutionAdvisoryChanged) -> None:
+        ra = ev.ra if ev.ra is not None else ev.previous
+        req = ev.ra.requiredVerticalRateFpm if ev.ra is not None else 0
+        self._rows["advisories"].append((self.tick, ev.t, "RA", ev.state.name, ra.kind, ra.sense, req,
+                                         NO_AIRCRAFT if ev.primaryThreat is None else ev.primaryThreat))
+
+    def flush(self) -> None:
+        """Hands the current batch to the writer thread (blocks only if max_pending batches are queued)."""
+        if self._batched_ticks == 0:
+            return
+        batch = self._rows
+        self._rows = {name: [] for name in STREAMS}
+        self._batched_ticks = 0
+        self._queue.put(batch)
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+        for fh in self._files.values():
+            fh.close()
+        if self._error is not None:
+            raise RuntimeError("export writer failed") from self._error
+
+    def __enter__(self) -> "StreamExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- writer thread ----------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                for name, rows in batch.items():
+                    if rows:
+                        if self.fmt == "jsonl":
+                            self._write_jsonl(name, rows)
+                        else:
+                            self._write_columnar(name, rows)
+                for fh in self._files.values():
+                    fh.flush()
+            except BaseException as e:  # surfaced on the sim thread by the next record()/close()
+                self._error = e
+
+    def _write_jsonl(self, name: str, rows: List[tuple]) -> None:
+        cols = [c for c, _ in STREAMS[name]]
+        enum_idx = [k for k, c in enumerate(cols) if c in _ENUM_COLS]
+        float_idx = [k for k, c in enumerate(cols) if c in _FLOAT_COLS]
+        lines = []
+        for row in rows:
+            row = list(row)
+            for k in enum_idx:
+                if row[k] is not None:
+                    row[k] = row[k].name
+            for k in float_idx:
+                if row[k] is not None and not math.isfinite(row[k]):
+                    row[k] = None
+            lines.append(json.dumps(dict(zip(cols, row)), allow_nan=False))
+        self._files[name].write("\n".join(lines) + "\n")
+
+    def _write_columnar(self, name: str, rows: List[tuple]) -> None:
+        spec = STREAMS[name]
+        fh = self._files[name]
+        fh.write(COLUMNAR_MAGIC + struct.pack("<IH", len(rows), len(spec)))
+        for k, (col, dt) in enumerate(spec):
+            vals = [r[k] for r in rows]
+            if col in _ENUM_COLS:
+                vals = [0 if v is None else v.value for v in vals]
+            elif dt.startswith("S"):
+                vals = [v.encode() for v in vals]
+            arr = np.asarray(vals, dtype=dt)
+            cname, dname = col.encode(), arr.dtype.str.encode()
+            fh.write(struct.pack("<B", len(cname)) + cname + struct.pack("<B", len(dname)) + dname)
+            fh.write(arr.tobytes())
+
+
+def read_columnar(path: str) -> Dict[str, np.ndarray]:
+    """Reads a .col stream back into one array per column."""
+    cols: Dict[str, List[np.ndarray]] = {}
+    with open(path, "rb") as fh:
+        data = fh.read()
+    off = 0
+    while off < len(data):
+        if data[off:off + 4] != COLUMNAR_MAGIC:
+            raise ValueError(f"corrupt columnar block at offset {off}")
+        nrows, ncols = struct.unpack_from("<IH", data, off + 4)
+        off += 10
+        for _ in range(ncols):
+            ln = data[off]; off += 1
+            cname = data[off:off + ln].decode(); off += ln
+            ln = data[off]; off += 1
+            dt = np.dtype(data[off:off + ln].decode()); off += ln
+            nbytes = nrows * dt.itemsize
+            cols.setdefault(cname, []).append(np.frombuffer(data, dtype=dt, count=nrows, offset=off))
+            off += nbytes
+    return {k: np.concatenate(v) for k, v in cols.items()}
@@ -0,0 +1,233 @@
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.core.transponder import Transponder
+from tcas_sim.enums import TransponderMode, RAKind
+from tcas_sim.sim.clock import ManualClock
+from tcas_sim.sim.simulator import Simulator
+
+CROSSING_KINDS = (RAKind.CROSSING_CLIMB, RAKind.CROSSING_DESCEND, RAKind.CROSSING_MAINTAIN)
+
+# miss distance normalisation: NMAC cylinder (500 ft horizontal, 100 ft vertical)
+HMD_REF_NM = 500.0 / 6076.0
+VMD_REF_FT = 100.0
+
+
+@dataclass(frozen=True)
+class Encounter:
+    """Scripted single-intruder encounter; ownship starts at the origin flying toward its altitude bug."""
+    rangeNm: float
+    bearingDeg: float
+    headingOffsetDeg: float  # 0 = straight at ownship
+    groundSpeedKt: float
+    relAltFt: float
+    verticalRateFpm: float
+    ownVerticalRateFpm: float
+    startDelaySec: float  # intruder appears this long into ownship's climb/descent
+
+
+# search box per Encounter field
+BOUNDS: Dict[str, Tuple[float, float]] = {
+    "rangeNm": (1.0, 8.0),
+    "bearingDeg": (0.0, 360.0),
+    "headingOffsetDeg": (-30.0, 30.0),
+    "groundSpeedKt": (150.0, 550.0),
+    "relAltFt": (-1200.0, 1200.0),
+    "verticalRateFpm": (-3000.0, 3000.0),
+    "ownVerticalRateFpm": (-2000.0, 2000.0),
+    "startDelaySec": (0.0, 20.0),
+}
+_FIELDS = [f.name for f in fields(Encounter)]
+_LO = np.array([BOUNDS[f][0] for f in _FIELDS])
+_HI = np.array([BOUNDS[f][1] for f in _FIELDS])
+
+
+@dataclass
+class EncounterResult:
+    encounter: Encounter
+    objective: float  # normalised miss distance at the closest point; lower is worse
+    hmdNm: float
+    vmdFt: float
+    tcpaSec: float
+    raIssued: bool
+    raKinds: List[str]
+    crossingRA: bool
+    belowAlim: bool  # an RA was issued and vertical miss still ended below ALIM
+
+
+def encounter_from_unit(u: np.ndarray) -> Encounter:
+    v = _LO + np.clip(u, 0.0, 1.0) * (_HI - _LO)
+    return Encounter(*(float(x) for x in v))
+
+
+def setup_encounter(enc: Encounter, dt: float = 0.1, ap_mode: str = "RA") -> Tuple[Simulator, ManualClock, Aircraft]:
+    """Builds the encounter sim and runs it up to the intruder's appearance (startDelaySec)."""
+    clock = ManualClock()
+    sim = Simulator(time_scale=1.0, max_intruders=0, clock=clock, seed=0)
+    sim.ap_mode = ap_mode
+    own = sim.ownship
+    own.verticalRateFpm = int(enc.ownVerticalRateFpm)
+    own.targetAltitudeFt = own.altitudeFt + int(enc.ownVerticalRateFpm * 0.5)  # 30 s of climb/descent
+
+    t = 0.0
+    while t < enc.startDelaySec:
+        clock.advance(dt)
+        sim.step(dt)
+        t += dt
+
+    b = math.radians(enc.bearingDeg)
+    x, y = math.sin(b) * enc.rangeNm, math.cos(b) * enc.rangeNm
+    hdg = (enc.bearingDeg + 180.0 + enc.headingOffsetDeg) % 360.0
+    alt = int(own.altitudeFt + enc.relAltFt)
+    intr = Aircraft("FALS", alt, int(enc.verticalRateFpm), enc.groundSpeedKt, hdg, x, y, alt)
+    sim.add_intruder(intr, Transponder(TransponderMode.MODE_S, "1200", True, "FA15E0"))
+    return sim, clock, intr
+
+
+def evaluate(enc: Encounter, dt: float = 0.1, max_time_s: float = 120.0, ap_mode: str = "RA") -> EncounterResult:
+    sim, clock, intr = setup_encounter(enc, dt, ap_mode)
+    own = sim.ownship
+
+    best_obj, hmd, vmd, tcpa = math.inf, math.inf, math.inf, 0.0
+    min_rng = math.inf
+    ra_kinds: List[str] = []
+    alim = 0
+    t = t0 = clock.now
+    while t - t0 < max_time_s and sim.intruders:
+        clock.advance(dt)
+        _ta, ra, _ = sim.step(dt)
+        t += dt
+        if ra is not None:
+            alim = max(alim, ra.alimFt)
+            if not ra_kinds or ra_kinds[-1] != ra.kind.name:
+                ra_kinds.append(ra.kind.name)
+
+        rng = math.hypot(intr.x_nm - own.x_nm, intr.y_nm - own.y_nm)
+        dv = abs(intr.altitudeFt - own.altitudeFt)
+        obj = math.hypot(rng / HMD_REF_NM, dv / VMD_REF_FT)
+        if obj < best_obj:
+            best_obj = obj
+        if rng < min_rng:
+            min_rng, hmd, vmd, tcpa = rng, rng, dv, t - t0
+        elif rng > min_rng + 0.5:
+            break  # diverging well past CPA
+
+    return EncounterResult(
+        encounter=enc,
+        objective=best_obj,
+        hmdNm=hmd,
+        vmdFt=vmd,
+        tcpaSec=tcpa,
+        raIssued=bool(ra_kinds),
+        raKinds=ra_kinds,
+        crossingRA=any(k in (c.name for c in CROSSING_KINDS) for k in ra_kinds),
+        belowAlim=bool(ra_kinds) and vmd < alim,
+    )
+
+
+class EvaluationCache:
+    """Results keyed by the quantised unit-space point, optionally persisted as JSON lines."""
+    def __init__(self, path: Optional[str] = None, resolution: float = 1e-3):
+        self.path = path
+        self.resolution = resolution
+        self._data: Dict[tuple, EncounterResult] = {}
+        if path and os.path.exists(path):
+            with open(path) as fh:
+                for line in fh:
+                    d = json.loads(line)
+                    d["encounter"] = Encounter(**d["encounter"])
+                    res = EncounterResult(**d)
+                    self._data[self.key_of(res.encounter)] = res
+
+    def key_of(self, enc: Encounter) -> tuple:
+        u = (np.array([getattr(enc, f) for f in _FIELDS]) - _LO) / (_HI - _LO)
+        return tuple(np.round(u / self.resolution).astype(int).tolist())
+
+    def get(self, enc: Encounter) -> Optional[EncounterResult]:
+        return self._data.get(self.key_of(enc))
+
+    def put_all(self, results: Sequence[EncounterResult]) -> None:
+        for res in results:
+            self._data[self.key_of(res.encounter)] = res
+        if self.path and results:
+            with open(self.path, "a") as fh:
+                for res in results:
+                    fh.write(json.dumps(asdict(res)) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def results(self) -> List[EncounterResult]:
+        return list(self._data.values())
+
+
+def rank_key(res: EncounterResult) -> tuple:
+    # RA failures first (ALIM not achieved, then crossing), then smallest miss distance
+    return (not res.belowAlim, not res.crossingRA, res.objective)
+
+
+def search(
+    generations: int = 10,
+    population: int = 64,
+    elite_frac: float = 0.2,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    cache: Optional[EvaluationCache] = None,
+    top: int = 20,
+) -> List[EncounterResult]:
+    """
+    Cross-entropy search in the unit box: sample a Gaussian population, evaluate unseen
+    points in a process pool, refit the Gaussian to the elite (lowest objective) and repeat.
+    Returns the worst encounters seen, ranked by rank_key.
+    """
+    rng = np.random.default_rng(seed)
+    cache = cache if cache is not None else EvaluationCache()
+    dim = len(_FIELDS)
+    mean = np.full(dim, 0.5)
+    std = np.full(dim, 0.3)
+    n_elite = max(2, int(population * elite_frac))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for _ in range(generations):
+            units = np.clip(rng.normal(mean, std, size=(population, dim)), 0.0, 1.0)
+            encs = [encounter_from_unit(u) for u in units]
+            todo = [e for e in encs if cache.get(e) is None]
+            cache.put_all(list(pool.map(evaluate, todo, chunksize=max(1, len(todo) // 32))))
+
+            scored = sorted(((cache.get(e).objective, k) for k, e in enumerate(encs)))
+            elite = units[[k for _, k in scored[:n_elite]]]
+            mean = elite.mean(axis=0)
+            std = np.maximum(elite.std(axis=0), 0.02)
+
+    return sorted(cache.results(), key=rank_key)[:top]
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Search encounter space for RA failures (worst miss distance first).")
+    ap.add_argument("--generations", type=int, default=10)
+    ap.add_argument("--population", type=int, default=64)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--cache", default=None, help="JSON-lines file of evaluated points, reused across runs")
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    ranked = search(args.generations, args.population, workers=args.workers, seed=args.seed,
+                    cache=EvaluationCache(args.cache), top=args.top)
+    for res in ranked:
+        print(json.dumps(asdict(res)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
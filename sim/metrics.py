@@ -0,0 +1,202 @@
+from __future__ import annotations
+import argparse
+import bisect
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from tcas_sim.enums import AdvisoryState, RAKind, TrackState
+from tcas_sim.sim.events import TrafficAdvisoryIssued, ResolutionAdvisoryChanged
+
+# Simulator.step wall time, seconds
+TICK_BUCKETS_S: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_TRACK_STATES = tuple(TrackState)
+_RA_KINDS = tuple(RAKind)
+_RA_STATES = tuple(AdvisoryState)
+_RA_KIND_SLOT = {k: i for i, k in enumerate(_RA_KINDS)}
+_RA_STATE_SLOT = {s: i for i, s in enumerate(_RA_STATES)}
+
+
+class SimMetrics:
+    """
+    Live simulator counters, rendered as OpenMetrics / Prometheus text.
+
+    Everything is written by the Simulator.step thread only, as plain ints/floats and
+    list slots (no locks); render() copies what it reads, so a scrape from another
+    thread may mix values from adjacent ticks but never blocks the sim.
+    Connect with attach(sim); serve with start_http().
+    """
+    def __init__(self, buckets_s: Tuple[float, ...] = TICK_BUCKETS_S):
+        self.buckets_s = tuple(sorted(buckets_s))
+
+        self.ticks = 0
+        self.tick_seconds_sum = 0.0
+        self._tick_hist = [0] * (len(self.buckets_s) + 1)  # per bucket (not cumulative); last = +Inf
+
+        self.aircraft = 0
+        self.tracks = [0] * len(_TRACK_STATES)
+        self.sl = 0
+        self.ta_active = False
+        self.ra_active = False
+        self.spawned = 0
+        self.culled = 0
+
+        self.ta_issued = 0
+        self.ra_issued = [0] * len(_RA_KINDS)  # new RAs, by kind
+        self.ra_events = [0] * len(_RA_STATES)  # every RA transition, by state
+
+        self._http: Optional[ThreadingHTTPServer] = None
+        self._http_thread: Optional[threading.Thread] = None
+
+    def attach(self, sim) -> "SimMetrics":
+        sim.metrics = self
+        sim.events.subscribe(TrafficAdvisoryIssued, self._on_ta)
+        sim.events.subscribe(ResolutionAdvisoryChanged, self._on_ra)
+        return self
+
+    # ---- sim thread -------------------------------------------------
+
+    def record(self, sim, ta, ra, tick_s: float) -> None:
+        self.ticks += 1
+        self.tick_seconds_sum += tick_s
+        self._tick_hist[bisect.bisect_left(self.buckets_s, tick_s)] += 1
+
+        buckets = sim.tracker.index.buckets
+        for i, state in enumerate(_TRACK_STATES):
+            self.tracks[i] = len(buckets[state])
+        self.aircraft = len(sim.registry)
+        self.sl = sim.tcas.currentSL.value
+        self.ta_active = ta is not None
+        self.ra_active = ra is not None
+        self.spawned = sim.spawned
+        self.culled = sim.culled
+
+    def _on_ta(self, ev: TrafficAdvisoryIssued) -> None:
+        self.ta_issued += 1
+
+    def _on_ra(self, ev: ResolutionAdvisoryChanged) -> None:
+        self.ra_events[_RA_STATE_SLOT[ev.state]] += 1
+        if ev.previous is None and ev.ra is not None:
+            self.ra_issued[_RA_KIND_SLOT[ev.ra.kind]] += 1
+
+    # ---- any thread -------------------------------------------------
+
+    def render(self, openmetrics: bool = True) -> str:
+        """Exposition text; openmetrics=False gives the Prometheus 0.0.4 text format."""
+        out: List[str] = []
+
+        def family(name: str, kind: str, help_: str, samples) -> None:
+            # OpenMetrics names a counter family without its _total suffix
+            fam = name[:-len("_total")] if openmetrics and kind == "counter" else name
+            out.append(f"# HELP {fam} {help_}")
+            out.append(f"# TYPE {fam} {kind}")
+            for suffix, labels, value in samples:
+                lbl = "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+                out.append(f"{name}{suffix}{lbl} {value}")
+
+        family("tcas_ticks_total", "counter", "Simulator.step calls.", [("", (), self.ticks)])
+
+        hist = list(self._tick_hist)
+        total = sum(hist)
+        cum, samples = 0, []
+        for le, n in zip(self.buckets_s + (float("inf"),), hist):
+            cum += n
+            samples.append(("_bucket", (("le", "+Inf" if le == float("inf") else repr(le)),), cum))
+        samples += [("_count", (), total), ("_sum", (), repr(self.tick_seconds_sum))]
+        family("tcas_tick_seconds", "histogram", "Wall time of one Simulator.step.", samples)
+
+        family("tcas_aircraft", "gauge", "Registered aircraft, ownship included.", [("", (), self.aircraft)])
+        tracks = list(self.tracks)
+        family("tcas_tracks", "gauge", "Current tracks by state.",
+               [("", (("state", s.name),), n) for s, n in zip(_TRACK_STATES, tracks)])
+        family("tcas_sensitivity_level", "gauge", "Current sensitivity level (2-7).", [("", (), self.sl)])
+        family("tcas_advisory_active", "gauge", "1 while a TA / RA is active.",
+               [("", (("type", "TA"),), int(self.ta_active)), ("", (("type", "RA"),), int(self.ra_active))])
+
+        family("tcas_ta_issued_total", "counter", "Traffic advisories issued.", [("", (), self.ta_issued)])
+        issued = list(self.ra_issued)
+        family("tcas_ra_issued_total", "counter", "Resolution advisories issued (not counting changes), by kind.",
+               [("", (("kind", k.name),), n) for k, n in zip(_RA_KINDS, issued)])
+        events = list(self.ra_events)
+        family("tcas_ra_events_total", "counter", "Resolution advisory transitions, by state.",
+               [("", (("state", s.name),), n) for s, n in zip(_RA_STATES, events)])
+
+        family("tcas_spawned_total", "counter", "Intruders added.", [("", (), self.spawned)])
+        family("tcas_culled_total", "counter", "Intruders culled out of range.", [("", (), self.culled)])
+
+        if openmetrics:
+            out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+    def start_http(self, host: str = "127.0.0.1", port: int = 9464) -> Tuple[str, int]:
+        """Serves GET /metrics from a daemon thread; returns the bound (host, port)."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                om = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = metrics.render(openmetrics=om).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_TYPE if om else PROMETHEUS_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer((host, port), Handler)
+        self._http.daemon_threads = True
+        self._http_thread = threading.Thread(target=self._http.serve_forever, name="tcas-metrics", daemon=True)
+        self._http_thread.start()
+        return self._http.server_address[:2]
+
+    def close(self) -> None:
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http_thread.join()
+            self._http = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from tcas_sim.sim.simulator import Simulator
+
+    ap = argparse.ArgumentParser(description="Run a headless sim in real time with an OpenMetrics endpoint.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9464)
+    ap.add_argument("--scenario", help="scenario file (see sim.scenario); default: the GUI's random traffic")
+    ap.add_argument("--tick-hz", type=float, default=20.0, help="sim steps per second")
+    args = ap.parse_args(argv)
+
+    sim = Simulator.from_scenario(args.scenario) if args.scenario else Simulator()
+    metrics = SimMetrics().attach(sim)
+    host, port = metrics.start_http(args.host, args.port)
+    print(f"metrics on http://{host}:{port}/metrics", file=sys.stderr)
+    dt = 1.0 / args.tick_hz
+    nxt = time.monotonic()
+    try:
+        while True:
+            sim.step(dt)
+            nxt += dt
+            time.sleep(max(0.0, nxt - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        metrics.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
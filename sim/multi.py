@@ -0,0 +1,112 @@
+from __future__ import annotations
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from tcas_sim.enums import TrackState
+from tcas_sim.advisories.advisory import ResolutionAdvisory, TrafficAdvisory
+
+if TYPE_CHECKING:
+    from tcas_sim.sim.simulator import Simulator
+
+# TrafficFrame.states codes index this; -1 = not tracked by that view
+TRACK_STATES = tuple(TrackState)
+NOT_TRACKED = -1
+_STATE_CODE = {s: i for i, s in enumerate(TRACK_STATES)}
+
+
+@dataclass(frozen=True)
+class TrafficFrame:
+    """
+    One tick of a multi-ownship Simulator (see Simulator.equip), copied out once and shared by every
+    view. Aircraft arrays are indexed by aircraft ID (NaN = free ID); per-view fields follow `views`,
+    the viewing aircraft's IDs. A view whose aircraft is not (or no longer, e.g. culled) equipped
+    stays in place with live False.
+    """
+    t: float
+    views: np.ndarray  # K aircraft IDs
+    live: np.ndarray  # K
+    callsigns: Tuple[str, ...]  # K
+    x_nm: np.ndarray
+    y_nm: np.ndarray
+    altitudeFt: np.ndarray
+    verticalRateFpm: np.ndarray
+    headingDeg: np.ndarray
+    states: np.ndarray  # K x aircraft, int8 TRACK_STATES codes from each view's own TCAS
+    ta: Tuple[Optional[TrafficAdvisory], ...]
+    ra: Tuple[Optional[ResolutionAdvisory], ...]
+
+
+def equip_nearest(sim: "Simulator", n: int) -> List[int]:
+    """Equips the n intruders nearest the ownship; returns the view list (ownship first)."""
+    own = sim.ownship
+    nearest = sorted(sim.intruders, key=lambda a: math.hypot(a.x_nm - own.x_nm, a.y_nm - own.y_nm))[:n]
+    for ac in nearest:
+        sim.equip(ac.id)
+    return [own.id] + [ac.id for ac in nearest]
+
+
+def take_frame(sim: "Simulator", views: Sequence[int]) -> TrafficFrame:
+    """Copies the shared traffic and each view's TCAS picture; views are the ownship (ID 0) or equipped IDs."""
+    aircraft = sim.registry.aircraft
+    cap = len(aircraft)
+    x = np.full(cap, np.nan)
+    y = np.full(cap, np.nan)
+    alt = np.full(cap, np.nan)
+    vs = np.full(cap, np.nan)
+    hdg = np.full(cap, np.nan)
+    for ac in aircraft:
+        if ac is not None:
+            i = ac.id
+            x[i], y[i], alt[i], vs[i], hdg[i] = ac.x_nm, ac.y_nm, ac.altitudeFt, ac.verticalRateFpm, ac.headingDeg
+
+    k = len(views)
+    states = np.full((k, cap), NOT_TRACKED, dtype=np.int8)
+    live = np.zeros(k, dtype=bool)
+    callsigns, tas, ras = [], [], []
+    for row, ac_id in enumerate(views):
+        if ac_id == sim.ownship.id:
+            tracks, eng = sim.tcas.tracks, sim.advisory_engine
+        elif ac_id in sim.equipped:
+            eq = sim.equipped[ac_id]
+            tracks, eng = eq.tcas.tracks, eq.advisory_engine
+        else:
+            callsigns.append("")
+            tas.append(None)
+            ras.append(None)
+            continue
+        live[row] = True
+        callsigns.append(aircraft[ac_id].callsign)
+        tas.append(eng.ta)
+        ras.append(eng.ra)
+        codes = states[row]
+        for trk_id, trk in tracks.items():
+            codes[trk_id] = _STATE_CODE[trk.state]
+
+    return TrafficFrame(
+        t=sim.sim_time,
+        views=np.asarray(views, dtype=np.int64),
+        live=live,
+        callsigns=tuple(callsigns),
+        x_nm=x,
+        y_nm=y,
+        altitudeFt=alt,
+        verticalRateFpm=vs,
+        headingDeg=hdg,
+        states=states,
+        ta=tuple(tas),
+        ra=tuple(ras),
+    )
+
+
+def view_transforms(frame: TrafficFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rangeNm, bearingDeg, relativeAltitudeFt) of every aircraft from every view, each K x aircraft, in one pass."""
+    own = np.where(frame.live, frame.views, 0)
+    dx = frame.x_nm[None, :] - frame.x_nm[own][:, None]
+    dy = frame.y_nm[None, :] - frame.y_nm[own][:, None]
+    rng = np.hypot(dx, dy)
+    bearing = np.degrees(np.arctan2(dx, dy)) % 360.0
+    rel_alt = frame.altitudeFt[None, :] - frame.altitudeFt[own][:, None]
+    return rng, bearing, rel_alt
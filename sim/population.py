@@ -0,0 +1,143 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.core.transponder import Transponder
+from tcas_sim.enums import TransponderMode
+
+# relative-bearing sectors (deg off ownship's nose, both sides) an intruder of each threat geometry starts in
+GEOMETRIES = {
+    "any": (0.0, 180.0),
+    "head_on": (0.0, 15.0),
+    "crossing": (45.0, 135.0),
+    "overtaking": (165.0, 180.0),
+}
+
+
+@dataclass(frozen=True)
+class PopulationSpec:
+    """
+    Traffic distributions. Threat defaults match Simulator._spawn_intruder: threats start
+    0.8-2.2 NM out heading straight at ownship within 500 ft and closing vertically.
+    Background traffic uses its ranges (2-12 NM, +/-3000 ft) but draws headings uniformly
+    from headingDeg, where _spawn_intruder ties each heading to the spawn position.
+    """
+    threatFraction: float = 0.30
+    threatGeometry: Tuple[Tuple[str, float], ...] = (("any", 1.0),)  # (GEOMETRIES key, fraction of threats)
+    threatRangeNm: Tuple[float, float] = (0.8, 2.2)
+    threatRelAltFt: Tuple[int, int] = (-500, 500)
+    threatVerticalRatesFpm: Tuple[int, ...] = (500, 1000, 1500)  # magnitudes, signed toward ownship
+    threatGroundSpeedKt: Tuple[float, float] = (280.0, 520.0)
+    threatHeadingErrorDeg: float = 0.0  # +/- deviation from a collision heading
+
+    rangeNm: Tuple[float, float] = (2.0, 12.0)
+    relAltFt: Tuple[int, int] = (-3000, 3000)
+    altitudeBandFt: Optional[Tuple[int, int]] = None  # absolute clamp applied after relAltFt
+    verticalRatesFpm: Tuple[int, ...] = (-2000, -1500, -1000, -500, 0, 500, 1000, 1500, 2000)
+    groundSpeedKt: Tuple[float, float] = (180.0, 480.0)
+    headingDeg: Tuple[float, float] = (0.0, 360.0)
+
+    def __post_init__(self):
+        if not 0.0 <= self.threatFraction <= 1.0:
+            raise ValueError(f"threatFraction must be in [0, 1], got {self.threatFraction}")
+        unknown = [g for g, _ in self.threatGeometry if g not in GEOMETRIES]
+        if unknown:
+            raise ValueError(f"unknown threat geometry {unknown}, expected one of {tuple(GEOMETRIES)}")
+        total = sum(f for _, f in self.threatGeometry)
+        if not np.isclose(total, 1.0):
+            raise ValueError(f"threatGeometry fractions must sum to 1, got {total}")
+
+
+@dataclass
+class Population:
+    """Generated traffic as arrays (absolute position/altitude); `geometry` indexes GEOMETRIES, -1 = background."""
+    x_nm: np.ndarray
+    y_nm: np.ndarray
+    altitudeFt: np.ndarray
+    verticalRateFpm: np.ndarray
+    groundSpeedKt: np.ndarray
+    headingDeg: np.ndarray
+    isThreat: np.ndarray
+    geometry: np.ndarray
+    modeSAddress: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.x_nm.size)
+
+    def aircraft(self, prefix: str = "P") -> List[Tuple[Aircraft, Transponder]]:
+        width = max(5, len(str(max(0, len(self) - 1))))
+        out = []
+        for k, (x, y, alt, vs, gs, hdg, addr) in enumerate(zip(
+            self.x_nm.tolist(), self.y_nm.tolist(), self.altitudeFt.tolist(), self.verticalRateFpm.tolist(),
+            self.groundSpeedKt.tolist(), self.headingDeg.tolist(), self.modeSAddress.tolist(),
+        )):
+            ac = Aircraft(f"{prefix}{k:0{width}d}", alt, vs, gs, hdg, x, y, alt)
+            out.append((ac, Transponder(TransponderMode.MODE_S, "1200", True, f"{addr:06X}")))
+        return out
+
+
+def generate(
+    n: int,
+    spec: PopulationSpec = PopulationSpec(),
+    seed: int | np.random.Generator | None = None,
+    ownship: Optional[Aircraft] = None,
+) -> Population:
+    """
+    Draws n aircraft around `ownship` (origin, 12000 ft, heading 0 if None) in one vectorized pass.
+    Every parameter is drawn for all n aircraft in a fixed order and then selected by the threat
+    mask, so a given seed and spec give the same population bit for bit.
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    ox, oy = (ownship.x_nm, ownship.y_nm) if ownship else (0.0, 0.0)
+    oalt = ownship.altitudeFt if ownship else 12000
+    ohdg = ownship.headingDeg if ownship else 0.0
+
+    threat = rng.random(n) < spec.threatFraction
+    names = [g for g, _ in spec.threatGeometry]
+    geo = rng.choice(len(names), size=n, p=[f for _, f in spec.threatGeometry])
+    lo = np.array([GEOMETRIES[g][0] for g in names])[geo]
+    hi = np.array([GEOMETRIES[g][1] for g in names])[geo]
+    side = rng.choice((-1.0, 1.0), size=n)
+    t_bearing = ohdg + side * rng.uniform(lo, hi)
+    t_range = rng.uniform(*spec.threatRangeNm, size=n)
+    t_rel_alt = rng.integers(spec.threatRelAltFt[0], spec.threatRelAltFt[1], size=n, endpoint=True)
+    t_vs = rng.choice(np.asarray(spec.threatVerticalRatesFpm), size=n)
+    t_gs = rng.uniform(*spec.threatGroundSpeedKt, size=n)
+    t_hdg_err = rng.uniform(-spec.threatHeadingErrorDeg, spec.threatHeadingErrorDeg, size=n)
+
+    b_bearing = rng.uniform(0.0, 360.0, size=n)
+    b_range = rng.uniform(*spec.rangeNm, size=n)
+    b_rel_alt = rng.integers(spec.relAltFt[0], spec.relAltFt[1], size=n, endpoint=True)
+    b_vs = rng.choice(np.asarray(spec.verticalRatesFpm), size=n)
+    b_gs = rng.uniform(*spec.groundSpeedKt, size=n)
+    b_hdg = rng.uniform(*spec.headingDeg, size=n)
+
+    addr = rng.choice(2 ** 24, size=n, replace=False) if n else np.empty(0, dtype=np.int64)
+
+    bearing = np.where(threat, t_bearing, b_bearing)
+    rng_nm = np.where(threat, t_range, b_range)
+    brad = np.radians(bearing)
+    x = ox + np.sin(brad) * rng_nm
+    y = oy + np.cos(brad) * rng_nm
+
+    alt = oalt + np.where(threat, t_rel_alt, b_rel_alt)
+    if spec.altitudeBandFt is not None:
+        alt = np.clip(alt, *spec.altitudeBandFt)
+    # threats close vertically: descending if above ownship, climbing otherwise
+    vs = np.where(threat, np.where(alt > oalt, -t_vs, t_vs), b_vs)
+    hdg = np.where(threat, (bearing + 180.0 + t_hdg_err) % 360.0, b_hdg % 360.0)
+
+    return Population(
+        x_nm=x,
+        y_nm=y,
+        altitudeFt=alt.astype(np.int64),
+        verticalRateFpm=vs.astype(np.int64),
+        groundSpeedKt=np.where(threat, t_gs, b_gs),
+        headingDeg=hdg,
+        isThreat=threat,
+        geometry=np.where(threat, geo, -1),
+        modeSAddress=addr.astype(np.int64),
+    )
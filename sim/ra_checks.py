@@ -0,0 +1,93 @@
+from __future__ import annotations
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.enums import RAKind, RASense, TrackState
+from tcas_sim.tracking.track import Track
+from tcas_sim.advisories.logic import AdvisoryEngine, guidance_band
+
+Select = Callable[[List[Track], Aircraft, int], Tuple[RAKind, RASense, int]]
+
+ALIM_FT = 400
+OWN_ALT_FT = 12000
+
+
+@dataclass(frozen=True)
+class SenseCase:
+    """One threat relAltFt from ownship, closing with range tau tauSec; the RA must point away from it."""
+    name: str
+    relAltFt: int
+    ownVerticalRateFpm: int = 0
+    intruderVerticalRateFpm: int = 0
+    tauSec: float = 20.0
+
+    def expected(self) -> RASense:
+        return RASense.DOWNWARD if self.relAltFt > 0 else RASense.UPWARD
+
+
+CASES = (
+    SenseCase("level, threat above", 600),
+    SenseCase("level, threat below", -600),
+    SenseCase("level, threat just above", 250),
+    SenseCase("level, threat just below", -250),
+    SenseCase("climbing, threat above", 800, ownVerticalRateFpm=1000),
+    SenseCase("descending, threat below", -800, ownVerticalRateFpm=-1000),
+    SenseCase("descending, threat above", 500, ownVerticalRateFpm=-1000),
+    SenseCase("climbing, threat below", -500, ownVerticalRateFpm=1000),
+    SenseCase("level, threat above descending", 900, intruderVerticalRateFpm=-500),
+    SenseCase("level, threat below climbing", -900, intruderVerticalRateFpm=500),
+)
+
+
+def build(case: SenseCase) -> Tuple[Aircraft, List[Track]]:
+    own = Aircraft("OWN", OWN_ALT_FT, case.ownVerticalRateFpm, 250.0, 0.0)
+    ac = Aircraft("THREAT", OWN_ALT_FT + case.relAltFt, case.intruderVerticalRateFpm, 400.0, 180.0)
+    closure = 650.0
+    trk = Track(ac, 0.0, closure * case.tauSec / 3600.0, case.relAltFt, -closure, closure,
+                case.intruderVerticalRateFpm, 0, case.tauSec, float("inf"), True, TrackState.THREAT_RA,
+                int(case.tauSec), 0.0)
+    return own, [trk]
+
+
+def check(select: Select) -> List[str]:
+    """
+    Runs every case through `select` (an RA logic's select_ra); returns one message per failure.
+    A DO_NOT_CLIMB / DO_NOT_DESCEND must also leave level flight allowed.
+    """
+    bad = []
+    for case in CASES:
+        own, threats = build(case)
+        kind, sense, vs = select(threats, own, ALIM_FT)
+        if sense != case.expected():
+            bad.append(f"{case.name}: {kind.name} {sense.name} {vs} fpm, expected {case.expected().name}")
+        lo, hi = guidance_band(kind, vs)
+        if kind in (RAKind.DO_NOT_CLIMB, RAKind.DO_NOT_DESCEND) and not lo <= 0 <= hi:
+            bad.append(f"{case.name}: {kind.name} band {lo}..{hi} fpm forbids levelling off")
+    return bad
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="RA sense checks against single threats (non-zero exit on failure).")
+    ap.add_argument("--table", help="also check table_logic.TableLogic over this cost table")
+    args = ap.parse_args(argv)
+
+    logics = {"hand": AdvisoryEngine()._select_ra}
+    if args.table:
+        from tcas_sim.advisories.table_logic import TableLogic
+        logics["table"] = TableLogic.open(args.table).select_ra
+
+    bad = []
+    for name, select in logics.items():
+        msgs = check(select)
+        print(f"{name}: {len(CASES) - len(msgs)}/{len(CASES)} cases pass")
+        bad += [f"{name}: {m}" for m in msgs]
+    for msg in bad:
+        print(f"FAIL {msg}", file=sys.stderr)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
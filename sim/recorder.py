@@ -0,0 +1,253 @@
+from __future__ import annotations
+import math
+import os
+import queue
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from tcas_sim.enums import AdvisoryState, TrackState
+from tcas_sim.sim.events import ResolutionAdvisoryChanged
+
+NONE_CODE = 0  # enum columns hold Enum.value; 0 = no advisory / empty slot
+NO_AIRCRAFT = -1  # aircraftId of an empty track slot
+
+AP_MODES = ("ALT", "RA")
+
+TRACK_DTYPE = np.dtype([
+    ("aircraftId", "<i4"), ("state", "i1"), ("rangeNm", "<f4"), ("bearingDeg", "<f4"),
+    ("relativeAltitudeFt", "<i4"), ("intruderVerticalRateFpm", "<i4"), ("closureRateKts", "<f4"),
+    ("rangeTauSec", "<f4"), ("verticalTauSec", "<f4"),
+])
+
+# tracks are written in this order until the slots are full
+_SLOT_ORDER = (TrackState.THREAT_RA, TrackState.INTRUDER_TA, TrackState.PROXIMATE, TrackState.OTHER)
+
+# invariant(sim, ta, ra) -> failure message or None
+Invariant = Callable[[object, object, object], Optional[str]]
+
+
+def record_dtype(track_slots: int) -> np.dtype:
+    return np.dtype([
+        ("tick", "<i8"), ("t", "<f8"),
+        ("x_nm", "<f8"), ("y_nm", "<f8"), ("altitudeFt", "<i4"), ("verticalRateFpm", "<i4"),
+        ("groundSpeedKt", "<f4"), ("headingDeg", "<f4"), ("targetAltitudeFt", "<i4"),
+        ("sl", "i1"), ("ta", "?"),
+        ("raKind", "i1"), ("raSense", "i1"), ("raState", "i1"),
+        ("requiredVerticalRateFpm", "<i4"), ("minAllowedVSFpm", "<i4"), ("maxAllowedVSFpm", "<i4"),
+        ("apMode", "i1"), ("cmdVsFpm", "<i4"),
+        ("trackCount", "<i4"), ("tracks", TRACK_DTYPE, (track_slots,)),
+    ])
+
+
+def ra_without_threat(sim, ta, ra) -> Optional[str]:
+    if ra is not None and not sim.tracker.index.has_threats():
+        return "RA active without a THREAT_RA track"
+    return None
+
+
+def threat_not_altitude_reporting(sim, ta, ra) -> Optional[str]:
+    tracks = sim.tcas.tracks
+    for ac_id in sim.tracker.index.buckets[TrackState.THREAT_RA]:
+        trk = tracks.get(ac_id)
+        if trk is not None and not trk.isAltitudeReporting:
+            return f"THREAT_RA on non-altitude-reporting aircraft {ac_id}"
+    return None
+
+
+DEFAULT_INVARIANTS: Tuple[Invariant, ...] = (ra_without_threat, threat_not_altitude_reporting)
+
+
+class FlightRecorder:
+    """
+    Always-on flight data recorder: the last `seconds` of Simulator.step in a preallocated ring
+    of fixed-size records (ownship, SL, TA/RA, autopilot command, up to `track_slots` tracks,
+    RA threats first).
+
+    Recording writes scalars into column views of the ring; nothing is allocated per tick.
+    When an RA is issued or an invariant fails, the window is copied out (after `post_s` more
+    seconds, if set) and saved by a background thread as <out_dir>/fdr_<tick>_<reason>.npz.
+    Connect with attach(sim).
+    """
+    def __init__(
+        self,
+        out_dir: str,
+        seconds: float = 60.0,
+        max_rate_hz: float = 60.0,
+        track_slots: int = 16,
+        post_s: float = 0.0,
+        invariants: Tuple[Invariant, ...] = DEFAULT_INVARIANTS,
+        invariant_holdoff_s: float = 30.0,
+    ):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.seconds = float(seconds)
+        self.track_slots = int(track_slots)
+        self.post_s = float(post_s)
+        self.invariants = tuple(invariants)
+        self.invariant_holdoff_s = float(invariant_holdoff_s)
+
+        self.capacity = max(1, int(math.ceil(seconds * max_rate_hz)))
+        self.buffer = np.zeros(self.capacity, dtype=record_dtype(self.track_slots))
+        self._col = {name: self.buffer[name] for name in self.buffer.dtype.names if name != "tracks"}
+        tracks = self.buffer["tracks"]
+        self._trk = {name: tracks[name] for name in TRACK_DTYPE.names}
+        self.tick = 0  # records written so far; the next goes to tick % capacity
+
+        self._pending: List[Tuple[float, str]] = []  # (dump at t, reason)
+        self._last_invariant_t = -math.inf
+        self.dumps: List[str] = []
+
+        self._queue: "queue.Queue[Optional[Tuple[str, np.ndarray, str, float]]]" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._run, name="tcas-fdr", daemon=True)
+        self._writer.start()
+
+    def attach(self, sim) -> "FlightRecorder":
+        sim.recorder = self
+        sim.events.subscribe(ResolutionAdvisoryChanged, self._on_ra)
+        return self
+
+    # ---- sim thread -------------------------------------------------
+
+    def record(self, now: float, sim, ta, ra) -> None:
+        if self._error is not None:
+            raise RuntimeError("flight recorder writer failed") from self._error
+        i = self.tick % self.capacity
+        c = self._col
+        own = sim.ownship
+        c["tick"][i] = self.tick
+        c["t"][i] = now
+        c["x_nm"][i] = own.x_nm
+        c["y_nm"][i] = own.y_nm
+        c["altitudeFt"][i] = own.altitudeFt
+        c["verticalRateFpm"][i] = own.verticalRateFpm
+        c["groundSpeedKt"][i] = own.groundSpeedKt
+        c["headingDeg"][i] = own.headingDeg
+        c["targetAltitudeFt"][i] = own.targetAltitudeFt
+        c["sl"][i] = sim.tcas.currentSL.value
+        c["ta"][i] = ta is not None
+        if ra is not None:
+            c["raKind"][i] = ra.kind.value
+            c["raSense"][i] = ra.sense.value
+            c["raState"][i] = ra.state.value
+            c["requiredVerticalRateFpm"][i] = ra.requiredVerticalRateFpm
+            c["minAllowedVSFpm"][i] = ra.minAllowedVSFpm
+            c["maxAllowedVSFpm"][i] = ra.maxAllowedVSFpm
+        else:
+            c["raKind"][i] = c["raSense"][i] = c["raState"][i] = NONE_CODE
+            c["requiredVerticalRateFpm"][i] = c["minAllowedVSFpm"][i] = c["maxAllowedVSFpm"][i] = 0
+        c["apMode"][i] = AP_MODES.index(sim.ap_mode)
+        c["cmdVsFpm"][i] = sim.cmd_vs_fpm
+        self._record_tracks(i, sim)
+        self.tick += 1
+
+        for check in self.invariants:
+            msg = check(sim, ta, ra)
+            if msg is not None and now - self._last_invariant_t >= self.invariant_holdoff_s:
+                self._last_invariant_t = now
+                self.trigger(now, "invariant", msg)
+
+        if self._pending and now >= self._pending[0][0]:
+            self._dump_due(now)
+
+    def _record_tracks(self, i: int, sim) -> None:
+        tracks = sim.tcas.tracks
+        t = self._trk
+        slots = self.track_slots
+        k = 0
+        for state in _SLOT_ORDER:
+            if k == slots:
+                break
+            for ac_id in sim.tracker.index.buckets[state]:
+                trk = tracks.get(ac_id)
+                if trk is None:
+                    continue
+                t["aircraftId"][i, k] = ac_id
+                t["state"][i, k] = state.value
+                t["rangeNm"][i, k] = trk.rangeNm
+                t["bearingDeg"][i, k] = trk.bearingDeg
+                t["relativeAltitudeFt"][i, k] = trk.relativeAltitudeFt
+                t["intruderVerticalRateFpm"][i, k] = trk.intruderVerticalRateFpm
+                t["closureRateKts"][i, k] = trk.closureRateKts
+                t["rangeTauSec"][i, k] = trk.rangeTauSec
+                t["verticalTauSec"][i, k] = trk.verticalTauSec
+                k += 1
+                if k == slots:
+                    break
+        self._col["trackCount"][i] = len(tracks)
+        if k < slots:
+            t["state"][i, k:] = NONE_CODE
+            t["aircraftId"][i, k:] = NO_AIRCRAFT
+
+    def trigger(self, now: float, reason: str, detail: str = "") -> None:
+        """Schedules a dump of the window ending `post_s` from now."""
+        self._pending.append((now + self.post_s, reason if not detail else f"{reason}: {detail}"))
+
+    def _on_ra(self, ev: ResolutionAdvisoryChanged) -> None:
+        # a new RA, not a modification of one already active
+        if ev.previous is None and ev.state == AdvisoryState.ACTIVE:
+            self.trigger(ev.t, "ra", ev.ra.kind.name)
+
+    def _dump_due(self, now: float) -> None:
+        window = self.window(now)
+        while self._pending and now >= self._pending[0][0]:
+            _at, reason = self._pending.pop(0)
+            slug = reason.split(":", 1)[0].replace(" ", "_")
+            path = os.path.join(self.out_dir, f"fdr_{self.tick - 1:08d}_{slug}.npz")
+            self.dumps.append(path)
+            self._queue.put((path, window, reason, now))
+
+    def window(self, now: Optional[float] = None) -> np.ndarray:
+        """Copy of the records of the last `seconds` (ending at `now`), oldest first."""
+        n = min(self.tick, self.capacity)
+        start = self.tick - n
+        i0 = start % self.capacity
+        recs = np.concatenate((self.buffer[i0:], self.buffer[:i0])) if i0 else self.buffer.copy()
+        recs = recs[:n]
+        if now is not None and n:
+            recs = recs[recs["t"] >= now - self.seconds]
+        return recs
+
+    def flush(self) -> None:
+        """Dumps anything still waiting on its post-trigger window and waits for the writer."""
+        if self._pending and self.tick:
+            last = self.buffer["t"][(self.tick - 1) % self.capacity]
+            self._pending = [(min(at, last), reason) for at, reason in self._pending]
+            self._dump_due(float(last))
+        self._queue.join()
+        if self._error is not None:
+            raise RuntimeError("flight recorder writer failed") from self._error
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+
+    def __enter__(self) -> "FlightRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- writer thread ----------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, recs, reason, t = item
+                if self._error is None:
+                    np.savez(path, records=recs, reason=np.array(reason), t=np.array(t))
+            except BaseException as exc:
+                self._error = exc
+            finally:
+                self._queue.task_done()
+
+
+def load_dump(path: str) -> Tuple[np.ndarray, str, float]:
+    with np.load(path) as z:
+        return z["records"], str(z["reason"]), float(z["t"])
@@ -0,0 +1,52 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import List, Optional
+
+from tcas_sim.advisories.advisory import ResolutionAdvisory
+from tcas_sim.tracking.track import Track
+from tcas_sim.sim.clock import ManualClock
+from tcas_sim.sim.simulator import Simulator
+
+
+@dataclass
+class FrameRecord:
+    """Everything the scope + VSI need to draw one frame (picklable, detached from the live sim)."""
+    index: int
+    t: float
+    headingDeg: float
+    verticalRateFpm: int
+    ra: Optional[ResolutionAdvisory]
+    banner: str
+    tracks: List[Track]
+
+
+def capture_frame(sim: Simulator, index: int, ra: Optional[ResolutionAdvisory]) -> FrameRecord:
+    # tracks reference live Aircraft objects that keep moving; freeze copies
+    tracks = [replace(trk, intruder=replace(trk.intruder)) for trk in sim.tcas.tracks.values()]
+    return FrameRecord(
+        index=index,
+        t=sim.clock(),
+        headingDeg=sim.ownship.headingDeg,
+        verticalRateFpm=sim.ownship.verticalRateFpm,
+        ra=ra,
+        banner=sim.banner(),
+        tracks=tracks,
+    )
+
+
+def record_headless(sim: Simulator, duration_s: float, fps: float = 30.0) -> List[FrameRecord]:
+    """
+    Steps `sim` at a fixed frame rate without a GUI and returns one FrameRecord per frame.
+    The simulator must have been built with a ManualClock so the run is not paced by wall time.
+    """
+    if not isinstance(sim.clock, ManualClock):
+        raise ValueError("record_headless requires a Simulator driven by a ManualClock")
+
+    dt = 1.0 / fps
+    n_frames = int(round(duration_s * fps))
+    frames: List[FrameRecord] = []
+    for i in range(n_frames):
+        sim.clock.advance(dt)
+        _ta, ra, _entries = sim.step(dt)
+        frames.append(capture_frame(sim, i, ra))
+    return frames
@@ -0,0 +1,354 @@
+from __future__ import annotations
+import argparse
+import dataclasses
+import hashlib
+import json
+import math
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.core.transponder import Transponder
+from tcas_sim.core.registry import mode_s_int
+from tcas_sim.enums import SensitivityLevel, TCASMode, TransponderMode
+from tcas_sim.sensitivity.thresholds import SensitivityProfile, SensitivityThresholds
+from tcas_sim.sim.population import PopulationSpec, generate as generate_population
+
+# bump whenever the schema or the compiled layout changes; part of every cache key
+COMPILER_VERSION = 1
+
+NO_ADDRESS = -1  # modeSAddress of an intruder whose address is drawn when the scenario is loaded
+NO_TRANSPONDER = 0  # mode column of an aircraft without a transponder (TransponderMode values start at 1)
+
+AIRCRAFT_DTYPE = np.dtype([
+    ("callsign", "U16"), ("altitudeFt", "<i8"), ("verticalRateFpm", "<i8"), ("groundSpeedKt", "<f8"),
+    ("headingDeg", "<f8"), ("x_nm", "<f8"), ("y_nm", "<f8"), ("targetAltitudeFt", "<i8"),
+    ("mode", "i1"), ("squawk", "U4"), ("altitudeReporting", "?"), ("modeSAddress", "<i8"),
+])
+
+# one row per SensitivityLevel; None is stored as -1 (ints) / NaN (floats)
+THRESHOLD_DTYPE = np.dtype([
+    ("sl", "i1"), ("taTauSec", "<i4"), ("raTauSec", "<i4"), ("taDMODNm", "<f8"), ("raDMODNm", "<f8"),
+    ("taZTHRFt", "<i4"), ("raZTHRFt", "<i4"), ("alimFt", "<i4"),
+])
+
+_TOP_KEYS = {"name", "time_scale", "max_intruders", "threat_spawn_prob", "seed", "mode",
+             "ownship", "intruders", "population", "sensitivity"}
+_AIRCRAFT_KEYS = {"callsign", "altitudeFt", "verticalRateFpm", "groundSpeedKt", "headingDeg",
+                  "x_nm", "y_nm", "targetAltitudeFt"}
+_TRANSPONDER_KEYS = {"mode", "squawk", "altitudeReporting", "modeSAddress"}
+_POPULATION_KEYS = {"n", "seed", "prefix"} | {f.name for f in dataclasses.fields(PopulationSpec)}
+_THRESHOLD_KEYS = set(THRESHOLD_DTYPE.names) - {"sl"}
+
+
+@dataclass(frozen=True)
+class CompiledScenario:
+    """
+    A validated scenario as arrays, ready to instantiate (see Simulator.from_scenario).
+    Scripted and generated intruders are both rows of `intruders`; the arrays are read-only
+    so one compiled scenario can be shared by every simulator built from it.
+    """
+    digest: str
+    name: str
+    timeScale: float
+    maxIntruders: int
+    threatSpawnProb: float
+    seed: Optional[int]
+    tcasMode: TCASMode
+    ownship: np.ndarray  # AIRCRAFT_DTYPE, shape ()
+    intruders: np.ndarray  # AIRCRAFT_DTYPE, shape (N,)
+    thresholds: np.ndarray  # THRESHOLD_DTYPE, one row per SensitivityLevel
+
+    def profile(self) -> SensitivityProfile:
+        t = {}
+        for row in self.thresholds.tolist():
+            sl, ta_tau, ra_tau, ta_dmod, ra_dmod, ta_zthr, ra_zthr, alim = row
+            t[SensitivityLevel(sl)] = SensitivityThresholds(
+                SensitivityLevel(sl), ta_tau, _opt(ra_tau), ta_dmod, _opt(ra_dmod), ta_zthr, _opt(ra_zthr), _opt(alim),
+            )
+        return SensitivityProfile(thresholds=t)
+
+    def aircraft(self) -> Tuple[Aircraft, List[Tuple[Aircraft, Optional[Transponder]]]]:
+        """Fresh ownship and intruders; intruders with NO_ADDRESS get a transponder without an address ("")."""
+        own = _aircraft(self.ownship.tolist())
+        traffic = []
+        for row in self.intruders.tolist():
+            mode, squawk, alt_rep, addr = row[8:]
+            xpdr = None
+            if mode != NO_TRANSPONDER:
+                xpdr = Transponder(TransponderMode(mode), squawk, alt_rep, f"{addr:06X}" if addr != NO_ADDRESS else "")
+            traffic.append((_aircraft(row), xpdr))
+        return own, traffic
+
+
+def _opt(v):
+    return None if v == -1 or (isinstance(v, float) and math.isnan(v)) else v
+
+
+def _aircraft(row: tuple) -> Aircraft:
+    callsign, alt, vs, gs, hdg, x, y, target = row[:8]
+    return Aircraft(callsign, alt, vs, gs, hdg, x, y, target)
+
+
+# ---- parsing / validation --------------------------------------------
+
+def parse_scenario(data: bytes, fmt: str) -> dict:
+    """Decodes scenario file contents; fmt is "json" or "toml"."""
+    if fmt == "json":
+        return json.loads(data)
+    if fmt == "toml":
+        import tomllib  # Python 3.11+
+        return tomllib.loads(data.decode("utf-8"))
+    raise ValueError(f"unknown scenario format {fmt!r}, expected 'json' or 'toml'")
+
+
+def _check_keys(where: str, table: dict, allowed: set) -> None:
+    if not isinstance(table, dict):
+        raise ValueError(f"{where}: expected a table, got {type(table).__name__}")
+    unknown = sorted(set(table) - allowed)
+    if unknown:
+        raise ValueError(f"{where}: unknown key(s) {unknown}")
+
+
+def _aircraft_row(where: str, spec: dict, default_callsign: str, with_xpdr: bool) -> tuple:
+    _check_keys(where, spec, _AIRCRAFT_KEYS | (_TRANSPONDER_KEYS if with_xpdr else set()))
+    try:
+        alt = int(spec.get("altitudeFt", 12000))
+        row = [
+            str(spec.get("callsign", default_callsign)), alt, int(spec.get("verticalRateFpm", 0)),
+            float(spec.get("groundSpeedKt", 250.0)), float(spec.get("headingDeg", 0.0)) % 360.0,
+            float(spec.get("x_nm", 0.0)), float(spec.get("y_nm", 0.0)), int(spec.get("targetAltitudeFt", alt)),
+        ]
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"{where}: {exc}") from None
+    if len(row[0]) > AIRCRAFT_DTYPE["callsign"].itemsize // 4:
+        raise ValueError(f"{where}: callsign {row[0]!r} is too long")
+
+    if not with_xpdr:
+        return tuple(row) + (NO_TRANSPONDER, "", False, NO_ADDRESS)
+    mode = spec.get("mode", "MODE_S")
+    if mode is None or mode == "NONE":
+        return tuple(row) + (NO_TRANSPONDER, "", False, NO_ADDRESS)
+    if mode not in TransponderMode.__members__:
+        raise ValueError(f"{where}: unknown transponder mode {mode!r}, expected one of {list(TransponderMode.__members__)}")
+    squawk = str(spec.get("squawk", "1200"))
+    if len(squawk) != 4 or any(c not in "01234567" for c in squawk):
+        raise ValueError(f"{where}: squawk {squawk!r} is not a 4-digit octal code")
+    addr = spec.get("modeSAddress")
+    addr = NO_ADDRESS if addr is None else mode_s_int(addr)
+    return tuple(row) + (TransponderMode[mode].value, squawk, bool(spec.get("altitudeReporting", True)), addr)
+
+
+def _population_rows(spec: dict, seed: Optional[int], ownship: Aircraft) -> List[tuple]:
+    _check_keys("population", spec, _POPULATION_KEYS)
+    if "n" not in spec:
+        raise ValueError("population: missing aircraft count 'n'")
+    spec = dict(spec)
+    n = int(spec.pop("n"))
+    pop_seed = spec.pop("seed", seed)
+    if pop_seed is None:
+        raise ValueError("population: needs a seed (its own or the scenario's) so the scenario is reproducible")
+    prefix = str(spec.pop("prefix", "P"))
+    if isinstance(spec.get("threatGeometry"), dict):  # {head_on = 0.5, crossing = 0.5}
+        spec["threatGeometry"] = list(spec["threatGeometry"].items())
+    pop_spec = PopulationSpec(**{k: _as_tuple(v) for k, v in spec.items()})
+    pop = generate_population(n, pop_spec, int(pop_seed), ownship)
+    mode = TransponderMode.MODE_S.value
+    return [
+        (ac.callsign, ac.altitudeFt, ac.verticalRateFpm, ac.groundSpeedKt, ac.headingDeg, ac.x_nm, ac.y_nm,
+         ac.targetAltitudeFt, mode, xpdr.squawk, xpdr.altitudeReporting, mode_s_int(xpdr.modeSAddress))
+        for ac, xpdr in pop.aircraft(prefix)
+    ]
+
+
+def _as_tuple(v):
+    # TOML/JSON arrays -> the tuples PopulationSpec is declared with
+    return tuple(_as_tuple(x) for x in v) if isinstance(v, (list, tuple)) else v
+
+
+def _none_i(v) -> int:
+    return -1 if v is None else int(v)
+
+
+def _none_f(v) -> float:
+    return math.nan if v is None else float(v)
+
+
+def _thresholds(overrides: dict) -> np.ndarray:
+    rows = {}
+    for sl, t in SensitivityProfile.default_v71().thresholds.items():
+        rows[sl] = {f: getattr(t, f) for f in _THRESHOLD_KEYS}
+    _check_keys("sensitivity", overrides, set(SensitivityLevel.__members__) | {str(sl.value) for sl in SensitivityLevel})
+    for key, values in overrides.items():
+        sl = SensitivityLevel[key] if key in SensitivityLevel.__members__ else SensitivityLevel(int(key))
+        _check_keys(f"sensitivity.{sl.name}", values, _THRESHOLD_KEYS)
+        rows[sl].update(values)
+
+    out = np.zeros(len(rows), dtype=THRESHOLD_DTYPE)
+    for i, sl in enumerate(sorted(rows, key=lambda s: s.value)):
+        r = rows[sl]
+        out[i] = (sl.value, int(r["taTauSec"]), _none_i(r["raTauSec"]), float(r["taDMODNm"]), _none_f(r["raDMODNm"]),
+                  int(r["taZTHRFt"]), _none_i(r["raZTHRFt"]), _none_i(r["alimFt"]))
+        ra = (r["raTauSec"], r["raDMODNm"], r["raZTHRFt"], r["alimFt"])
+        if any(v is None for v in ra) and any(v is not None for v in ra):
+            raise ValueError(f"sensitivity.{sl.name}: raTauSec/raDMODNm/raZTHRFt/alimFt must all be set or all be omitted")
+    return out
+
+
+def compile_scenario(spec: dict, digest: str = "") -> CompiledScenario:
+    """Validates a decoded scenario and compiles it to arrays (generated traffic included)."""
+    _check_keys("scenario", spec, _TOP_KEYS)
+    seed = spec.get("seed")
+    mode = spec.get("mode", "TA_RA")
+    if mode not in TCASMode.__members__:
+        raise ValueError(f"scenario: unknown TCAS mode {mode!r}, expected one of {list(TCASMode.__members__)}")
+    time_scale = float(spec.get("time_scale", 1.0))
+    spawn_prob = float(spec.get("threat_spawn_prob", 0.30))
+    if time_scale <= 0.0:
+        raise ValueError(f"scenario: time_scale must be positive, got {time_scale}")
+    if not 0.0 <= spawn_prob <= 1.0:
+        raise ValueError(f"scenario: threat_spawn_prob must be in [0, 1], got {spawn_prob}")
+
+    own_row = _aircraft_row("ownship", spec.get("ownship", {}), "OWN", with_xpdr=False)
+    rows = [_aircraft_row(f"intruders[{k}]", s, f"I{k:03d}", with_xpdr=True) for k, s in enumerate(spec.get("intruders", []))]
+
+    scripted = [r[-1] for r in rows if r[-1] != NO_ADDRESS]
+    if len(set(scripted)) != len(scripted):
+        dup = sorted({a for a in scripted if scripted.count(a) > 1})
+        raise ValueError(f"intruders: duplicate Mode S address(es) {[f'{a:06X}' for a in dup]}")
+    if "population" in spec:
+        taken = set(scripted)
+        for r in _population_rows(spec["population"], seed, _aircraft(own_row)):
+            # generated addresses that collide with scripted ones are drawn again at load time
+            rows.append(r[:-1] + (NO_ADDRESS,) if r[-1] in taken else r)
+
+    intruders = np.array(rows, dtype=AIRCRAFT_DTYPE) if rows else np.zeros(0, dtype=AIRCRAFT_DTYPE)
+    return _freeze(CompiledScenario(
+        digest=digest,
+        name=str(spec.get("name", "")),
+        timeScale=time_scale,
+        maxIntruders=int(spec.get("max_intruders", 0)),
+        threatSpawnProb=spawn_prob,
+        seed=None if seed is None else int(seed),
+        tcasMode=TCASMode[mode],
+        ownship=np.array(own_row, dtype=AIRCRAFT_DTYPE),
+        intruders=intruders,
+        thresholds=_thresholds(spec.get("sensitivity", {})),
+    ))
+
+
+def _freeze(sc: CompiledScenario) -> CompiledScenario:
+    for arr in (sc.ownship, sc.intruders, sc.thresholds):
+        arr.setflags(write=False)
+    return sc
+
+
+# ---- cache -----------------------------------------------------------
+
+def default_cache_dir() -> str:
+    root = os.environ.get("TCAS_SIM_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "tcas_sim")
+    return os.path.join(root, "scenarios")
+
+
+def scenario_digest(data: bytes, fmt: str) -> str:
+    h = hashlib.sha256(f"tcas_sim-scenario/{COMPILER_VERSION}/{fmt}\n".encode())
+    h.update(data)
+    return h.hexdigest()
+
+
+def _save(sc: CompiledScenario, path: str) -> None:
+    meta = {"name": sc.name, "timeScale": sc.timeScale, "maxIntruders": sc.maxIntruders,
+            "threatSpawnProb": sc.threatSpawnProb, "seed": sc.seed, "tcasMode": sc.tcasMode.name}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write-then-rename so concurrent batch jobs never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), ownship=sc.ownship, intruders=sc.intruders, thresholds=sc.thresholds)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _load(path: str, digest: str) -> Optional[CompiledScenario]:
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            ownship, intruders, thresholds = z["ownship"], z["intruders"], z["thresholds"]
+    except (OSError, ValueError, KeyError):
+        return None  # missing or unreadable: recompile
+    if ownship.dtype != AIRCRAFT_DTYPE or intruders.dtype != AIRCRAFT_DTYPE or thresholds.dtype != THRESHOLD_DTYPE:
+        return None
+    return _freeze(CompiledScenario(
+        digest=digest, name=meta["name"], timeScale=meta["timeScale"], maxIntruders=meta["maxIntruders"],
+        threatSpawnProb=meta["threatSpawnProb"], seed=meta["seed"], tcasMode=TCASMode[meta["tcasMode"]],
+        ownship=ownship, intruders=intruders, thresholds=thresholds,
+    ))
+
+
+# compiled scenarios already seen by this process, by digest
+_memo: Dict[str, CompiledScenario] = {}
+
+
+def load_scenario(path: str, cache_dir: Optional[str] = "") -> CompiledScenario:
+    """
+    Compiled scenario for a .json/.toml file. Lookup order: this process's memo, then
+    <cache_dir>/<sha256>.npz, then parse + validate + compile (and write the cache).
+    cache_dir "" = default_cache_dir(), None = no on-disk cache.
+    """
+    fmt = os.path.splitext(path)[1].lower().lstrip(".")
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = scenario_digest(data, fmt)
+    sc = _memo.get(digest)
+    if sc is not None:
+        return sc
+
+    if cache_dir == "":
+        cache_dir = default_cache_dir()
+    cached = os.path.join(cache_dir, f"{digest}.npz") if cache_dir is not None else None
+    if cached is not None:
+        sc = _load(cached, digest)
+    if sc is None:
+        try:
+            sc = compile_scenario(parse_scenario(data, fmt), digest)
+        except ValueError as exc:
+            raise ValueError(f"{path}: {exc}") from None
+        if cached is not None:
+            try:
+                _save(sc, cached)
+            except OSError:
+                pass  # the cache only saves recompiling: an unwritable or full cache dir still loads
+    _memo[digest] = sc
+    return sc
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Validate scenario files and fill the compiled scenario cache.")
+    ap.add_argument("files", nargs="+", help=".json/.toml scenario files")
+    ap.add_argument("--cache-dir", default="", help="compiled scenario cache (default: $TCAS_SIM_CACHE/scenarios or ~/.cache/tcas_sim/scenarios)")
+    args = ap.parse_args(argv)
+
+    failed = 0
+    for path in args.files:
+        try:
+            sc = load_scenario(path, args.cache_dir)
+        except (OSError, ValueError) as exc:
+            print(f"FAIL {exc}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"ok   {path}  {sc.digest[:12]}  {sc.name or '-'}  intruders={len(sc.intruders)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+from __future__ import annotations
+import argparse
+import multiprocessing as mp
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.enums import TCASMode
+from tcas_sim.sensitivity.thresholds import SensitivityProfile
+from tcas_sim.tracking.logic import Tracker, compute_sl_from_altitude_ft
+from tcas_sim.sim.conflicts import candidate_pairs, STATE_BY_CODE
+
+# how far an equipped aircraft tracks others; also the halo width read across sector borders
+SURVEILLANCE_RANGE_NM = 14.0
+SURVEILLANCE_ALT_FT = 9900.0
+
+# state fields, double-buffered as state[buffer, field, aircraft]
+FIELDS = ("x_nm", "y_nm", "altitudeFt", "verticalRateFpm", "groundSpeedKt", "headingDeg")
+X, Y, ALT, VS, GS, HDG = range(len(FIELDS))
+
+# control block written by the coordinator before each tick
+CTRL_TICK, CTRL_T, CTRL_DT, CTRL_STOP = range(4)
+
+_CODE_BY_STATE = {s: c for c, s in enumerate(STATE_BY_CODE)}
+
+Spec = Tuple[str, Tuple[int, ...], str]  # shared memory name, shape, dtype
+
+
+def callsign_of(row: int) -> str:
+    return f"A{row:06d}"
+
+
+def _attach(spec: Spec) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+class _Sector:
+    """Worker-side state of one x-strip sector: the Trackers of the equipped aircraft it owns (row = aircraft ID)."""
+    def __init__(self, k: int, lo: float, hi: float, halo_nm: float, state, equipped, n_tracks, threat, handovers):
+        self.k, self.lo, self.hi, self.halo = k, lo, hi, halo_nm
+        self.state, self.equipped = state, equipped
+        self.n_tracks, self.threat, self.handovers = n_tracks, threat, handovers
+        self.profile = SensitivityProfile.default_v71()
+        self.trackers: Dict[int, Tracker] = {}
+        self.proxies: Dict[int, Aircraft] = {}
+
+    def _owned(self, buf: int) -> np.ndarray:
+        x = self.state[buf, X]
+        return np.flatnonzero((x >= self.lo) & (x < self.hi))
+
+    def move(self, cur: int, dt: float) -> None:
+        # every aircraft is owned by exactly one sector, so each row of the next buffer is written once
+        rows = self._owned(cur)
+        src, dst = self.state[cur][:, rows], self.state[1 - cur]
+        hdg = np.radians(src[HDG])
+        spd = src[GS] / 3600.0 * dt
+        dst[X, rows] = src[X] + np.sin(hdg) * spd
+        dst[Y, rows] = src[Y] + np.cos(hdg) * spd
+        dst[ALT, rows] = src[ALT] + src[VS] * dt / 60.0
+        dst[VS:, rows] = src[VS:]
+
+    def track(self, buf: int, now: float) -> None:
+        s = self.state[buf]
+        x = s[X]
+        local = np.flatnonzero((x >= self.lo - self.halo) & (x < self.hi + self.halo))  # owned + halo
+        owned_local = (x[local] >= self.lo) & (x[local] < self.hi)
+        own_eq = owned_local & self.equipped[local]
+
+        lx, ly, lalt = x[local], s[Y, local], s[ALT, local]
+        a, b = candidate_pairs(lx, ly, lalt, SURVEILLANCE_RANGE_NM, SURVEILLANCE_ALT_FT)
+        keep = np.hypot(lx[a] - lx[b], ly[a] - ly[b]) <= SURVEILLANCE_RANGE_NM
+        a, b = a[keep], b[keep]
+        # directed (ownship, intruder) pairs, ownship an equipped aircraft of this sector
+        own = np.concatenate((a[own_eq[a]], b[own_eq[b]]))
+        intr = np.concatenate((b[own_eq[a]], a[own_eq[b]]))
+        order = np.argsort(own, kind="stable")
+        own, intr = local[own[order]], local[intr[order]]
+        starts = np.searchsorted(own, local[own_eq])
+        ends = np.searchsorted(own, local[own_eq], side="right")
+
+        for r in np.unique(intr).tolist():
+            self._proxy(r, s)
+        owners = local[own_eq].tolist()
+        for row, s0, s1 in zip(owners, starts.tolist(), ends.tolist()):
+            ac = self._proxy(row, s)
+            trk = self.trackers.get(row)
+            if trk is None:
+                trk = self.trackers[row] = Tracker()
+            tracks = trk.update(
+                now=now,
+                ownship=ac,
+                intruders=[self.proxies[i] for i in intr[s0:s1].tolist()],
+                intruder_xpdrs=(),
+                tcas_mode=TCASMode.TA_RA,
+                thresholds=self.profile.thresholds[compute_sl_from_altitude_ft(ac.altitudeFt)],
+            )
+            self.n_tracks[row] = len(tracks)
+            self.threat[row] = max((_CODE_BY_STATE[t.state] for t in tracks.values()), default=0)
+
+        # equipped aircraft that left this sector are picked up (with fresh tracks) by their new owner
+        gone = self.trackers.keys() - set(owners)
+        for row in gone:
+            del self.trackers[row]
+        self.handovers[self.k] += len(gone)
+        if len(self.proxies) > 4 * max(1, local.size):
+            live = set(local.tolist())
+            self.proxies = {r: p for r, p in self.proxies.items() if r in live}
+
+    def _proxy(self, row: int, s: np.ndarray) -> Aircraft:
+        ac = self.proxies.get(row)
+        if ac is None:
+            ac = self.proxies[row] = Aircraft(callsign_of(row), 0, 0, 0.0, 0.0, id=row)
+        ac.x_nm = float(s[X, row])
+        ac.y_nm = float(s[Y, row])
+        ac.altitudeFt = int(s[ALT, row])
+        ac.verticalRateFpm = int(s[VS, row])
+        ac.groundSpeedKt = float(s[GS, row])
+        ac.headingDeg = float(s[HDG, row])
+        return ac
+
+
+def _worker(k: int, lo: float, hi: float, halo_nm: float, specs: Dict[str, Spec], start, phase, done) -> None:
+    shms, arr = [], {}
+    for key, spec in specs.items():
+        shm, arr[key] = _attach(spec)
+        shms.append(shm)
+    sector = _Sector(k, lo, hi, halo_nm, arr["state"], arr["equipped"], arr["nTracks"], arr["threat"], arr["handovers"])
+    ctrl = arr["ctrl"]
+    try:
+        while True:
+            start.wait()
+            if ctrl[CTRL_STOP]:
+                break
+            cur = int(ctrl[CTRL_TICK]) % 2
+            sector.move(cur, float(ctrl[CTRL_DT]))
+            phase.wait()  # next buffer complete: tracking may read any sector's rows
+            sector.track(1 - cur, float(ctrl[CTRL_T]))
+            done.wait()
+    finally:
+        del sector, arr, ctrl
+        for shm in shms:
+            shm.close()
+
+
+class SectorGrid:
+    """
+    Airspace split into x-strip sectors, one worker process each, advanced in lockstep.
+
+    Aircraft state lives in shared memory, double-buffered: on a tick each worker moves the
+    aircraft in its strip from the current buffer into the next (ownership follows position,
+    so border crossings need no hand-off of state), waits for all sectors, then runs a
+    Tracker for each equipped aircraft it owns against intruders read from its own strip
+    plus a halo of `halo_nm` into its neighbours. Results (track count, highest TrackState
+    code) are written back per aircraft. Strip edges are the quantiles of the initial x.
+    """
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        alt: np.ndarray,
+        vs: np.ndarray,
+        gs: np.ndarray,
+        hdg: np.ndarray,
+        equipped: np.ndarray,
+        sectors: int = 4,
+        halo_nm: float = SURVEILLANCE_RANGE_NM,
+        barrier_timeout_s: float = 120.0,
+    ):
+        n = len(x)
+        self.n = n
+        self.sectors = int(sectors)
+        self.timeout = barrier_timeout_s
+        self.tick = 0
+        self.t = 0.0
+
+        self._shms: List[shared_memory.SharedMemory] = []
+        self._specs: List[Tuple[str, shared_memory.SharedMemory, np.ndarray]] = []
+        self.state = self._alloc("state", (2, len(FIELDS), n), "<f8")
+        self.equipped = self._alloc("equipped", (n,), "?")
+        self.nTracks = self._alloc("nTracks", (n,), "<i4")
+        self.threat = self._alloc("threat", (n,), "i1")
+        self.handovers = self._alloc("handovers", (self.sectors,), "<i8")
+        self.ctrl = self._alloc("ctrl", (4,), "<f8")
+        for f, col in zip((X, Y, ALT, VS, GS, HDG), (x, y, alt, vs, gs, hdg)):
+            self.state[0, f] = col
+        self.equipped[:] = equipped
+
+        inner = np.quantile(x, np.linspace(0.0, 1.0, self.sectors + 1)[1:-1]) if n else np.zeros(self.sectors - 1)
+        self.edges = np.concatenate(([-np.inf], inner, [np.inf]))
+
+        ctx = mp.get_context()
+        self._start = ctx.Barrier(self.sectors + 1)
+        self._done = ctx.Barrier(self.sectors + 1)
+        self._phase = ctx.Barrier(self.sectors)  # kept referenced until spawned workers have unpickled it
+        specs = {key: (shm.name, arr.shape, arr.dtype.str) for key, shm, arr in self._specs}
+        self._procs = [
+            ctx.Process(
+                target=_worker,
+                args=(k, float(self.edges[k]), float(self.edges[k + 1]), halo_nm, specs, self._start, self._phase, self._done),
+                name=f"tcas-sector-{k}",
+                daemon=True,
+            )
+            for k in range(self.sectors)
+        ]
+        for p in self._procs:
+            p.start()
+
+    def _alloc(self, key: str, shape: Tuple[int, ...], dtype: str) -> np.ndarray:
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        self._shms.append(shm)
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        arr[...] = 0
+        self._specs.append((key, shm, arr))
+        return arr
+
+    def step(self, dt: float) -> None:
+        """Advance every sector by dt; returns once all sectors have moved and tracked."""
+        self.t += dt
+        self.ctrl[CTRL_TICK] = self.tick
+        self.ctrl[CTRL_T] = self.t
+        self.ctrl[CTRL_DT] = dt
+        self._start.wait(self.timeout)
+        self._done.wait(self.timeout)
+        self.tick += 1
+
+    def current(self) -> np.ndarray:
+        """View of the current state buffer as [field, aircraft] (see FIELDS)."""
+        return self.state[self.tick % 2]
+
+    def owner(self) -> np.ndarray:
+        """Sector index owning each aircraft."""
+        return np.searchsorted(self.edges, self.current()[X], side="right") - 1
+
+    def close(self) -> None:
+        if self._procs:
+            self.ctrl[CTRL_STOP] = 1
+            try:
+                self._start.wait(self.timeout)
+            except Exception:
+                pass
+            for p in self._procs:
+                p.join(self.timeout)
+                if p.is_alive():
+                    p.terminate()
+            self._procs = []
+        self._specs = []
+        self.state = self.equipped = self.nTracks = self.threat = self.handovers = self.ctrl = None
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+
+    def __enter__(self) -> "SectorGrid":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def random_traffic(n: int, extent_nm: float, equipped_frac: float = 0.3, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Uniform traffic over a square of side 2 * extent_nm, keyword arguments for SectorGrid."""
+    rng = np.random.default_rng(seed)
+    return dict(
+        x=rng.uniform(-extent_nm, extent_nm, n),
+        y=rng.uniform(-extent_nm, extent_nm, n),
+        alt=rng.uniform(2000.0, 40000.0, n),
+        vs=rng.choice([-2000.0, -1000.0, 0.0, 0.0, 0.0, 1000.0, 2000.0], n),
+        gs=rng.uniform(150.0, 520.0, n),
+        hdg=rng.uniform(0.0, 360.0, n),
+        equipped=rng.random(n) < equipped_frac,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Airspace-scale run over shared-memory sectors in worker processes.")
+    ap.add_argument("--aircraft", type=int, default=20000)
+    ap.add_argument("--extent", type=float, default=400.0, help="half-width of the square airspace (NM)")
+    ap.add_argument("--equipped", type=float, default=0.3, help="fraction of TCAS-equipped aircraft")
+    ap.add_argument("--sectors", type=int, default=4)
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--dt", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    traffic = random_traffic(args.aircraft, args.extent, args.equipped, args.seed)
+    with SectorGrid(**traffic, sectors=args.sectors) as grid:
+        t0 = time.perf_counter()
+        for _ in range(args.ticks):
+            grid.step(args.dt)
+        elapsed = time.perf_counter() - t0
+        eq = grid.equipped
+        counts = np.bincount(grid.threat[eq], minlength=len(STATE_BY_CODE))
+        print(f"{args.ticks / elapsed:.1f} ticks/s, {elapsed / args.ticks * 1e3:.1f} ms/tick, "
+              f"{int(grid.nTracks[eq].sum())} tracks, {int(grid.handovers.sum())} handovers")
+        print(", ".join(f"{s.name}={int(c)}" for s, c in zip(STATE_BY_CODE, counts)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
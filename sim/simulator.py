@@ -2,20 +2,79 @@ from __future__ import annotations
 import math
 import random
 import time
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+import numpy as np
 
 from tcas_sim.core.aircraft import Aircraft
 from tcas_sim.core.transponder import Transponder
 from tcas_sim.core.tcas import TCAS
+from tcas_sim.core.registry import AircraftRegistry
 from tcas_sim.enums import (
     TCASVersion, TCASMode, TransponderMode, DisplayColor, SymbolType,
-    ThreatLevel, VerticalTrend, TrackState, RAKind
+    ThreatLevel, VerticalTrend, TrackState, RAKind, AdvisoryState
 )
 from tcas_sim.sensitivity.thresholds import SensitivityProfile
 from tcas_sim.tracking.logic import Tracker, compute_sl_from_altitude_ft
 from tcas_sim.advisories.logic import AdvisoryEngine
 from tcas_sim.zones.airspace import AirspaceVolume
 from tcas_sim.cockpit.outputs import DisplayEntry
+from tcas_sim.tracking.track import Track
+from tcas_sim.tracking.surveillance import Surveillance
+from tcas_sim.sim.equipage import Equipage, accelerate_toward, ra_vs_command
+from tcas_sim.sim.population import Population, PopulationSpec, generate as generate_population
+from tcas_sim.sim.events import (
+    EventBus, TrackCreated, TrackDropped, TrackStateChanged,
+    TrafficAdvisoryIssued, TrafficAdvisoryCleared, ResolutionAdvisoryChanged,
+)
+
+if TYPE_CHECKING:  # annotation-only; from_scenario imports it lazily so `python -m tcas_sim.sim.scenario` runs cleanly
+    from tcas_sim.sim.scenario import CompiledScenario
+
+RA_BANNERS = {
+    RAKind.CLIMB: "CLIMB, CLIMB",
+    RAKind.DESCEND: "DESCEND, DESCEND",
+    RAKind.LEVEL_OFF: "LEVEL OFF, LEVEL OFF",
+    RAKind.DO_NOT_CLIMB: "MONITOR VERTICAL SPEED",
+    RAKind.DO_NOT_DESCEND: "MONITOR VERTICAL SPEED",
+    RAKind.INCREASE_CLIMB: "INCREASE CLIMB, INCREASE CLIMB",
+    RAKind.INCREASE_DESCEND: "INCREASE DESCENT, INCREASE DESCENT",
+    RAKind.MAINTAIN_VERTICAL_SPEED: "MAINTAIN VERTICAL SPEED, MAINTAIN",
+    RAKind.CROSSING_CLIMB: "CLIMB, CROSSING CLIMB",
+    RAKind.CROSSING_DESCEND: "DESCEND, CROSSING DESCEND",
+    RAKind.CROSSING_MAINTAIN: "MAINTAIN VERTICAL SPEED, CROSSING MAINTAIN",
+}
+TRAFFIC_BANNER = "TRAFFIC, TRAFFIC"
+
+# how long a banner stays up after its advisory clears
+RA_BANNER_HOLD_S = 5.0
+TA_BANNER_HOLD_S = 4.0
+
+# internal integration step, sim seconds: coarse while all traffic is well clear of its TA
+# triggers, fine near them and while an advisory is up (see Simulator._substep_limit)
+MAX_SUBSTEP_S = 1.0
+FINE_SUBSTEP_S = 0.1
+
+
+def time_to_trigger(trk: Track, tau_s: int, dmod_nm: float, zthr_ft: int) -> float:
+    """
+    Seconds until trk meets both the range and the vertical half of a TA/RA trigger at its current
+    closure rates (0 = already inside, inf = not converging); see tracking.logic.modified_tau_trigger.
+    """
+    if trk.rangeNm <= dmod_nm:
+        t_rng = 0.0
+    elif trk.closureRateKts > 1e-6:
+        t_rng = max(0.0, min(trk.rangeTauSec - tau_s, (trk.rangeNm - dmod_nm) / trk.closureRateKts * 3600.0))
+    else:
+        return math.inf
+    rel = abs(trk.relativeAltitudeFt)
+    if rel <= zthr_ft:
+        t_vert = 0.0
+    elif trk.verticalClosureFpm > 0:
+        t_vert = max(0.0, min(trk.verticalTauSec - tau_s, (rel - zthr_ft) / trk.verticalClosureFpm * 60.0))
+    else:
+        return math.inf
+    return max(t_rng, t_vert)
 
 
 class Simulator:
@@ -24,8 +83,17 @@ class Simulator:
         time_scale: float = 1.5,
         max_intruders: int = 10,
         threat_spawn_prob: float = 0.30,
+        clock: Callable[[], float] = time.time,
+        seed: int | None = None,
+        ra_logic=None,
+        surveillance: Surveillance | None = None,
     ):
+        self.clock = clock
+        self.rng = random.Random(seed)
         self.time_scale = float(time_scale)
+        self.max_substep_s = MAX_SUBSTEP_S
+        self.fine_substep_s = FINE_SUBSTEP_S
+        self.sim_time = 0.0  # seconds simulated so far; the tracker's and advisory engine's time base
         self.max_intruders = int(max_intruders)
         self.threat_spawn_prob = float(threat_spawn_prob)
 
@@ -41,13 +109,37 @@ class Simulator:
 
         self.protectedVolume = AirspaceVolume.from_thresholds(self.tcas.currentSL, self.tcas.activeThresholds)
 
+        # dense aircraft IDs (ownship is 0) and the Mode S address index; per-aircraft state is keyed by ID
+        self.registry = AircraftRegistry()
+        self.registry.register(self.ownship)
+        self._alt_rem: List[float] = [0.0]  # sub-foot altitude carried between substeps, indexed by aircraft ID
+
         self.intruders: List[Aircraft] = []
-        self.intruder_xpdrs: Dict[str, Transponder] = {}
 
-        self.tracker = Tracker()
-        self.advisory_engine = AdvisoryEngine()
+        self.tracker = Tracker(surveillance)  # None = exact truth positions (see tracking.surveillance)
+        self.advisory_engine = AdvisoryEngine(logic=ra_logic)
+
+        self.last_spawn = self.clock()
+
+        # transition events (track created/dropped/state, TA, RA); see sim.events
+        self.events = EventBus()
+
+        # optional per-tick stream consumer (see sim.export.StreamExporter)
+        self.exporter = None
+
+        # optional flight data recorder ring (see sim.recorder.FlightRecorder)
+        self.recorder = None
+
+        # optional live stream to remote displays (see sim.stream_server.StreamServer)
+        self.streamer = None
 
-        self.last_spawn = time.time()
+        # optional live counters / OpenMetrics endpoint (see sim.metrics.SimMetrics)
+        self.metrics = None
+        self.spawned = 0  # intruders added so far
+        self.culled = 0  # intruders culled out of range so far
+
+        # other TCAS-equipped aircraft by ID (see equip); their advisories are not published on `events`
+        self.equipped: Dict[int, Equipage] = {}
 
         # autopilot demo mode (not UML)
         self.ap_mode = "ALT"  # ALT or RA
@@ -57,96 +149,271 @@ class Simulator:
         self.banner_text = ""
         self.banner_until = 0.0
 
+    @classmethod
+    def from_scenario(
+        cls,
+        scenario: str | CompiledScenario,
+        clock: Callable[[], float] = time.time,
+        ra_logic=None,
+    ) -> "Simulator":
+        """Simulator set up from a scenario file (compiled once and cached, see sim.scenario) or a compiled scenario."""
+        from tcas_sim.sim.scenario import CompiledScenario, load_scenario
+
+        if not isinstance(scenario, CompiledScenario):
+            scenario = load_scenario(scenario)
+        sim = cls(
+            time_scale=scenario.timeScale,
+            max_intruders=scenario.maxIntruders,
+            threat_spawn_prob=scenario.threatSpawnProb,
+            clock=clock,
+            seed=scenario.seed,
+            ra_logic=ra_logic,
+        )
+        own, traffic = scenario.aircraft()
+        own.id = sim.ownship.id
+        sim.ownship.__dict__.update(own.__dict__)  # tcas and registry hold the ownship object
+
+        sim.profile = scenario.profile()
+        sim.tcas.sensitivityProfile = sim.profile
+        sim.tcas.mode = scenario.tcasMode
+        sim.tcas.set_sl(compute_sl_from_altitude_ft(sim.ownship.altitudeFt))
+        sim.protectedVolume = AirspaceVolume.from_thresholds(sim.tcas.currentSL, sim.tcas.activeThresholds)
+
+        for ac, xpdr in traffic:
+            if xpdr is not None and not xpdr.modeSAddress:
+                xpdr.modeSAddress = f"{sim._unused_address():06X}"
+            sim.add_intruder(ac, xpdr)
+        return sim
+
+    @property
+    def intruder_xpdrs(self) -> Sequence[Optional[Transponder]]:
+        """Transponders indexed by aircraft ID."""
+        return self.registry.transponders
+
+    def add_intruder(self, ac: Aircraft, xpdr: Transponder) -> int:
+        ac_id = self.registry.register(ac, xpdr)
+        if ac_id >= len(self._alt_rem):
+            self._alt_rem.extend([0.0] * (ac_id + 1 - len(self._alt_rem)))
+        self._alt_rem[ac_id] = 0.0
+        self.intruders.append(ac)
+        self.spawned += 1
+        return ac_id
+
+    def equip(self, ac_id: int, ra_logic=None) -> Equipage:
+        """Gives intruder ac_id its own TCAS and RA-following autopilot, sharing this sim's traffic (see sim.multi)."""
+        ac = self.registry.aircraft[ac_id] if 0 < ac_id < self.registry.capacity else None
+        if ac is None:
+            raise ValueError(f"no intruder with ID {ac_id}")
+        eq = self.equipped.get(ac_id)
+        if eq is None:
+            eq = self.equipped[ac_id] = Equipage(ac, self.profile, self.tcas.mode, ra_logic)
+        return eq
+
+    def _unused_address(self) -> int:
+        addr = self.rng.randint(0, 2**24 - 1)
+        while addr in self.registry.by_address:
+            addr = self.rng.randint(0, 2**24 - 1)
+        return addr
+
+    def spawn_population(
+        self,
+        n: int,
+        spec: PopulationSpec | None = None,
+        seed: int | None = None,
+        prefix: str = "P",
+    ) -> Population:
+        """Adds n intruders drawn in one vectorized batch around ownship (seeded from self.rng unless given)."""
+        if seed is None:
+            seed = self.rng.getrandbits(64)
+        pop = generate_population(n, spec or PopulationSpec(), seed, self.ownship)
+        taken = self.registry.by_address
+        if taken:
+            drawn = set(pop.modeSAddress.tolist())
+            for k in np.flatnonzero(np.isin(pop.modeSAddress, list(taken))).tolist():
+                addr = self._unused_address()
+                while addr in drawn:
+                    addr = self._unused_address()
+                drawn.add(addr)
+                pop.modeSAddress[k] = addr
+        for ac, xpdr in pop.aircraft(prefix):
+            self.add_intruder(ac, xpdr)
+        self.max_intruders = max(self.max_intruders, len(self.intruders))
+        return pop
+
     def set_banner(self, text: str, duration_s: float = 4.0):
         self.banner_text = text
-        self.banner_until = time.time() + duration_s
+        self.banner_until = self.clock() + duration_s
 
     def banner(self) -> str:
-        return self.banner_text if self.banner_text and time.time() <= self.banner_until else ""
+        return self.banner_text if self.banner_text and self.clock() <= self.banner_until else ""
 
     def step(self, dt_real: float):
-        now = time.time()
+        """
+        Advances dt_real wall seconds (dt_real * time_scale simulated) in substeps no longer than
+        _substep_limit(), so results do not depend on the tick rate or time_scale.
+        """
+        t0 = time.perf_counter() if self.metrics is not None else 0.0
+        now = self.clock()
         dt = dt_real * self.time_scale
 
+        # spawn intruders
+        if now - self.last_spawn > self.rng.uniform(1.6, 3.2) and len(self.intruders) < self.max_intruders:
+            self.last_spawn = now
+            self.add_intruder(*self._spawn_intruder())
+
+        remaining = max(0.0, dt)
+        while True:
+            n = max(1, math.ceil(remaining / self._substep_limit() - 1e-9))
+            h = remaining / n
+            ta, ra = self._substep(now, h)
+            remaining -= h
+            if remaining <= 1e-9:
+                break
+
+        # build display entries (UML object DisplayEntry)
+        display_entries = self._build_display_entries()
+
+        if self.exporter is not None:
+            self.exporter.record(now, self, ta, ra, display_entries)
+        if self.recorder is not None:
+            self.recorder.record(now, self, ta, ra)
+        if self.streamer is not None:
+            self.streamer.record(now, self, ta, ra)
+        if self.metrics is not None:
+            self.metrics.record(self, ta, ra, time.perf_counter() - t0)
+
+        return ta, ra, display_entries
+
+    def _substep(self, now: float, dt: float):
+        """One integration step of dt sim seconds; events are stamped with the tick's wall time `now`."""
+        self.sim_time += dt
+
         # SL update from altitude
         sl = compute_sl_from_altitude_ft(self.ownship.altitudeFt)
         if sl != self.tcas.currentSL:
             self.tcas.set_sl(sl)
             self.protectedVolume = AirspaceVolume.from_thresholds(sl, self.tcas.activeThresholds)
 
-        # spawn intruders
-        if now - self.last_spawn > random.uniform(1.6, 3.2) and len(self.intruders) < self.max_intruders:
-            self.last_spawn = now
-            ac, xpdr = self._spawn_intruder()
-            self.intruders.append(ac)
-            self.intruder_xpdrs[ac.callsign] = xpdr
-
         # move intruders
         for ac in self.intruders:
             spd_nmps = ac.groundSpeedKt / 3600.0
             hdg = math.radians(ac.headingDeg)
             ac.x_nm += math.sin(hdg) * spd_nmps * dt
             ac.y_nm += math.cos(hdg) * spd_nmps * dt
-            ac.altitudeFt += int(ac.verticalRateFpm * dt / 60.0)
+            self._climb(ac, dt)
 
-        # cull far
-        self.intruders = [a for a in self.intruders if math.hypot(a.x_nm, a.y_nm) < 16.0]
-        self.intruder_xpdrs = {cs: xp for cs, xp in self.intruder_xpdrs.items() if any(a.callsign == cs for a in self.intruders)}
+        # cull far (their IDs are released for reuse)
+        keep: List[Aircraft] = []
+        for a in self.intruders:
+            if math.hypot(a.x_nm, a.y_nm) < 16.0:
+                keep.append(a)
+            else:
+                self.equipped.pop(a.id, None)
+                self.registry.release(a.id)
+        self.culled += len(self.intruders) - len(keep)
+        self.intruders = keep
 
         # tracks
+        prev_tracks = self.tcas.tracks
         self.tcas.tracks = self.tracker.update(
-            now=now,
+            now=self.sim_time,
             ownship=self.ownship,
             intruders=self.intruders,
             intruder_xpdrs=self.intruder_xpdrs,
             tcas_mode=self.tcas.mode,
             thresholds=self.tcas.activeThresholds,
         )
+        self._publish_track_changes(now, prev_tracks, self.tcas.tracks)
 
         # advisories
+        prev_ta, prev_ra = self.advisory_engine.ta, self.advisory_engine.ra
         ta, ra = self.advisory_engine.update(
-            now=now,
+            now=self.sim_time,
             ownship=self.ownship,
             tcas_mode=self.tcas.mode,
             thresholds=self.tcas.activeThresholds,
             tracks=list(self.tcas.tracks.values()),
+            index=self.tracker.index,
         )
-
-        # update banner on transitions
-        if ra and ra.kind in (RAKind.CLIMB, RAKind.DESCEND, RAKind.LEVEL_OFF):
-            if ra.kind == RAKind.CLIMB:
-                self.set_banner("CLIMB, CLIMB", 5.0)
-            elif ra.kind == RAKind.DESCEND:
-                self.set_banner("DESCEND, DESCEND", 5.0)
-            elif ra.kind == RAKind.LEVEL_OFF:
-                self.set_banner("LEVEL OFF, LEVEL OFF", 5.0)
-        elif ta and not ra:
-            self.set_banner("TRAFFIC, TRAFFIC", 4.0)
-        elif (not ta) and (not ra) and self.advisory_engine.primaryThreat is None:
-            # optional: could detect a true RA->NONE transition more precisely
-            pass
+        if ta is not prev_ta or ra is not prev_ra:
+            self._on_advisory_transition(now, prev_ta, prev_ra, ta, ra)
 
         # apply autopilot (demo)
         self._autopilot_step(dt, ra)
 
-        # build display entries (UML object DisplayEntry)
-        display_entries = self._build_display_entries()
-
-        return ta, ra, display_entries
+        if self.equipped:
+            traffic = [self.ownship] + self.intruders
+            for eq in self.equipped.values():
+                own = eq.aircraft
+                eq.update(self.sim_time, dt, [a for a in traffic if a is not own], self.intruder_xpdrs)
+        return ta, ra
+
+    def _substep_limit(self) -> float:
+        """Half the shortest time for any track to reach its TA trigger, within [fine_substep_s, max_substep_s]."""
+        fine = self.fine_substep_s
+        lead = math.inf
+        pipelines = [(self.tcas, self.tracker, self.advisory_engine)]
+        pipelines += [(eq.tcas, eq.tracker, eq.advisory_engine) for eq in self.equipped.values()]
+        for tcas, tracker, eng in pipelines:
+            if eng.ta is not None or eng.ra is not None or tracker.index.has_intruders():
+                return fine
+            th = tcas.activeThresholds
+            for trk in tcas.tracks.values():
+                lead = min(lead, time_to_trigger(trk, th.taTauSec, th.taDMODNm, th.taZTHRFt))
+                if lead <= 2.0 * fine:
+                    return fine
+        return min(self.max_substep_s, 0.5 * lead)
+
+    def _climb(self, ac: Aircraft, dt: float) -> None:
+        # whole feet into altitudeFt, the fraction carried so small substeps still climb
+        z = self._alt_rem[ac.id] + ac.verticalRateFpm * dt / 60.0
+        ft = int(z)
+        ac.altitudeFt += ft
+        self._alt_rem[ac.id] = z - ft
+
+    def _publish_track_changes(self, now: float, prev: Dict[int, Track], cur: Dict[int, Track]) -> None:
+        bus = self.events
+        if not bus.wants(TrackCreated, TrackDropped, TrackStateChanged):
+            return
+        for ac_id, trk in cur.items():
+            old = prev.get(ac_id)
+            if old is None or old.intruder is not trk.intruder:
+                if old is not None:
+                    bus.publish(TrackDropped(now, ac_id, old))  # ID reused by a new aircraft
+                bus.publish(TrackCreated(now, ac_id, trk))
+            elif old.state != trk.state:
+                bus.publish(TrackStateChanged(now, ac_id, old.state, trk.state, trk))
+        for ac_id, old in prev.items():
+            if ac_id not in cur:
+                bus.publish(TrackDropped(now, ac_id, old))
+
+    def _on_advisory_transition(self, now: float, prev_ta, prev_ra, ta, ra) -> None:
+        bus = self.events
+        if ta is not prev_ta and bus.wants(TrafficAdvisoryIssued, TrafficAdvisoryCleared):
+            bus.publish(TrafficAdvisoryIssued(now, ta) if ta is not None else TrafficAdvisoryCleared(now, prev_ta))
+        if ra is not prev_ra and bus.wants(ResolutionAdvisoryChanged):
+            state = ra.state if ra is not None else AdvisoryState.TERMINATED
+            bus.publish(ResolutionAdvisoryChanged(now, state, ra, prev_ra, self.advisory_engine.primaryThreat))
+
+        # banners stay up while their advisory is active, then hold briefly after it clears
+        if ra is not None:
+            if ra is not prev_ra and ra.kind in RA_BANNERS:
+                self.set_banner(RA_BANNERS[ra.kind], math.inf)
+        elif ta is not None and (prev_ra is not None or prev_ta is None):
+            self.set_banner(TRAFFIC_BANNER, math.inf)
+        elif math.isinf(self.banner_until):
+            self.banner_until = now + (RA_BANNER_HOLD_S if prev_ra is not None else TA_BANNER_HOLD_S)
 
     def _autopilot_step(self, dt: float, ra):
+        err = self.ownship.targetAltitudeFt - self.ownship.altitudeFt
+        alt_hold_vs = int(max(-3000, min(3000, err * 3)))
         if self.ap_mode == "RA" and ra is not None:
-            desired_vs = ra.requiredVerticalRateFpm
-            if ra.kind == RAKind.LEVEL_OFF:
-                desired_vs = 0
-            self.cmd_vs_fpm = desired_vs
+            # preventive RAs keep flying the altitude bug, just inside the allowed band
+            self.cmd_vs_fpm = ra_vs_command(ra, alt_hold_vs)
         else:
-            err = self.ownship.targetAltitudeFt - self.ownship.altitudeFt
-            self.cmd_vs_fpm = int(max(-3000, min(3000, err * 3)))
-
-        dv = self.cmd_vs_fpm - self.ownship.verticalRateFpm
-        self.ownship.verticalRateFpm += int(max(-450, min(450, dv)))
-        self.ownship.altitudeFt += int(self.ownship.verticalRateFpm * dt / 60.0)
+            self.cmd_vs_fpm = alt_hold_vs
+        accelerate_toward(self.ownship, self.cmd_vs_fpm, dt)
+        self._climb(self.ownship, dt)
 
     def _build_display_entries(self) -> List[DisplayEntry]:
         entries: List[DisplayEntry] = []
@@ -190,34 +457,34 @@ class Simulator:
 
     def _spawn_intruder(self) -> tuple[Aircraft, Transponder]:
         own = self.ownship
-        make_threat = (random.random() < self.threat_spawn_prob)
+        make_threat = (self.rng.random() < self.threat_spawn_prob)
 
         if make_threat:
-            r = random.uniform(0.8, 2.2)
-            theta = random.uniform(0, 2 * math.pi)
+            r = self.rng.uniform(0.8, 2.2)
+            theta = self.rng.uniform(0, 2 * math.pi)
             x = math.cos(theta) * r
             y = math.sin(theta) * r
             hdg = (math.degrees(math.atan2(-x, -y)) + 360.0) % 360.0
-            alt = own.altitudeFt + random.randint(-500, 500)
-            vr = random.choice([-1500, -1000, -500]) if alt > own.altitudeFt else random.choice([500, 1000, 1500])
-            gs = random.uniform(280, 520)
+            alt = own.altitudeFt + self.rng.randint(-500, 500)
+            vr = self.rng.choice([-1500, -1000, -500]) if alt > own.altitudeFt else self.rng.choice([500, 1000, 1500])
+            gs = self.rng.uniform(280, 520)
         else:
-            r = random.uniform(2.0, 12.0)
-            theta = random.uniform(0, 2 * math.pi)
+            r = self.rng.uniform(2.0, 12.0)
+            theta = self.rng.uniform(0, 2 * math.pi)
             x = math.cos(theta) * r
             y = math.sin(theta) * r
             hdg = (math.degrees(theta) + 180) % 360
-            alt = own.altitudeFt + random.randint(-3000, 3000)
-            vr = random.choice([-2000, -1500, -1000, -500, 0, 500, 1000, 1500, 2000])
-            gs = random.uniform(180, 480)
+            alt = own.altitudeFt + self.rng.randint(-3000, 3000)
+            vr = self.rng.choice([-2000, -1500, -1000, -500, 0, 500, 1000, 1500, 2000])
+            gs = self.rng.uniform(180, 480)
 
-        callsign = f"AC{random.randint(10, 99)}"
+        callsign = f"AC{self.rng.randint(10, 99)}"
         ac = Aircraft(callsign, int(alt), int(vr), float(gs), float(hdg), float(x), float(y), int(alt))
 
         xpdr = Transponder(
             mode=TransponderMode.MODE_S,
             squawk="1200",
             altitudeReporting=True,
-            modeSAddress=f"{random.randint(0, 2**24 - 1):06X}",
+            modeSAddress=f"{self._unused_address():06X}",
         )
         return ac, xpdr
@@ -0,0 +1,165 @@
+from __future__ import annotations
+import pickle
+import time
+from dataclasses import astuple, dataclass
+from typing import Optional, Tuple
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.core.transponder import Transponder
+from tcas_sim.tracking.track import Track
+from tcas_sim.advisories.advisory import TrafficAdvisory, ResolutionAdvisory
+from tcas_sim.zones.airspace import AirspaceVolume
+from tcas_sim.sensitivity.thresholds import SensitivityProfile, SensitivityThresholds
+from tcas_sim.sim.clock import ManualClock
+from tcas_sim.sim.simulator import Simulator
+
+SNAPSHOT_VERSION = 4
+
+
+@dataclass(frozen=True)
+class SimSnapshot:
+    """
+    Immutable copy of every piece of mutable Simulator state, flattened to tuples
+    of primitives/enums so it pickles small and restores without deep copies.
+    """
+    version: int
+
+    clock: Optional[float]  # ManualClock time; None when the sim runs on wall time
+    simTime: float
+    config: Tuple[float, int, float]  # time_scale, max_intruders, threat_spawn_prob
+    rngState: tuple
+
+    ownship: tuple
+    intruders: Tuple[tuple, ...]
+    xpdrs: Tuple[tuple, ...]
+    altRemainder: Tuple[float, ...]  # by aircraft ID
+
+    tcasMode: object
+    profile: Tuple[tuple, ...]  # SensitivityThresholds rows, e.g. a scenario's overrides
+    currentSL: object
+    tracks: Tuple[tuple, ...]
+    prevRange: Tuple[tuple, ...]
+
+    ta: Optional[tuple]
+    ra: Optional[tuple]
+    primaryThreat: Optional[int]
+
+    apMode: str
+    cmdVsFpm: int
+    banner: Tuple[str, float]
+    lastSpawn: float
+
+    def to_bytes(self) -> bytes:
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "SimSnapshot":
+        snap = pickle.loads(data)
+        if not isinstance(snap, SimSnapshot) or snap.version != SNAPSHOT_VERSION:
+            raise ValueError("incompatible simulator snapshot")
+        return snap
+
+
+def _ac_tuple(ac: Aircraft) -> tuple:
+    return (ac.callsign, ac.altitudeFt, ac.verticalRateFpm, ac.groundSpeedKt, ac.headingDeg,
+            ac.x_nm, ac.y_nm, ac.targetAltitudeFt, ac.id)
+
+
+def _load_ac(ac: Aircraft, t: tuple) -> None:
+    (ac.callsign, ac.altitudeFt, ac.verticalRateFpm, ac.groundSpeedKt, ac.headingDeg,
+     ac.x_nm, ac.y_nm, ac.targetAltitudeFt, ac.id) = t
+
+
+def _track_tuple(ac_id: int, trk: Track) -> tuple:
+    return (ac_id, trk.bearingDeg, trk.rangeNm, trk.relativeAltitudeFt, trk.rangeRateKts, trk.closureRateKts,
+            trk.intruderVerticalRateFpm, trk.verticalClosureFpm, trk.rangeTauSec, trk.verticalTauSec,
+            trk.isAltitudeReporting, trk.state, trk.timeToConflictSec, trk.lastUpdateAt)
+
+
+def _ra_tuple(ra: ResolutionAdvisory) -> tuple:
+    return (ra.issuedAt, ra.state, ra.kind, ra.sense, ra.requiredVerticalRateFpm,
+            ra.minAllowedVSFpm, ra.maxAllowedVSFpm, ra.alimFt)
+
+
+def take_snapshot(sim: Simulator) -> SimSnapshot:
+    if sim.tracker.surveillance is not None:
+        raise ValueError("snapshots do not cover surveillance filter state; use a truth-tracking Simulator")
+    if sim.equipped:
+        raise ValueError("snapshots do not cover equipped intruders (Simulator.equip)")
+    eng = sim.advisory_engine
+    return SimSnapshot(
+        version=SNAPSHOT_VERSION,
+        clock=sim.clock.now if isinstance(sim.clock, ManualClock) else None,
+        simTime=sim.sim_time,
+        config=(sim.time_scale, sim.max_intruders, sim.threat_spawn_prob),
+        rngState=sim.rng.getstate(),
+        ownship=_ac_tuple(sim.ownship),
+        intruders=tuple(_ac_tuple(ac) for ac in sim.intruders),
+        xpdrs=tuple((ac.id, x.mode, x.squawk, x.altitudeReporting, x.modeSAddress)
+                    for ac in sim.intruders if (x := sim.registry.transponders[ac.id]) is not None),
+        altRemainder=tuple(sim._alt_rem),
+        tcasMode=sim.tcas.mode,
+        profile=tuple(astuple(t) for t in sim.profile.thresholds.values()),
+        currentSL=sim.tcas.currentSL,
+        tracks=tuple(_track_tuple(ac_id, trk) for ac_id, trk in sim.tcas.tracks.items()),
+        prevRange=tuple((ac_id, *sim.tracker.previous_range(ac_id)) for ac_id in sim.tcas.tracks
+                        if sim.tracker.previous_range(ac_id) is not None),
+        ta=None if eng.ta is None else (eng.ta.issuedAt, eng.ta.state),
+        ra=None if eng.ra is None else _ra_tuple(eng.ra),
+        primaryThreat=eng.primaryThreat,
+        apMode=sim.ap_mode,
+        cmdVsFpm=sim.cmd_vs_fpm,
+        banner=(sim.banner_text, sim.banner_until),
+        lastSpawn=sim.last_spawn,
+    )
+
+
+def restore_snapshot(sim: Simulator, snap: SimSnapshot) -> Simulator:
+    """Overwrites `sim` in place with the snapshot state. Ownship/TCAS object identity is preserved."""
+    if snap.version != SNAPSHOT_VERSION:
+        raise ValueError(f"snapshot version {snap.version} != {SNAPSHOT_VERSION}")
+
+    if snap.clock is not None:
+        if not isinstance(sim.clock, ManualClock):
+            sim.clock = ManualClock()
+        sim.clock.now = snap.clock
+    sim.sim_time = snap.simTime
+    sim.time_scale, sim.max_intruders, sim.threat_spawn_prob = snap.config
+    sim.rng.setstate(snap.rngState)
+
+    _load_ac(sim.ownship, snap.ownship)
+    sim.intruders = [Aircraft(*t) for t in snap.intruders]
+    xpdrs = {ac_id: Transponder(mode, squawk, alt_rep, addr) for ac_id, mode, squawk, alt_rep, addr in snap.xpdrs}
+    sim.registry.restore([(sim.ownship, None)] + [(ac, xpdrs.get(ac.id)) for ac in sim.intruders])
+    sim._alt_rem = list(snap.altRemainder) + [0.0] * max(0, sim.registry.capacity - len(snap.altRemainder))
+
+    sim.tcas.mode = snap.tcasMode
+    sim.profile = SensitivityProfile(thresholds={row[0]: SensitivityThresholds(*row) for row in snap.profile})
+    sim.tcas.sensitivityProfile = sim.profile
+    sim.tcas.set_sl(snap.currentSL)
+    sim.protectedVolume = AirspaceVolume.from_thresholds(sim.tcas.currentSL, sim.tcas.activeThresholds)
+
+    aircraft = sim.registry.aircraft
+    sim.tcas.tracks = {t[0]: Track(aircraft[t[0]], *t[1:]) for t in snap.tracks
+                       if t[0] < len(aircraft) and aircraft[t[0]] is not None}
+    sim.tracker.restore(snap.prevRange, sim.tcas.tracks)
+
+    eng = sim.advisory_engine
+    eng.ta = None if snap.ta is None else TrafficAdvisory(*snap.ta)
+    eng.ra = None if snap.ra is None else ResolutionAdvisory(*snap.ra)
+    eng.primaryThreat = snap.primaryThreat
+
+    sim.ap_mode = snap.apMode
+    sim.cmd_vs_fpm = snap.cmdVsFpm
+    sim.banner_text, sim.banner_until = snap.banner
+    sim.last_spawn = snap.lastSpawn
+    return sim
+
+
+def fork(snap: SimSnapshot) -> Simulator:
+    """Builds a fresh, independent Simulator from a snapshot (e.g. inside a pool worker)."""
+    clock = ManualClock(snap.clock) if snap.clock is not None else time.time
+    time_scale, max_intruders, threat_spawn_prob = snap.config
+    sim = Simulator(time_scale=time_scale, max_intruders=max_intruders,
+                    threat_spawn_prob=threat_spawn_prob, clock=clock)
+    return restore_snapshot(sim, snap)
@@ -0,0 +1,475 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import base64
+import hashlib
+import socket
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from tcas_sim.sim.recorder import NONE_CODE, NO_AIRCRAFT
+
+FRAME_MAGIC = b"TCSF"
+FRAME_VERSION = 1
+KEYFRAME, DELTA = 0, 1
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"  # RFC 6455 section 1.3
+OP_CONT, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+MAX_CLIENT_PAYLOAD = 64 * 1024  # clients only send control frames; anything bigger is closed (1009)
+
+# per-track wire record, quantized so unchanged tracks compare equal between ticks
+TAU_INF = 0xFFFF
+TRACK_WIRE_DTYPE = np.dtype([
+    ("aircraftId", "<i4"), ("state", "i1"),
+    ("rangeCNm", "<u2"),  # 1/100 NM
+    ("bearingDDeg", "<u2"),  # 1/10 deg
+    ("relativeAltitudeFt", "<i4"), ("verticalRateFpm", "<i2"), ("closureRateKts", "<u2"),
+    ("rangeTauDSec", "<u2"), ("verticalTauDSec", "<u2"),  # 1/10 s, TAU_INF = not closing
+    ("callsign", "S8"),
+])
+
+# magic, version, frame kind, seq, t, base seq (DELTA: the frame this one applies to)
+_HEAD = struct.Struct("<4sBBQdQ")
+# ownship x/y/alt/vs/gs/hdg, SL, TA, RA kind/sense/state/required/min/max, primary threat, banner length
+_OWN = struct.Struct("<ddiiffbBbbbiiiiH")
+_COUNT = struct.Struct("<I")
+_DELTA_FIELDS = TRACK_WIRE_DTYPE.names[1:]
+
+
+@dataclass
+class Frame:
+    """A decoded frame: header fields plus the full track table after applying it."""
+    kind: int
+    seq: int
+    t: float
+    own: Tuple
+    banner: str
+    tracks: np.ndarray
+
+
+def _quantize(rows: List[tuple]) -> np.ndarray:
+    if not rows:
+        return np.zeros(0, dtype=TRACK_WIRE_DTYPE)
+    ac_id, state, rng, brg, rel, vs, clo, rtau, vtau, cs = zip(*rows)
+    out = np.empty(len(rows), dtype=TRACK_WIRE_DTYPE)
+    out["aircraftId"] = ac_id
+    out["state"] = state
+    out["rangeCNm"] = np.clip(np.rint(np.asarray(rng) * 100.0), 0, 0xFFFF)
+    out["bearingDDeg"] = np.rint(np.asarray(brg) % 360.0 * 10.0) % 3600
+    out["relativeAltitudeFt"] = rel
+    out["verticalRateFpm"] = np.clip(vs, -0x8000, 0x7FFF)
+    out["closureRateKts"] = np.clip(np.rint(clo), 0, 0xFFFF)
+    for name, tau in (("rangeTauDSec", rtau), ("verticalTauDSec", vtau)):
+        tau = np.asarray(tau, dtype=np.float64) * 10.0
+        out[name] = np.where(np.isfinite(tau), np.clip(np.rint(np.nan_to_num(tau, posinf=0.0)), 0, TAU_INF - 1), TAU_INF)
+    out["callsign"] = [c.encode("ascii", "replace")[:8] for c in cs]
+    out.sort(order="aircraftId")
+    return out
+
+
+def _encode_tracks(tracks: np.ndarray, prev: Optional[np.ndarray]) -> bytes:
+    """
+    Track section: removed IDs, added rows, then the rows that changed since `prev`
+    column by column (a bitmap of the rows whose field changed, then their new values).
+    prev=None encodes every track as added (keyframe). Both tables are sorted by aircraftId.
+    """
+    if prev is None:
+        removed = np.zeros(0, dtype="<i4")
+        added = tracks
+        changed = old = tracks[:0]
+    else:
+        ids, prev_ids = tracks["aircraftId"], prev["aircraftId"]
+        removed = prev_ids[~np.isin(prev_ids, ids)]
+        idx = np.minimum(np.searchsorted(prev_ids, ids), max(len(prev) - 1, 0))
+        known = prev_ids[idx] == ids if len(prev) else np.zeros(len(ids), dtype=bool)
+        old, cur = prev[idx[known]], tracks[known]
+        diff = old != cur
+        added, changed, old = tracks[~known], cur[diff], old[diff]
+
+    parts = [_COUNT.pack(len(removed)), removed.tobytes(), _COUNT.pack(len(added)), added.tobytes(),
+             _COUNT.pack(len(changed)), changed["aircraftId"].tobytes()]
+    for name in _DELTA_FIELDS:
+        mask = changed[name] != old[name]
+        parts.append(np.packbits(mask, bitorder="little").tobytes())
+        parts.append(changed[name][mask].tobytes())
+    return b"".join(parts)
+
+
+def _apply_tracks(table: np.ndarray, payload: bytes, off: int) -> np.ndarray:
+    """Inverse of _encode_tracks: the track table after applying the section at `off` to `table`."""
+    def take(dtype, count):
+        nonlocal off
+        arr = np.frombuffer(payload, dtype=dtype, count=count, offset=off)
+        off += arr.nbytes
+        return arr
+
+    def count():
+        nonlocal off
+        (n,) = _COUNT.unpack_from(payload, off)
+        off += _COUNT.size
+        return n
+
+    removed = take("<i4", count())
+    added = take(TRACK_WIRE_DTYPE, count())
+    ids = take("<i4", count())
+
+    table = table.copy()
+    if len(ids):
+        pos = np.minimum(np.searchsorted(table["aircraftId"], ids), max(len(table) - 1, 0))
+        if not len(table) or (table["aircraftId"][pos] != ids).any():
+            raise ValueError("delta changes a track that is not in the table")
+        for name in _DELTA_FIELDS:
+            mask = np.unpackbits(take(np.uint8, (len(ids) + 7) // 8), count=len(ids), bitorder="little").astype(bool)
+            table[name][pos[mask]] = take(TRACK_WIRE_DTYPE[name], int(mask.sum()))
+    table = np.concatenate((table[~np.isin(table["aircraftId"], removed)], added))
+    table.sort(order="aircraftId")
+    return table
+
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    """Unmasked server frame; identical for every client, so it is built once per tick."""
+    n = len(payload)
+    if n < 126:
+        head = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return head + payload
+
+
+class _Client:
+    __slots__ = ("writer", "min_interval", "last_sent_at", "last_seq", "last_tracks", "congested_since")
+
+    def __init__(self, writer: asyncio.StreamWriter, max_rate_hz: float):
+        self.writer = writer
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self.last_sent_at = -1e18
+        self.last_seq = -1  # seq of the last frame sent, the base of the next delta
+        self.last_tracks: Optional[np.ndarray] = None  # track table of that frame
+        self.congested_since: Optional[float] = None
+
+
+class StreamServer:
+    """
+    Streams per-tick sim state (ownship, TA/RA, banner, tracks) to WebSocket clients
+    on localhost as binary frames (see decode_frame / FrameDecoder).
+
+    The sim thread only snapshots primitives and hands them to an asyncio loop on a
+    background thread; it never waits on the network. On the loop each client gets a delta
+    (tracks added/changed/removed) against the last frame it was sent, so rate-limited or
+    skipped clients stay on deltas; a tick is encoded once per distinct base frame, and
+    once as a keyframe only for clients that have not been sent a frame yet.
+
+    Per client: at most `max_rate_hz` frames/s (lower with ws://host:port/?hz=N);
+    frames are skipped while its send buffer is over `max_buffer_bytes`, and a client
+    that stays congested for `slow_drop_s` is disconnected. Connect with attach(sim).
+    """
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        max_rate_hz: float = 30.0,
+        max_buffer_bytes: int = 1 << 20,
+        slow_drop_s: float = 5.0,
+        max_pending: int = 8,
+    ):
+        self.host = host
+        self.port = int(port)
+        self.max_rate_hz = float(max_rate_hz)
+        self.max_buffer_bytes = int(max_buffer_bytes)
+        self.slow_drop_s = float(slow_drop_s)
+        self.max_pending = int(max_pending)
+
+        self.seq = 0  # frames encoded so far
+        self.frames_sent = 0
+        self.keyframes_encoded = 0
+        self.snapshots_dropped = 0  # sim ticks skipped because the loop was behind
+        self.clients_dropped = 0
+
+        self._clients: Dict[int, _Client] = {}
+        self._n_clients = 0  # read by the sim thread
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="tcas-stream", daemon=True)
+
+    def start(self) -> "StreamServer":
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise RuntimeError("stream server failed to start") from self._error
+        return self
+
+    def attach(self, sim) -> "StreamServer":
+        sim.streamer = self
+        return self
+
+    @property
+    def client_count(self) -> int:
+        return self._n_clients
+
+    # ---- sim thread -------------------------------------------------
+
+    def record(self, now: float, sim, ta, ra) -> None:
+        if self._n_clients == 0 or self._loop is None:
+            return
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                self.snapshots_dropped += 1
+                return
+            self._pending += 1
+
+        own = sim.ownship
+        if ra is not None:
+            ra_fields = (ra.kind.value, ra.sense.value, ra.state.value,
+                         ra.requiredVerticalRateFpm, ra.minAllowedVSFpm, ra.maxAllowedVSFpm)
+        else:
+            ra_fields = (NONE_CODE, NONE_CODE, NONE_CODE, 0, 0, 0)
+        primary = sim.advisory_engine.primaryThreat
+        own_fields = (own.x_nm, own.y_nm, own.altitudeFt, own.verticalRateFpm, own.groundSpeedKt, own.headingDeg,
+                      sim.tcas.currentSL.value, ta is not None) + ra_fields + (NO_AIRCRAFT if primary is None else primary,)
+        rows = [(ac_id, trk.state.value, trk.rangeNm, trk.bearingDeg, trk.relativeAltitudeFt,
+                 trk.intruderVerticalRateFpm, trk.closureRateKts, trk.rangeTauSec, trk.verticalTauSec,
+                 trk.intruder.callsign)
+                for ac_id, trk in sim.tcas.tracks.items()]
+        self._loop.call_soon_threadsafe(self._publish, now, own_fields, sim.banner(), rows)
+
+    def close(self) -> None:
+        loop = self._loop
+        if loop is not None and self._thread.is_alive():
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+
+    def __enter__(self) -> "StreamServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- loop thread ------------------------------------------------
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+        except BaseException as exc:
+            self._error = exc
+            self._ready.set()
+            loop.close()
+            return
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            for c in list(self._clients.values()):
+                c.writer.transport.abort()
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+
+    def _publish(self, now: float, own_fields: tuple, banner: str, rows: List[tuple]) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+        tracks = _quantize(rows)
+        self.seq += 1
+        seq = self.seq
+        if not self._clients:
+            return
+
+        banner_b = banner.encode("utf-8")[:0xFFFF]
+        own = _OWN.pack(*own_fields, len(banner_b)) + banner_b
+
+        deltas: Dict[int, bytes] = {}  # base seq -> frame; clients sent the same frame share a base
+        keyframe = None
+        t = self._loop.time()
+        for c in list(self._clients.values()):
+            transport = c.writer.transport
+            if transport.is_closing():
+                continue
+            buffered = transport.get_write_buffer_size()
+            if buffered > self.max_buffer_bytes:
+                if c.congested_since is None:
+                    c.congested_since = t
+                elif t - c.congested_since >= self.slow_drop_s:
+                    self.clients_dropped += 1
+                    transport.abort()
+                continue
+            c.congested_since = None
+            if t - c.last_sent_at < c.min_interval:
+                continue
+
+            if c.last_tracks is not None:
+                data = deltas.get(c.last_seq)
+                if data is None:
+                    data = deltas[c.last_seq] = _ws_frame(
+                        OP_BINARY, self._encode(DELTA, seq, now, own, tracks, c.last_tracks, c.last_seq))
+            else:
+                if keyframe is None:
+                    keyframe = _ws_frame(OP_BINARY, self._encode(KEYFRAME, seq, now, own, tracks, None))
+                    self.keyframes_encoded += 1
+                data = keyframe
+            c.writer.write(data)
+            c.last_seq = seq
+            c.last_tracks = tracks
+            c.last_sent_at = t
+            self.frames_sent += 1
+
+    @staticmethod
+    def _encode(kind: int, seq: int, now: float, own: bytes, tracks: np.ndarray, prev: Optional[np.ndarray],
+                base: int = 0) -> bytes:
+        head = _HEAD.pack(FRAME_MAGIC, FRAME_VERSION, kind, seq, now, base if kind == DELTA else 0)
+        return head + own + _encode_tracks(tracks, prev if kind == DELTA else None)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        key = id(writer)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # keep backlog in our buffer, where congestion is visible, not in the kernel's
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.max_buffer_bytes)
+        try:
+            hz = await self._handshake(reader, writer)
+            if hz is None:
+                return
+            self._clients[key] = _Client(writer, hz)
+            self._n_clients = len(self._clients)
+            await self._read_frames(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self._clients.pop(key, None)
+            self._n_clients = len(self._clients)
+            writer.close()
+
+    async def _handshake(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[float]:
+        request = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        line, *header_lines = request.split("\r\n")
+        headers = {}
+        for h in header_lines:
+            if ":" in h:
+                name, value = h.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        parts = line.split()
+        ws_key = headers.get("sec-websocket-key")
+        if (len(parts) != 3 or parts[0] != "GET" or "websocket" not in headers.get("upgrade", "").lower()
+                or ws_key is None or headers.get("sec-websocket-version") != "13"):
+            writer.write(b"HTTP/1.1 426 Upgrade Required\r\nSec-WebSocket-Version: 13\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return None
+
+        hz = self.max_rate_hz
+        try:
+            asked = float(parse_qs(urlsplit(parts[1]).query).get("hz", ["0"])[0])
+        except ValueError:
+            asked = 0.0
+        if asked > 0:  # a client can only lower its rate
+            hz = min(hz, asked) if hz > 0 else asked
+        accept = base64.b64encode(hashlib.sha1(ws_key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("ascii"))
+        return hz
+
+    async def _read_frames(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # clients only need ping/pong and close; data frames are read and ignored
+        while True:
+            b0, b1 = await reader.readexactly(2)
+            opcode, masked, n = b0 & 0x0F, b1 & 0x80, b1 & 0x7F
+            if n == 126:
+                (n,) = struct.unpack("!H", await reader.readexactly(2))
+            elif n == 127:
+                (n,) = struct.unpack("!Q", await reader.readexactly(8))
+            if not masked:
+                await self._close(writer, 1002)  # client frames must be masked
+                return
+            if n > MAX_CLIENT_PAYLOAD:
+                await self._close(writer, 1009)
+                return
+            mask = await reader.readexactly(4)
+            data = await reader.readexactly(n)
+            payload = bytes(b ^ mask[i & 3] for i, b in enumerate(data)) if opcode >= OP_CLOSE else b""
+            if opcode == OP_CLOSE:
+                await self._close(writer, 1000)
+                return
+            if opcode == OP_PING:
+                writer.write(_ws_frame(OP_PONG, payload))
+
+    @staticmethod
+    async def _close(writer: asyncio.StreamWriter, code: int) -> None:
+        writer.write(_ws_frame(OP_CLOSE, struct.pack("!H", code)))
+        try:
+            await asyncio.wait_for(writer.drain(), 1.0)
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+
+
+class FrameDecoder:
+    """Client side: applies keyframes/deltas in order and keeps the current track table."""
+    def __init__(self):
+        self.seq = -1
+        self.tracks = np.zeros(0, dtype=TRACK_WIRE_DTYPE)
+
+    def apply(self, payload: bytes) -> Frame:
+        magic, version, kind, seq, t, base = _HEAD.unpack_from(payload, 0)
+        if magic != FRAME_MAGIC or version != FRAME_VERSION:
+            raise ValueError("not a tcas_sim stream frame")
+        if kind == DELTA and base != self.seq:
+            raise ValueError(f"delta for frame {base} but the last frame applied was {self.seq}")
+        off = _HEAD.size
+        own = _OWN.unpack_from(payload, off)
+        off += _OWN.size
+        banner = payload[off:off + own[-1]].decode("utf-8")
+        off += own[-1]
+        tracks = _apply_tracks(self.tracks if kind == DELTA else self.tracks[:0], payload, off)
+        self.seq = seq
+        self.tracks = tracks
+        return Frame(kind, seq, t, own[:-1], banner, tracks)
+
+
+def decode_frame(payload: bytes) -> Frame:
+    """Decodes a keyframe on its own (deltas need a FrameDecoder)."""
+    return FrameDecoder().apply(payload)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from tcas_sim.sim.simulator import Simulator
+
+    ap = argparse.ArgumentParser(description="Run a headless sim in real time and stream it over WebSocket.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--scenario", help="scenario file (see sim.scenario); default: the GUI's random traffic")
+    ap.add_argument("--tick-hz", type=float, default=20.0, help="sim steps per second")
+    ap.add_argument("--max-rate-hz", type=float, default=30.0, help="per-client frame rate cap")
+    args = ap.parse_args(argv)
+
+    sim = Simulator.from_scenario(args.scenario) if args.scenario else Simulator()
+    with StreamServer(args.host, args.port, max_rate_hz=args.max_rate_hz) as server:
+        server.attach(sim)
+        print(f"streaming on ws://{server.host}:{server.port}/", file=sys.stderr)
+        dt = 1.0 / args.tick_hz
+        nxt = time.monotonic()
+        try:
+            while True:
+                sim.step(dt)
+                nxt += dt
+                time.sleep(max(0.0, nxt - time.monotonic()))
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
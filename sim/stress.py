@@ -0,0 +1,121 @@
+from __future__ import annotations
+import argparse
+import csv
+import resource
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Sequence
+
+from tcas_sim.sim.clock import ManualClock
+from tcas_sim.sim.simulator import Simulator
+from tcas_sim.sim.population import PopulationSpec
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+@dataclass
+class StressPoint:
+    n: int
+    tracked: int
+    ticksPerSec: float
+    meanTickMs: float
+    p99TickMs: float
+    perAircraftUs: float
+    peakRssMb: float
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def build_loaded_sim(n: int, seed: int = 0, threat_spawn_prob: float = 0.30) -> Simulator:
+    """Simulator pre-filled with `n` intruders from the batch population generator (spawning disabled)."""
+    sim = Simulator(max_intruders=n, clock=ManualClock(), seed=seed)
+    sim.spawn_population(n, PopulationSpec(threatFraction=threat_spawn_prob), seed=seed, prefix="S")
+    return sim
+
+
+def measure(n: int, ticks: int = 50, warmup: int = 5, dt: float = 0.1, seed: int = 0) -> StressPoint:
+    sim = build_loaded_sim(n, seed=seed)
+    for _ in range(warmup):
+        sim.clock.advance(dt)
+        sim.step(dt)
+
+    samples: List[float] = []
+    for _ in range(ticks):
+        sim.clock.advance(dt)
+        t0 = time.perf_counter()
+        sim.step(dt)
+        samples.append(time.perf_counter() - t0)
+
+    total = sum(samples)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+    mean = total / len(samples)
+    return StressPoint(
+        n=n,
+        tracked=len(sim.tcas.tracks),
+        ticksPerSec=len(samples) / total if total > 0 else float("inf"),
+        meanTickMs=mean * 1e3,
+        p99TickMs=p99 * 1e3,
+        perAircraftUs=mean / max(1, n) * 1e6,
+        peakRssMb=_peak_rss_mb(),
+    )
+
+
+def superlinear_violations(points: Sequence[StressPoint], max_growth: float) -> List[str]:
+    """
+    Per-aircraft cost should stay flat as N grows. Fixed per-tick overhead makes
+    small N look expensive, so each point is compared to the cheapest point below it.
+    """
+    out: List[str] = []
+    best = None
+    for pt in points:
+        if best is not None and pt.perAircraftUs > best.perAircraftUs * max_growth:
+            out.append(f"N={pt.n}: {pt.perAircraftUs:.2f} us/aircraft vs {best.perAircraftUs:.2f} at N={best.n}"
+                       f" (> x{max_growth:g})")
+        if best is None or pt.perAircraftUs < best.perAircraftUs:
+            best = pt
+    return out
+
+
+def run(sizes: Sequence[int] = DEFAULT_SIZES, ticks: int = 50, seed: int = 0) -> List[StressPoint]:
+    return [measure(n, ticks=ticks, seed=seed) for n in sorted(sizes)]
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Throughput/latency/RSS scaling curve for Simulator.step.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--max-growth", type=float, default=2.0,
+                    help="fail if per-aircraft cost grows by more than this factor")
+    ap.add_argument("--csv", default="-", help="output path for the scaling curve (default: stdout)")
+    args = ap.parse_args(argv)
+
+    points: List[StressPoint] = []
+    fields = list(StressPoint.__dataclass_fields__)
+    out = sys.stdout if args.csv == "-" else open(args.csv, "w", newline="")
+    try:
+        w = csv.DictWriter(out, fieldnames=fields)
+        w.writeheader()
+        for n in sorted(args.sizes):
+            pt = measure(n, ticks=args.ticks, seed=args.seed)
+            points.append(pt)
+            w.writerow({k: (round(v, 4) if isinstance(v, float) else v) for k, v in asdict(pt).items()})
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    bad = superlinear_violations(points, args.max_growth)
+    for msg in bad:
+        print(f"SUPERLINEAR {msg}", file=sys.stderr)
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
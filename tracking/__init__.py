@@ -1,2 +1,3 @@
 from .track import Track
 from .logic import Tracker, compute_sl_from_altitude_ft
+from .surveillance import Surveillance, SensorModel
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import heapq
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from tcas_sim.enums import TrackState
+from tcas_sim.tracking.track import Track
+
+
+class ThreatIndex:
+    """
+    Incrementally maintained view over the current tracks (keyed by aircraft ID):
+      - one bucket of track ids per TrackState (moved only when a state changes)
+      - a (rangeTauSec, rangeNm)-ordered heap of THREAT_RA tracks with lazy deletion
+    so "any TA/RA present" is O(1) and the primary threat is O(log n) amortised.
+    """
+    def __init__(self):
+        self.buckets: Dict[TrackState, Set[int]] = {s: set() for s in TrackState}
+        self._state: Dict[int, TrackState] = {}
+
+        self._heap: List[Tuple[float, float, int, int, Track]] = []
+        self._heap_seq: Dict[int, int] = {}  # id -> seq of its only valid heap entry
+        self._threats: Dict[int, Track] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def state_of(self, track_id: int) -> Optional[TrackState]:
+        return self._state.get(track_id)
+
+    def update(self, track_id: int, trk: Track) -> Optional[TrackState]:
+        """Records the latest track; returns the previous state (None if the track is new)."""
+        prev = self._state.get(track_id)
+        if prev is not trk.state:
+            if prev is not None:
+                self.buckets[prev].discard(track_id)
+            self.buckets[trk.state].add(track_id)
+            self._state[track_id] = trk.state
+
+        if trk.state is TrackState.THREAT_RA:
+            self._seq += 1
+            self._heap_seq[track_id] = self._seq
+            self._threats[track_id] = trk
+            heapq.heappush(self._heap, (trk.rangeTauSec, trk.rangeNm, self._seq, track_id, trk))
+            if len(self._heap) > 2 * len(self._heap_seq) + 16:
+                self._compact()
+        elif prev is TrackState.THREAT_RA:
+            self._drop_threat(track_id)
+        return prev
+
+    def remove(self, track_id: int) -> Optional[TrackState]:
+        prev = self._state.pop(track_id, None)
+        if prev is not None:
+            self.buckets[prev].discard(track_id)
+            if prev is TrackState.THREAT_RA:
+                self._drop_threat(track_id)
+        return prev
+
+    def rebuild(self, tracks: Mapping[int, Track]) -> None:
+        self.__init__()
+        for track_id, trk in tracks.items():
+            self.update(track_id, trk)
+
+    def has_intruders(self) -> bool:
+        return bool(self.buckets[TrackState.INTRUDER_TA]) or bool(self.buckets[TrackState.THREAT_RA])
+
+    def has_threats(self) -> bool:
+        return bool(self.buckets[TrackState.THREAT_RA])
+
+    def threats(self) -> List[Track]:
+        return list(self._threats.values())
+
+    def primary_threat(self) -> Optional[Track]:
+        heap = self._heap
+        while heap:
+            _tau, _rng, seq, track_id, trk = heap[0]
+            if self._heap_seq.get(track_id) == seq:
+                return trk
+            heapq.heappop(heap)
+        return None
+
+    def _drop_threat(self, track_id: int) -> None:
+        self._heap_seq.pop(track_id, None)
+        self._threats.pop(track_id, None)
+
+    def _compact(self) -> None:
+        self._heap = [e for e in self._heap if self._heap_seq.get(e[3]) == e[2]]
+        heapq.heapify(self._heap)
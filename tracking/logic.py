@@ -1,12 +1,16 @@
 from __future__ import annotations
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
 
 from tcas_sim.core.aircraft import Aircraft
 from tcas_sim.core.transponder import Transponder
 from tcas_sim.enums import TrackState, SensitivityLevel, TCASMode
 from tcas_sim.sensitivity.thresholds import SensitivityThresholds
 from tcas_sim.tracking.track import Track
+from tcas_sim.tracking.index import ThreatIndex
+from tcas_sim.tracking.surveillance import Surveillance
 
 
 def compute_sl_from_altitude_ft(alt_ft: int) -> SensitivityLevel:
@@ -41,52 +45,124 @@ def vertical_trigger(rel_alt_ft: int, v_closure_fpm: int, tau_thresh_s: int, zth
     return v_tau <= float(tau_thresh_s)
 
 
+# range memory switches from ID-indexed lists to dicts when the top intruder ID exceeds this many
+# times the intruder count (plus SPARSE_ID_SLACK), e.g. a few tracks among airspace-wide IDs
+SPARSE_ID_FACTOR = 4
+SPARSE_ID_SLACK = 64
+
+
 class Tracker:
     """
-    Creates/updates Track objects from ownship + intruders.
-    Keeps minimal memory for range-rate computation.
+    Creates/updates Track objects from ownship + intruders, keyed by Aircraft.id.
+    Keeps minimal memory for range-rate computation (lists indexed by aircraft ID, or
+    dicts once the IDs seen are sparse, see SPARSE_ID_FACTOR), and a ThreatIndex
+    (per-state buckets + RA threat heap) updated as tracks change.
+    With a Surveillance, tracks come from its filtered estimates instead of truth
+    positions and finite differences, and an aircraft has no track until it replies.
     """
-    def __init__(self):
-        self._prev_range: Dict[str, Tuple[float, float]] = {}
+    def __init__(self, surveillance: Optional[Surveillance] = None):
+        self.surveillance = surveillance
+        self._prev_rng: List[float] | Dict[int, float] = []
+        self._prev_t: List[float] | Dict[int, float] = []  # NaN / missing = no previous range for this ID
+        self._sparse = False
+        self._ids: List[int] = []  # IDs tracked on the last update
+        self.index = ThreatIndex()
+
+    def previous_range(self, ac_id: int) -> Optional[Tuple[float, float]]:
+        if self._sparse:
+            t = self._prev_t.get(ac_id, math.nan)
+        else:
+            t = self._prev_t[ac_id] if ac_id < len(self._prev_t) else math.nan
+        return (self._prev_rng[ac_id], t) if t == t else None
+
+    def set_previous_range(self, ac_id: int, rng: float, t: float) -> None:
+        if not self._sparse and ac_id >= len(self._prev_t):
+            grow = ac_id + 1 - len(self._prev_t)
+            self._prev_rng.extend([0.0] * grow)
+            self._prev_t.extend([math.nan] * grow)
+        self._prev_rng[ac_id] = rng
+        self._prev_t[ac_id] = t
+
+    def _make_sparse(self) -> None:
+        keep = [i for i, t in enumerate(self._prev_t) if t == t]
+        self._prev_rng = {i: self._prev_rng[i] for i in keep}
+        self._prev_t = {i: self._prev_t[i] for i in keep}
+        self._sparse = True
+
+    def restore(self, prev_ranges: Iterable[Tuple[int, float, float]], tracks: Mapping[int, Track]) -> None:
+        """Resets to the given (id, range, t) memory and current tracks (see sim.snapshot)."""
+        self.__init__(self.surveillance)
+        for ac_id, rng, t in prev_ranges:
+            self.set_previous_range(ac_id, rng, t)
+        self._ids = list(tracks)
+        self.index.rebuild(tracks)
 
     def update(
         self,
         now: float,
         ownship: Aircraft,
         intruders: List[Aircraft],
-        intruder_xpdrs: Dict[str, Transponder],
+        intruder_xpdrs: Sequence[Optional[Transponder]],
         tcas_mode: TCASMode,
         thresholds: SensitivityThresholds,
-    ) -> Dict[str, Track]:
-        tracks: Dict[str, Track] = {}
-
-        for ac in intruders:
-            dx = ac.x_nm - ownship.x_nm
-            dy = ac.y_nm - ownship.y_nm
-            rng = math.hypot(dx, dy)
-
-            bearing = (math.degrees(math.atan2(dx, dy)) + 360.0) % 360.0
-            rel_alt = ac.altitudeFt - ownship.altitudeFt
-
-            prev = self._prev_range.get(ac.callsign)
-            if prev is None:
-                range_rate_kts = 0.0
+    ) -> Dict[int, Track]:
+        """`intruder_xpdrs` is indexed by aircraft ID (e.g. AircraftRegistry.transponders); missing = reporting."""
+        tracks: Dict[int, Track] = {}
+        index = self.index
+        n_xpdrs = len(intruder_xpdrs)
+        if intruders:
+            top = max(ac.id for ac in intruders)
+            if top < 0:
+                raise ValueError("Tracker needs registered aircraft (Aircraft.id >= 0)")
+            if not self._sparse and top >= len(self._prev_t):
+                if top >= SPARSE_ID_FACTOR * len(intruders) + SPARSE_ID_SLACK:
+                    self._make_sparse()
+                else:
+                    self.set_previous_range(top, 0.0, math.nan)
+        prev_rng, prev_t, sparse = self._prev_rng, self._prev_t, self._sparse
+
+        est = None
+        if self.surveillance is not None:
+            e = self.surveillance.observe(now, ownship, intruders, intruder_xpdrs)
+            est = (e.valid.tolist(), e.rangeNm.tolist(), e.rangeRateKts.tolist(), e.bearingDeg.tolist(),
+                   np.rint(e.altitudeFt).astype(int).tolist(), np.rint(e.verticalRateFpm).astype(int).tolist())
+
+        for i, ac in enumerate(intruders):
+            ac_id = ac.id
+            if est is None:
+                dx = ac.x_nm - ownship.x_nm
+                dy = ac.y_nm - ownship.y_nm
+                rng = math.hypot(dx, dy)
+
+                bearing = (math.degrees(math.atan2(dx, dy)) + 360.0) % 360.0
+                rel_alt = ac.altitudeFt - ownship.altitudeFt
+                intruder_vs = ac.verticalRateFpm
+
+                last_t = prev_t.get(ac_id, math.nan) if sparse else prev_t[ac_id]
+                if last_t != last_t:  # NaN: new track
+                    range_rate_kts = 0.0
+                else:
+                    dt = max(1e-3, now - last_t)
+                    range_rate_kts = ((rng - prev_rng[ac_id]) / dt) * 3600.0
+
+                prev_rng[ac_id] = rng
+                prev_t[ac_id] = now
             else:
-                prev_rng, prev_t = prev
-                dt = max(1e-3, now - prev_t)
-                range_rate_kts = ((rng - prev_rng) / dt) * 3600.0
-
-            self._prev_range[ac.callsign] = (rng, now)
+                if not est[0][i]:
+                    continue
+                rng, range_rate_kts, bearing = est[1][i], est[2][i], est[3][i]
+                rel_alt = est[4][i] - ownship.altitudeFt
+                intruder_vs = est[5][i]
             closure_kts = max(0.0, -range_rate_kts)
 
             # vertical closure (only if altitude separation reducing)
-            v_closure_signed = ownship.verticalRateFpm - ac.verticalRateFpm
+            v_closure_signed = ownship.verticalRateFpm - intruder_vs
             v_closure_mag = abs(v_closure_signed) if (rel_alt * v_closure_signed < 0) else 0
 
             range_tau = (rng / closure_kts) * 3600.0 if closure_kts > 1e-6 else float("inf")
             vert_tau = (abs(rel_alt) / v_closure_mag) * 60.0 if v_closure_mag > 0 else float("inf")
 
-            xpdr = intruder_xpdrs.get(ac.callsign)
+            xpdr = intruder_xpdrs[ac_id] if ac_id < n_xpdrs else None
             altitude_reporting = bool(xpdr.altitudeReporting) if xpdr else True
 
             # classification (TA/RA gates use thresholds; RA also depends on mode + altitude reporting)
@@ -114,14 +190,14 @@ class Tracker:
                 state = TrackState.OTHER
                 ttc = 999
 
-            tracks[ac.callsign] = Track(
+            trk = tracks[ac_id] = Track(
                 intruder=ac,
                 bearingDeg=bearing,
                 rangeNm=rng,
                 relativeAltitudeFt=rel_alt,
                 rangeRateKts=range_rate_kts,
                 closureRateKts=closure_kts,
-                intruderVerticalRateFpm=ac.verticalRateFpm,
+                intruderVerticalRateFpm=intruder_vs,
                 verticalClosureFpm=v_closure_mag,
                 rangeTauSec=range_tau,
                 verticalTauSec=vert_tau,
@@ -130,5 +206,20 @@ class Tracker:
                 timeToConflictSec=ttc,
                 lastUpdateAt=now,
             )
+            index.update(ac_id, trk)
+
+        # forget vanished aircraft so a reused ID starts as a new track
+        if len(index) > len(tracks):
+            gone = [ac_id for ac_id in self._ids if ac_id not in tracks]
+            for ac_id in gone:
+                if sparse:
+                    prev_t.pop(ac_id, None)
+                    prev_rng.pop(ac_id, None)
+                else:
+                    prev_t[ac_id] = math.nan
+                index.remove(ac_id)
+            if self.surveillance is not None:
+                self.surveillance.forget(gone)
+        self._ids = list(tracks)
 
         return tracks
@@ -0,0 +1,182 @@
+from __future__ import annotations
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from tcas_sim.core.aircraft import Aircraft
+from tcas_sim.core.transponder import Transponder
+from tcas_sim.enums import TransponderMode
+
+# reported altitude resolution: Gillham (Mode C) 100 ft, Mode S 25 ft
+ALTITUDE_QUANT_FT = {TransponderMode.MODE_A: 100, TransponderMode.MODE_C: 100, TransponderMode.MODE_S: 25}
+
+# alpha-beta gains per filtered column (range, altitude); altitude is smoothed harder against quantization
+FILTER_ALPHA = (0.6, 0.4)
+FILTER_BETA = (0.3, 0.1)
+
+
+@dataclass(frozen=True)
+class SensorModel:
+    """
+    Errors of the interrogation scan. Each scan every intruder replies with probability 1 - missProb;
+    replies carry Gaussian range/bearing noise (1 sigma) quantized to rangeQuantNm, and the altitude
+    the transponder reports (ALTITUDE_QUANT_FT). Tracks with no reply for coastLimitS are dropped.
+    """
+    scanIntervalS: float = 1.0
+    rangeSigmaNm: float = 0.01
+    rangeQuantNm: float = 1.0 / 64.0
+    bearingSigmaDeg: float = 5.0
+    missProb: float = 0.05
+    coastLimitS: float = 6.0
+
+    def __post_init__(self):
+        if self.scanIntervalS <= 0.0:
+            raise ValueError(f"scanIntervalS must be > 0, got {self.scanIntervalS}")
+        if not 0.0 <= self.missProb < 1.0:
+            raise ValueError(f"missProb must be in [0, 1), got {self.missProb}")
+        if min(self.rangeSigmaNm, self.rangeQuantNm, self.bearingSigmaDeg) < 0.0:
+            raise ValueError("sensor noise and quantization must be >= 0")
+
+
+class AlphaBetaFilter:
+    """
+    Alpha-beta filters for every aircraft at once: one row of columns per aircraft ID, state kept at
+    the time of the row's last measurement and predicted forward on demand. A row's rate starts
+    from the first two measurements (two-point init), then follows the alpha-beta update. Rates
+    divide by at least min_dt, the nominal measurement interval, so closely spaced measurements
+    cannot turn noise into a huge rate.
+    """
+    def __init__(self, alpha: Sequence[float], beta: Sequence[float], min_dt: float = 1e-3):
+        self.alpha = np.asarray(alpha, dtype=float)
+        self.beta = np.asarray(beta, dtype=float)
+        self.min_dt = float(min_dt)
+        cols = self.alpha.size
+        self.x = np.zeros((0, cols))
+        self.v = np.zeros((0, cols))  # per second
+        self.t = np.zeros(0)  # time of the last measurement
+        self.n = np.zeros(0, dtype=np.int8)  # measurements so far, saturating at 2
+
+    def _grow(self, size: int) -> None:
+        extra = size - self.t.size
+        if extra > 0:
+            cols = self.alpha.size
+            self.x = np.concatenate([self.x, np.zeros((extra, cols))])
+            self.v = np.concatenate([self.v, np.zeros((extra, cols))])
+            self.t = np.concatenate([self.t, np.zeros(extra)])
+            self.n = np.concatenate([self.n, np.zeros(extra, dtype=np.int8)])
+
+    def reset(self, ids: np.ndarray) -> None:
+        ids = ids[ids < self.n.size]
+        self.n[ids] = 0
+
+    def update(self, ids: np.ndarray, now: float, z: np.ndarray, measured: np.ndarray
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Folds in z (rows aligned with ids) where `measured` and returns (estimate, rate, seconds since
+        the last measurement) at `now` for every id; rows never measured come back with n == 0 (see count).
+        """
+        if ids.size:
+            self._grow(int(ids.max()) + 1)
+        x, v, n = self.x[ids], self.v[ids], self.n[ids]
+        age = now - self.t[ids]
+        dt = np.maximum(age, self.min_dt)[:, None]
+        pred = x + v * age[:, None]
+
+        steady = (measured & (n >= 2))[:, None]
+        second = (measured & (n == 1))[:, None]
+        res = z - pred
+        x_new = np.where(steady, pred + self.alpha * res, z)
+        v_new = np.where(steady, v + self.beta * res / dt, np.where(second, (z - x) / dt, 0.0))
+
+        up = ids[measured]
+        self.x[up] = x_new[measured]
+        self.v[up] = v_new[measured]
+        self.t[up] = now
+        self.n[up] = np.minimum(n[measured] + 1, 2)
+
+        m = measured[:, None]
+        return np.where(m, x_new, pred), np.where(m, v_new, v), np.where(measured, 0.0, age)
+
+    def count(self, ids: np.ndarray) -> np.ndarray:
+        return self.n[ids]
+
+
+@dataclass
+class Estimates:
+    """Surveillance output aligned with the intruders passed to Surveillance.observe; `valid` = has a track."""
+    valid: np.ndarray
+    rangeNm: np.ndarray
+    rangeRateKts: np.ndarray
+    bearingDeg: np.ndarray
+    altitudeFt: np.ndarray
+    verticalRateFpm: np.ndarray
+
+
+class Surveillance:
+    """
+    Scan-based surveillance for Tracker: every scanIntervalS each intruder may reply with a noisy,
+    quantized range/bearing/altitude (SensorModel), and one AlphaBetaFilter over all tracks estimates
+    range, range rate, altitude and vertical rate, coasting through missed replies and between scans.
+    """
+    def __init__(self, model: SensorModel = SensorModel(), seed: Optional[int] = None):
+        self.model = model
+        self.rng = np.random.default_rng(seed)
+        self.filter = AlphaBetaFilter(FILTER_ALPHA, FILTER_BETA, min_dt=model.scanIntervalS)
+        self._bearing = np.zeros(0)  # last measured bearing by ID
+        self._next_scan = -math.inf
+
+    def forget(self, ids: Sequence[int]) -> None:
+        """Drops filter state, e.g. for IDs released and about to be reused."""
+        self.filter.reset(np.asarray(ids, dtype=np.int64))
+
+    def observe(
+        self,
+        now: float,
+        ownship: Aircraft,
+        intruders: List[Aircraft],
+        intruder_xpdrs: Sequence[Optional[Transponder]],
+    ) -> Estimates:
+        model = self.model
+        n = len(intruders)
+        ids = np.fromiter((ac.id for ac in intruders), dtype=np.int64, count=n)
+        if n and int(ids.max()) >= self._bearing.size:
+            self._bearing = np.concatenate([self._bearing, np.zeros(int(ids.max()) + 1 - self._bearing.size)])
+
+        measured = np.zeros(n, dtype=bool)
+        z = np.zeros((n, 2))
+        if now >= self._next_scan:
+            # keep the cadence; after a gap (or the first scan) the next one is a full interval away
+            nxt = self._next_scan + model.scanIntervalS
+            self._next_scan = nxt if nxt > now else now + model.scanIntervalS
+            measured = self.rng.random(n) >= model.missProb
+
+            dx = np.fromiter((ac.x_nm for ac in intruders), dtype=float, count=n) - ownship.x_nm
+            dy = np.fromiter((ac.y_nm for ac in intruders), dtype=float, count=n) - ownship.y_nm
+            alt = np.fromiter((ac.altitudeFt for ac in intruders), dtype=float, count=n)
+            n_xpdrs = len(intruder_xpdrs)
+            quant = np.fromiter(
+                (ALTITUDE_QUANT_FT[x.mode] if i < n_xpdrs and (x := intruder_xpdrs[i]) is not None else 25
+                 for i in ids.tolist()), dtype=float, count=n)
+
+            rng = np.hypot(dx, dy) + self.rng.normal(0.0, model.rangeSigmaNm, n)
+            if model.rangeQuantNm > 0.0:
+                rng = np.round(rng / model.rangeQuantNm) * model.rangeQuantNm
+            z[:, 0] = np.maximum(rng, 0.0)
+            z[:, 1] = np.round(alt / quant) * quant
+
+            bearing = (np.degrees(np.arctan2(dx, dy)) + self.rng.normal(0.0, model.bearingSigmaDeg, n)) % 360.0
+            self._bearing[ids[measured]] = bearing[measured]
+
+        x, v, age = self.filter.update(ids, now, z, measured)
+        valid = (self.filter.count(ids) > 0) & (age <= model.coastLimitS)
+        self.filter.reset(ids[~valid])  # coasted out: the next reply starts a new track
+        return Estimates(
+            valid=valid,
+            rangeNm=np.maximum(x[:, 0], 0.0),
+            rangeRateKts=v[:, 0] * 3600.0,
+            bearingDeg=self._bearing[ids],
+            altitudeFt=x[:, 1],
+            verticalRateFpm=v[:, 1] * 60.0,
+        )